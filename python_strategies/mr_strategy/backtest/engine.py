@@ -395,7 +395,7 @@ class BacktestEngine:
                 # --------------------------
                 # SIGNAL GENERATION PHASE
                 # --------------------------
-                strategy_signals = await self.signal_generator.process_candle(candle_dict, range_values)
+                strategy_signals = self.signal_generator.process_candle_sync(candle_dict, range_values)
                 
                 if strategy_signals:
                     # Filter signals based on instrument direction
@@ -461,10 +461,10 @@ class BacktestEngine:
                         )
                         
                         if updated_trade:
-                            if updated_trade['status'] in [TradeStatus.CLOSED.value, 
-                                                            TradeStatus.STOPPED_OUT.value, 
-                                                            TradeStatus.TAKE_PROFIT.value]:
-                                logger.info(f"{candle_info}Trade {instrument_key} closed with status {updated_trade['status']} and pnl {updated_trade['realized_pnl']}")
+                            if updated_trade['status'] in (TradeStatus.CLOSED,
+                                                           TradeStatus.STOPPED_OUT,
+                                                           TradeStatus.TAKE_PROFIT):
+                                logger.info(f"{candle_info}Trade {instrument_key} closed with status {TradeStatus(updated_trade['status']).name} and pnl {updated_trade['realized_pnl']}")
                                 # check if same day trade is already present in the trades list
                                 same_day_trade = False
                                 for trade in trades:
@@ -474,7 +474,7 @@ class BacktestEngine:
                                         same_day_trade = True
                                         break
                                 if not same_day_trade:
-                                    trades.append(updated_trade)
+                                    trades.append(self.trade_manager.serialize_trade(updated_trade))
                                 self.signal_generator.reset_signal_and_state()
                     except Exception as e:
                         logger.error(f"{candle_info}Error updating trade {instrument_key}: {str(e)}")
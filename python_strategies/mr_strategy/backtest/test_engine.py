@@ -262,9 +262,9 @@ async def test_trade_management(sample_config: BacktestConfig, sample_data: Dict
             
             # Verify trade status
             assert trade['status'] in [
-                TradeStatus.CLOSED.value,
-                TradeStatus.STOPPED_OUT.value,
-                TradeStatus.TAKE_PROFIT.value
+                "closed",
+                "stopped_out",
+                "take_profit"
             ]
             
             # Verify position size calculation
@@ -272,7 +272,7 @@ async def test_trade_management(sample_config: BacktestConfig, sample_data: Dict
             assert trade['position_size'] <= sample_config.initial_capital * 0.5  # Max position size check
             
             # Verify P&L calculation
-            if trade['status'] == TradeStatus.STOPPED_OUT.value:
+            if trade['status'] == "stopped_out":
                 assert trade['realized_pnl'] < 0
-            elif trade['status'] == TradeStatus.TAKE_PROFIT.value:
+            elif trade['status'] == "take_profit":
                 assert trade['realized_pnl'] > 0 
\ No newline at end of file
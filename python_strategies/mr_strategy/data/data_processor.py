@@ -18,9 +18,91 @@ import backoff
 from aiohttp import ClientError, ClientResponseError
 from .intraday_data_processor import IntradayDataProcessor
 from .daily_data_processor import DailyDataProcessor
+from ..utils.numba_compat import njit
 
 logger = logging.getLogger(__name__)
 
+# Column layout for candles held as a NumPy structured array. timestamp is
+# Timestamp.value (epoch ns); prices stay float64 so BB width comparisons
+# match the DataFrame path exactly.
+CANDLE_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('bb_upper_x', '<f8'),
+    ('bb_middle_x', '<f8'),
+    ('bb_lower_x', '<f8'),
+])
+
+# Steps between exact recomputations of the running sums in _rolling_mean_std
+_ROLLING_RESYNC_INTERVAL = 1024
+
+@njit(cache=True)
+def _rolling_mean_std(values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling mean and sample standard deviation in a single O(N) pass.
+    
+    Keeps a running sum and sum of squares of the window, shifted by a
+    recent value to limit cancellation. The sums are recomputed exactly
+    every _ROLLING_RESYNC_INTERVAL steps so rounding cannot accumulate,
+    and a two-pass variance is used if rounding still drives it negative.
+    Windows containing NaN give NaN, as with pandas rolling().
+    """
+    size = values.shape[0]
+    mean = np.full(size, np.nan)
+    std = np.full(size, np.nan)
+    if period < 1 or size < period:
+        return mean, std
+    
+    shift = 0.0
+    for i in range(size):
+        if not np.isnan(values[i]):
+            shift = values[i]
+            break
+    
+    total = 0.0
+    total_sq = 0.0
+    nan_count = 0
+    for i in range(size):
+        value = values[i]
+        if np.isnan(value):
+            nan_count += 1
+        else:
+            total += value - shift
+            total_sq += (value - shift) * (value - shift)
+        if i >= period:
+            old = values[i - period]
+            if np.isnan(old):
+                nan_count -= 1
+            else:
+                total -= old - shift
+                total_sq -= (old - shift) * (old - shift)
+        if i % _ROLLING_RESYNC_INTERVAL == 0 and not np.isnan(value):
+            shift = value
+            total = 0.0
+            total_sq = 0.0
+            for j in range(max(0, i - period + 1), i + 1):
+                if not np.isnan(values[j]):
+                    total += values[j] - shift
+                    total_sq += (values[j] - shift) * (values[j] - shift)
+        if i < period - 1 or nan_count > 0:
+            continue
+        
+        mean[i] = shift + total / period
+        if period < 2:
+            continue
+        var = (total_sq - total * total / period) / (period - 1)
+        if var < 0.0:
+            var = 0.0
+            for j in range(i - period + 1, i + 1):
+                var += (values[j] - mean[i]) * (values[j] - mean[i])
+            var /= period - 1
+        std[i] = np.sqrt(var)
+    return mean, std
+
 class ApiError(Exception):
     """Custom exception for API-related errors."""
     def __init__(self, message: str, status_code: Optional[int] = None, response: Optional[Dict] = None):
@@ -276,6 +358,82 @@ class CandleProcessor:
             logger.error(f"Error parsing candle data: {str(e)}")
             raise ValueError(f"Failed to parse candle data: {str(e)}")
 
+    @staticmethod
+    def to_candle_array(candles: Union[pd.DataFrame, Dict[str, Any], List[Dict[str, Any]], np.ndarray]) -> np.ndarray:
+        """
+        Convert candles to a CANDLE_DTYPE structured array.
+        
+        Args:
+            candles: DataFrame, single candle dict, list of candle dicts or
+                an array already in CANDLE_DTYPE
+            
+        Returns:
+            Structured array with one record per candle; missing price
+            fields are NaN
+        """
+        if isinstance(candles, np.ndarray) and candles.dtype == CANDLE_DTYPE:
+            return candles
+        if isinstance(candles, dict):
+            candles = [candles]
+        df = candles if isinstance(candles, pd.DataFrame) else pd.DataFrame(list(candles))
+        
+        records = np.empty(len(df), dtype=CANDLE_DTYPE)
+        if 'timestamp' in df.columns:
+            timestamps = pd.DatetimeIndex(pd.to_datetime(df['timestamp']))
+        else:
+            timestamps = pd.DatetimeIndex(df.index)
+        # .values is UTC for tz-aware indexes; normalise the unit to ns
+        records['timestamp'] = timestamps.values.astype('datetime64[ns]').view('i8')
+        for name in CANDLE_DTYPE.names[1:]:
+            if name in df.columns:
+                records[name] = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+            else:
+                records[name] = np.nan
+        return records
+    
+    @staticmethod
+    def candle_to_dict(record: np.void, tz=None) -> Dict[str, Any]:
+        """
+        Build the legacy candle dict from a CANDLE_DTYPE record.
+        
+        Args:
+            record: One element of a CANDLE_DTYPE array
+            tz: Timezone the timestamps were localized to, if any
+            
+        Returns:
+            Candle dict with a pd.Timestamp and float fields
+        """
+        candle = {'timestamp': pd.Timestamp(int(record['timestamp']), tz=tz)}
+        for name in CANDLE_DTYPE.names[1:]:
+            candle[name] = float(record[name])
+        return candle
+
+    @staticmethod
+    def candles_to_dicts(records: np.ndarray, tz=None) -> List[Dict[str, Any]]:
+        """
+        Build legacy candle dicts for a whole CANDLE_DTYPE array.
+        
+        Same result as candle_to_dict per record, but timestamps are boxed
+        in one vectorized pass and prices come out of a single tolist()
+        instead of per-field record indexing.
+        
+        Args:
+            records: CANDLE_DTYPE array
+            tz: Timezone the timestamps were localized to, if any
+            
+        Returns:
+            List of candle dicts with pd.Timestamp and float fields
+        """
+        timestamps = pd.DatetimeIndex(records['timestamp'].view('datetime64[ns]'))
+        if tz is not None:
+            timestamps = timestamps.tz_localize('UTC').tz_convert(tz)
+        names = CANDLE_DTYPE.names[1:]
+        prices = records[list(names)].tolist()
+        return [
+            {'timestamp': timestamp, **dict(zip(names, values))}
+            for timestamp, values in zip(timestamps, prices)
+        ]
+
     def extract_morning_range(self, 
                             df: pd.DataFrame, 
                             range_type: str = '5MR',
@@ -492,7 +650,9 @@ class CandleProcessor:
         Calculate morning range values including MR value.
         
         Args:
-            candles: DataFrame with candle data for the day
+            candles: DataFrame with the candles of the morning range window only (e.g. the
+                9:15-9:20 candle for 5MR). mr_high/mr_low span every row passed in, and the
+                14-day ATR is read from the first row's DAILY_ATR_14.
             
         Returns:
             Dict with:
@@ -503,7 +663,7 @@ class CandleProcessor:
             - is_valid: Boolean indicating if MR value > 3
             - error: Error message if any (None if successful)
         """
-        if candles.empty:
+        if candles.shape[0] == 0:
             logger.warning("Empty DataFrame provided for morning range calculation")
             return {
                 'mr_high': 0,
@@ -530,10 +690,10 @@ class CandleProcessor:
                     'error': error_msg
                 }
             
-            # Calculate morning range values
+            # Calculate morning range values on the raw arrays, skipping pandas' reduction dispatch
             morning_candle = candles.iloc[0]
-            mr_high = morning_candle['high']
-            mr_low = morning_candle['low']
+            mr_high = float(np.max(candles['high'].values))
+            mr_low = float(np.min(candles['low'].values))
             mr_size = mr_high - mr_low
             
             if mr_size <= 0:
@@ -577,10 +737,10 @@ class CandleProcessor:
                 }
             
             # Calculate MR value
-            mr_value = (atr_14 / mr_size) * 1.1
+            mr_value = float(atr_14 / mr_size) * 1.1
             
             # Validate MR value
-            is_valid = mr_value > 3
+            is_valid = bool(mr_value > 3)
             
             logger.info(
                 f"Morning Range Calculation - "
@@ -808,8 +968,9 @@ class CandleProcessor:
 
     def _calculate_bollinger_bands(self, prices: pd.Series, period: int = 20, std_dev: float = 2) -> Tuple[pd.Series, pd.Series]:
         """Calculate Bollinger Bands."""
-        sma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
+        sma, std = _rolling_mean_std(prices.to_numpy(dtype=np.float64), period)
+        sma = pd.Series(sma, index=prices.index)
+        std = pd.Series(std, index=prices.index)
         upper_band = sma + (std * std_dev)
         lower_band = sma - (std * std_dev)
         return upper_band, lower_band
@@ -21,7 +21,7 @@ class EntryStrategy(ABC):
         self.reset_state()
     
     @abstractmethod
-    async def check_entry_conditions(self, 
+    def check_entry_conditions_sync(self, 
                                candle: Dict[str, Any], 
                                mr_values: Dict[str, Any]) -> Optional[Signal]:
         """
@@ -36,6 +36,17 @@ class EntryStrategy(ABC):
         """
         pass
     
+    async def check_entry_conditions(self, 
+                               candle: Dict[str, Any], 
+                               mr_values: Dict[str, Any]) -> Optional[Signal]:
+        """
+        Async entry point for the live pipeline; delegates to check_entry_conditions_sync,
+        which backtests call directly. The checks run on the calling thread, including
+        any blocking reads a strategy makes (BBWidthEntryStrategy reads its lowest-width
+        CSV on every candle).
+        """
+        return self.check_entry_conditions_sync(candle, mr_values)
+    
     @abstractmethod
     def reset_state(self) -> None:
         """Reset the entry strategy state."""
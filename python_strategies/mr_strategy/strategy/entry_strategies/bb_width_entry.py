@@ -5,7 +5,9 @@ This module implements the BB Width entry strategy (BB_WIDTH_ENTRY) which looks
 volatility squeeze conditions using Bollinger Bands width analysis.
 """
 
-from typing import Dict, Optional, Any
+import asyncio
+from collections import deque
+from typing import Dict, Optional, Any, Iterable
 from datetime import datetime, time
 import logging
 import pandas as pd
@@ -13,9 +15,99 @@ import numpy as np
 
 from .base import EntryStrategy
 from ..models import Signal, SignalType, SignalDirection
+from ...utils.numba_compat import njit
 
 logger = logging.getLogger(__name__)
 
+# Log prefix built by _format_candle_info
+_CANDLE_INFO_TEMPLATE = "[%s] [O:%.2f H:%.2f L:%.2f C:%.2f] - "
+
+# _bb_status result codes
+_BB_INVALID = 0
+_BB_VALID = 1
+_BB_FLAT = 2  # upper == middle == lower, accepted but nothing to trade
+
+@njit(cache=True)
+def _bb_status(bb_upper: float, bb_middle: float, bb_lower: float) -> int:
+    """Classify a candle's Bollinger Band values; NaN fails every comparison."""
+    if not (bb_upper > 0.0 and bb_middle > 0.0 and bb_lower > 0.0):
+        return _BB_INVALID
+    if bb_upper == bb_lower and bb_lower == bb_middle:
+        return _BB_FLAT
+    if bb_lower < bb_middle and bb_middle < bb_upper:
+        return _BB_VALID
+    return _BB_INVALID
+
+_VELTKAMP_SPLIT = 134217729.0  # 2**27 + 1
+
+@njit(cache=True)
+def _round2(value: float) -> float:
+    """
+    round(value, 2) with Python's result, usable inside Numba kernels.
+    
+    Numba's round() scales and rounds half to even, which disagrees with
+    Python on values like 0.645 whose scaled product rounds onto .5. The
+    rounding error of value * 100 is recovered exactly (Dekker's
+    two-product) to decide those cases the way Python does.
+    """
+    scaled = value * 100.0
+    if not abs(scaled) < 4503599627370496.0:  # 2**52: no fractional part, or inf/NaN
+        return value
+    whole = np.floor(scaled)
+    frac = scaled - whole
+    if frac > 0.5:
+        whole += 1.0
+    elif frac == 0.5:
+        t = _VELTKAMP_SPLIT * value
+        value_hi = t - (t - value)
+        value_lo = value - value_hi
+        t = _VELTKAMP_SPLIT * 100.0
+        hundred_hi = t - (t - 100.0)
+        hundred_lo = 100.0 - hundred_hi
+        error = (((value_hi * hundred_hi - scaled) + value_hi * hundred_lo)
+                 + value_lo * hundred_hi) + value_lo * hundred_lo
+        # An exact tie (e.g. 4.375) goes to the even neighbour, as in Python
+        if error > 0.0 or (error == 0.0 and whole % 2.0 != 0.0):
+            whole += 1.0
+    return whole / 100.0
+
+@njit(cache=True)
+def _round2_array(values: np.ndarray) -> np.ndarray:
+    """Elementwise _round2."""
+    rounded = np.empty_like(values)
+    for i in range(values.shape[0]):
+        rounded[i] = _round2(values[i])
+    return rounded
+
+@njit(cache=True)
+def _squeeze_step(bb_upper: float, bb_lower: float, lowest_bb_width: float, bb_width_threshold: float,
+                  squeeze_detected: bool, squeeze_candle_count: int, squeeze_duration_min: int):
+    """
+    Advance the squeeze state by one validated candle.
+    
+    Returns:
+        (bb_width, squeeze_threshold, squeeze_detected, squeeze_candle_count,
+        entry_ready), where entry_ready means the squeeze has lasted long
+        enough to look for an entry
+    """
+    bb_width = _round2(bb_upper - bb_lower)
+    squeeze_threshold = _round2(lowest_bb_width * (1 + bb_width_threshold))
+    if bb_width <= squeeze_threshold:
+        if squeeze_detected:
+            squeeze_candle_count += 1
+        else:
+            squeeze_detected = True
+            squeeze_candle_count = 1
+    else:
+        squeeze_detected = False
+        squeeze_candle_count = 0
+    entry_ready = squeeze_detected and squeeze_candle_count >= squeeze_duration_min
+    return bb_width, squeeze_threshold, squeeze_detected, squeeze_candle_count, entry_ready
+
+def _hhmmss(t) -> int:
+    """Wall-clock time of a time/datetime/Timestamp as an HHMMSS integer."""
+    return t.hour * 10000 + t.minute * 100 + t.second
+
 class BBWidthEntryStrategy(EntryStrategy):
     """Implementation of the BB Width entry (BB_WIDTH_ENTRY) strategy."""
     
@@ -26,6 +118,8 @@ class BBWidthEntryStrategy(EntryStrategy):
         Args:
             config: Strategy configuration
         """
+        # Sized before the base class calls reset_state(), which allocates the history buffer
+        self.max_history_length = 50  # Keep last 50 candles for lowest calculation
         super().__init__(config)
         
         # BB Width strategy specific parameters
@@ -35,9 +129,15 @@ class BBWidthEntryStrategy(EntryStrategy):
         self.squeeze_duration_min = getattr(config, 'squeeze_duration_min', 3)  # Minimum 3 candles
         self.squeeze_duration_max = getattr(config, 'squeeze_duration_max', 5)  # Maximum 5 candles
         
+        # Compile the kernels now rather than on the first live candle
+        _bb_status(2.0, 1.0, 0.5)
+        _squeeze_step(2.0, 0.5, 1.0, 0.1, False, 0, 3)
+        
         # Trading hours
         self.market_open = time(9, 15)
         self.market_close = time(15, 30)
+        self._market_open_hhmmss = _hhmmss(self.market_open)
+        self._market_close_hhmmss = _hhmmss(self.market_close)
         
         # Strategy state variables
         self.in_long_trade = False
@@ -50,12 +150,8 @@ class BBWidthEntryStrategy(EntryStrategy):
         self.bb_lower = None
         self.bb_middle = None
         self.current_bb_width = None
-        
-        # Historical BB width tracking for lowest calculation
-        self.bb_width_history = []
-        self.max_history_length = 50  # Keep last 50 candles for lowest calculation
     
-    async def check_entry_conditions(self, 
+    def check_entry_conditions_sync(self, 
                                candle: Dict[str, Any], 
                                mr_values: Dict[str, Any]) -> Optional[Signal]:
         """
@@ -68,7 +164,8 @@ class BBWidthEntryStrategy(EntryStrategy):
         Returns:
             Signal if entry conditions are met, None otherwise
         """
-        candle_info = self._format_candle_info(candle)
+        # The prefix only feeds debug/info logs, so skip building it when those are off
+        candle_info = self._format_candle_info(candle) if logger.isEnabledFor(logging.INFO) else ""
         
         # Convert timestamp if needed
         timestamp = candle.get('timestamp')
@@ -76,22 +173,19 @@ class BBWidthEntryStrategy(EntryStrategy):
             timestamp = pd.to_datetime(timestamp)
             
         # Validate trading hours
-        candle_time = timestamp.time()
-        if not (self.market_open <= candle_time <= self.market_close):
-            logger.debug(f"{candle_info}Outside trading hours")
+        if not (self._market_open_hhmmss <= _hhmmss(timestamp) <= self._market_close_hhmmss):
+            logger.debug("%sOutside trading hours", candle_info)
             return None
             
         # Validate required BB data
         if not self._validate_bb_data(candle):
-            logger.debug(f"{candle_info}Missing or invalid BB data")
+            logger.debug("%sMissing or invalid BB data", candle_info)
             return None
             
         # Extract BB values
         self.bb_upper = candle.get('bb_upper_x', 0)
         self.bb_lower = candle.get('bb_lower_x', 0)
         self.bb_middle = candle.get('bb_middle_x', 0)
-        self.current_bb_width = self.bb_upper - self.bb_lower
-        self.current_bb_width = round(self.current_bb_width, 2)
         
         # Update BB width history
         # self._update_bb_width_history(self.current_bb_width)
@@ -99,33 +193,25 @@ class BBWidthEntryStrategy(EntryStrategy):
         # Get lowest BB width from CSV file
         self.lowest_bb_width = self._get_lowest_bb_width_from_csv()
         
+        # Width, squeeze threshold (±0.1% of lowest), squeeze run and duration check in one kernel call
+        was_squeezed = self.squeeze_detected
+        (self.current_bb_width, squeeze_threshold, self.squeeze_detected,
+         self.squeeze_candle_count, entry_ready) = _squeeze_step(
+            float(self.bb_upper), float(self.bb_lower), float(self.lowest_bb_width),
+            float(self.bb_width_threshold), bool(self.squeeze_detected),
+            int(self.squeeze_candle_count), int(self.squeeze_duration_min))
         
-        # Check for squeeze condition
-        squeeze_threshold = self.lowest_bb_width * (1 + self.bb_width_threshold)  # ±0.1% of lowest
-        squeeze_threshold = round(squeeze_threshold, 2)
-        
-        if self.current_bb_width <= squeeze_threshold:
-            # Squeeze condition detected
-            if not self.squeeze_detected:
-                # Start new squeeze
-                self.squeeze_detected = True
-                self.squeeze_start_time = timestamp
-                self.squeeze_candle_count = 1
-                logger.debug(f"{candle_info}BB squeeze detected - Width: {self.current_bb_width:.6f}, Threshold: {squeeze_threshold:.6f}")
-            else:
-                # Continue existing squeeze
-                self.squeeze_candle_count += 1
-                logger.debug(f"{candle_info}BB squeeze continuing - Candle {self.squeeze_candle_count}")
-        else:
-            # No squeeze condition
-            if self.squeeze_detected:
-                logger.debug(f"{candle_info}BB squeeze ended - Width: {self.current_bb_width:.6f}")
-            self.squeeze_detected = False
-            self.squeeze_candle_count = 0
+        if self.squeeze_detected and not was_squeezed:
+            self.squeeze_start_time = timestamp
+            logger.debug("%sBB squeeze detected - Width: %.6f, Threshold: %.6f",
+                         candle_info, self.current_bb_width, squeeze_threshold)
+        elif self.squeeze_detected:
+            logger.debug("%sBB squeeze continuing - Candle %d", candle_info, self.squeeze_candle_count)
+        elif was_squeezed:
+            logger.debug("%sBB squeeze ended - Width: %.6f", candle_info, self.current_bb_width)
         
         # Check entry conditions only if squeeze duration is within range
-        if (self.squeeze_detected and 
-            self.squeeze_candle_count >= self.squeeze_duration_min):
+        if entry_ready:
             
             # Check for entry conditions
             entry_signal = self._check_entry_conditions(candle, timestamp, candle_info)
@@ -134,38 +220,87 @@ class BBWidthEntryStrategy(EntryStrategy):
         
         return None
     
+    def check_entry_conditions_vectorized(self, candles: pd.DataFrame) -> np.ndarray:
+        """
+        Evaluate the BB Width entry conditions over a whole frame of candles.
+        
+        Mirrors check_entry_conditions candle by candle: candles outside trading
+        hours or with invalid BB data are skipped without touching the squeeze
+        run, and an entry is flagged once the run reaches squeeze_duration_min.
+        The squeeze run starts from zero and no strategy state is read or
+        updated, so the one-signal-per-direction gating is left to the caller.
+        
+        Args:
+            candles: DataFrame with a 'timestamp' column (or DatetimeIndex)
+                and the bb_upper_x / bb_middle_x / bb_lower_x columns
+            
+        Returns:
+            int8 array aligned with candles: 1 for a long entry, -1 for a
+            short entry and 0 otherwise
+        """
+        sides = np.zeros(len(candles), dtype=np.int8)
+        if candles.empty:
+            return sides
+        
+        if 'timestamp' in candles.columns:
+            timestamps = pd.DatetimeIndex(pd.to_datetime(candles['timestamp']))
+        else:
+            timestamps = pd.DatetimeIndex(candles.index)
+        hhmmss = timestamps.hour * 10000 + timestamps.minute * 100 + timestamps.second
+        in_hours = (hhmmss >= self._market_open_hhmmss) & (hhmmss <= self._market_close_hhmmss)
+        
+        # Same rules as _bb_status, with NaN standing in for missing values
+        bb_upper = pd.to_numeric(candles['bb_upper_x'], errors='coerce').to_numpy(dtype=np.float64)
+        bb_middle = pd.to_numeric(candles['bb_middle_x'], errors='coerce').to_numpy(dtype=np.float64)
+        bb_lower = pd.to_numeric(candles['bb_lower_x'], errors='coerce').to_numpy(dtype=np.float64)
+        positive = (bb_upper > 0) & (bb_middle > 0) & (bb_lower > 0)
+        ordered = (bb_lower < bb_middle) & (bb_middle < bb_upper)
+        flat = (bb_upper == bb_lower) & (bb_lower == bb_middle)
+        active = np.flatnonzero(np.asarray(in_hours) & positive & (ordered | flat))
+        if active.size == 0:
+            return sides
+        
+        lowest_bb_width = self._get_lowest_bb_width_from_csv()
+        squeeze_threshold = round(lowest_bb_width * (1 + self.bb_width_threshold), 2)
+        bb_width = _round2_array(bb_upper[active] - bb_lower[active])
+        squeeze = bb_width <= squeeze_threshold
+        
+        # Length of the squeeze run ending at each active candle
+        position = np.arange(1, active.size + 1)
+        last_break = np.maximum.accumulate(np.where(squeeze, 0, position))
+        squeeze_count = np.where(squeeze, position - last_break, 0)
+        
+        direction = self.config.instrument_key.get("direction")
+        side = 1 if direction == "BULLISH" else -1 if direction == "BEARISH" else 0
+        sides[active[squeeze_count >= self.squeeze_duration_min]] = side
+        return sides
+    
+    async def check_entry_conditions_batch(self, candles: pd.DataFrame) -> np.ndarray:
+        """Run check_entry_conditions_vectorized off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.check_entry_conditions_vectorized, candles)
+    
     def _validate_bb_data(self, candle: Dict[str, Any]) -> bool:
         """Validate that required BB data is present and valid."""
-        required_fields = ['bb_upper_x', 'bb_lower_x', 'bb_middle_x']
+        bb_upper = candle.get('bb_upper_x')
+        bb_lower = candle.get('bb_lower_x')
+        bb_middle = candle.get('bb_middle_x')
         
-        for field in required_fields:
-            if field not in candle:
-                logger.warning(f"Missing required BB field: {field}")
-                return False
-            
-            value = candle[field]
-            if value is None or pd.isna(value) or value <= 0:
-                logger.warning(f"Invalid BB field {field}: {value}")
-                return False
+        try:
+            status = _bb_status(float(bb_upper), float(bb_middle), float(bb_lower))
+        except (TypeError, ValueError):
+            # Missing field, None or pd.NA
+            status = _BB_INVALID
         
-        # Validate BB relationships
-        bb_upper = candle['bb_upper_x']
-        bb_lower = candle['bb_lower_x']
-        bb_middle = candle['bb_middle_x']
-
-        if bb_upper == bb_lower == bb_middle:
-            logger.warning(f"No buy sell on candle {candle['timestamp']}")
+        if status == _BB_VALID:
             return True
         
-        if bb_upper < bb_lower:
-            logger.warning(f"Invalid BB relationship: upper ({bb_upper}) < lower ({bb_lower})")
-            return False
-        
-        if not (bb_lower < bb_middle < bb_upper):
-            logger.warning(f"Invalid BB relationship: middle ({bb_middle}) not between upper ({bb_upper}) and lower ({bb_lower})")
-            return False
+        if status == _BB_FLAT:
+            logger.warning(f"No buy sell on candle {candle.get('timestamp')}")
+            return True
         
-        return True
+        logger.warning(f"Invalid BB data: upper ({bb_upper}), middle ({bb_middle}), lower ({bb_lower})")
+        return False
     
     def _get_lowest_bb_width_from_csv(self) -> float:
         """
@@ -212,14 +347,42 @@ class BBWidthEntryStrategy(EntryStrategy):
             logger.error(f"Error reading BB width analysis CSV: {e}")
             return 0.001  # Default fallback value
     
+    def _reset_bb_width_history(self) -> None:
+        """Allocate an empty BB width ring buffer and sliding-window minimum."""
+        self._bb_width_buf = np.empty(self.max_history_length, dtype=np.float64)
+        self._bb_width_head = 0  # Next slot to write
+        self._bb_width_count = 0  # Total widths pushed since reset
+        self._bb_width_min = deque()  # (width, push index) pairs with increasing widths
+
+    @property
+    def bb_width_history(self) -> np.ndarray:
+        """BB widths currently in the lookback window, oldest first."""
+        if self._bb_width_count < self.max_history_length:
+            return self._bb_width_buf[:self._bb_width_count]
+        return np.roll(self._bb_width_buf, -self._bb_width_head)
+
+    @bb_width_history.setter
+    def bb_width_history(self, widths: Iterable[float]) -> None:
+        self._reset_bb_width_history()
+        for bb_width in widths:
+            self._update_bb_width_history(bb_width)
+
     def _update_bb_width_history(self, bb_width: float) -> None:
-        """Update BB width history for lowest calculation."""
+        """Update BB width history and the lowest width over the window in O(1) amortized."""
         if bb_width > 0:
-            self.bb_width_history.append(bb_width)
+            push_idx = self._bb_width_count
+            self._bb_width_buf[self._bb_width_head] = bb_width
+            self._bb_width_head = (self._bb_width_head + 1) % self.max_history_length
+            self._bb_width_count = push_idx + 1
             
-            # Keep only the last max_history_length values
-            if len(self.bb_width_history) > self.max_history_length:
-                self.bb_width_history = self.bb_width_history[-self.max_history_length:]
+            # Drop widths that can never be the minimum again, then any that left the window
+            window_min = self._bb_width_min
+            while window_min and window_min[-1][0] >= bb_width:
+                window_min.pop()
+            window_min.append((bb_width, push_idx))
+            if window_min[0][1] <= push_idx - self.max_history_length:
+                window_min.popleft()
+            self.lowest_bb_width = window_min[0][0]
     
     def _check_entry_conditions(self, candle: Dict[str, Any], timestamp: datetime, candle_info: str) -> Optional[Signal]:
         """Check for actual entry conditions during squeeze."""
@@ -309,12 +472,8 @@ class BBWidthEntryStrategy(EntryStrategy):
         if isinstance(time_str, pd.Timestamp):
             time_str = time_str.strftime('%Y-%m-%d %H:%M:%S')
             
-        open_price = candle.get('open', 0)
-        high_price = candle.get('high', 0)
-        low_price = candle.get('low', 0)
-        close_price = candle.get('close', 0)
-        
-        return f"[{time_str}] [O:{open_price:.2f} H:{high_price:.2f} L:{low_price:.2f} C:{close_price:.2f}] - "
+        return _CANDLE_INFO_TEMPLATE % (time_str, candle.get('open', 0), candle.get('high', 0),
+                                        candle.get('low', 0), candle.get('close', 0))
     
     def reset_state(self) -> None:
         """Reset the entry strategy state."""
@@ -328,7 +487,7 @@ class BBWidthEntryStrategy(EntryStrategy):
         self.bb_lower = None
         self.bb_middle = None
         self.current_bb_width = None
-        self.bb_width_history = []
+        self._reset_bb_width_history()
         
         # Reset base class state
         self.can_generate_long = True
@@ -25,7 +25,7 @@ class FirstEntryStrategy(EntryStrategy):
         self.mr_high_with_buffer = None
         self.mr_low_with_buffer = None
     
-    async def check_entry_conditions(self, 
+    def check_entry_conditions_sync(self, 
                                candle: Dict[str, Any], 
                                mr_values: Dict[str, Any]) -> Optional[Signal]:
         """
@@ -39,7 +39,7 @@ class TwoThirtyEntryStrategy(EntryStrategy):
         self.in_long_trade = False
         self.in_short_trade = False
     
-    async def check_entry_conditions(self, 
+    def check_entry_conditions_sync(self, 
                                candle: Dict[str, Any], 
                                mr_values: Dict[str, Any]) -> Optional[Signal]:
         """
@@ -11,6 +11,8 @@ from datetime import datetime
 from typing import Optional, Dict, Any, List
 import logging
 
+from ..utils.dataclass_compat import DATACLASS_SLOTS
+
 logger = logging.getLogger(__name__)
 
 class SignalType(Enum):
@@ -36,7 +38,7 @@ class SignalDirection(Enum):
     LONG = "LONG"
     SHORT = "SHORT"
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class Signal:
     """
     Represents a trading signal generated by the strategy.
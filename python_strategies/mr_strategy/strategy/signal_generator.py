@@ -9,18 +9,57 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Union, Any, Tuple
 from datetime import datetime, time, timedelta
+from functools import lru_cache
 import logging
 
 from .morning_range import MorningRangeCalculator
 from .config import MRStrategyConfig, BreakoutState
 from .models import Signal, SignalType, SignalDirection, SignalGroup
 from ..data.data_processor import CandleProcessor
+from ..utils.numba_compat import njit
 from .entry_strategies.factory import EntryStrategyFactory
 
 # Configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+@lru_cache(maxsize=4096)
+def _parse_timestamp(value: str) -> pd.Timestamp:
+    """Parse a candle timestamp string; repeated strings hit the cache."""
+    return pd.Timestamp(value)
+
+# 1ST_ENTRY skips the first 5min candle of the day (9:15 AM), as seconds since midnight
+_FIRST_CANDLE_SECONDS = 9 * 3600 + 15 * 60
+
+# 1ST_ENTRY buffer applied to the morning range high/low (0.07%)
+_FIRST_ENTRY_BUFFER = 0.0007
+
+@njit(cache=True)
+def _scan_first_breakout(high, low, seconds, mr_high_with_buffer, mr_low_with_buffer,
+                         allow_long, allow_short, skip_seconds):
+    """
+    Scan candles for the first immediate breakout of the buffered morning range.
+
+    Returns parallel arrays of direction (1 long, -1 short, 0 none) and entry
+    price (NaN where no signal). At most one row fires, since 1ST_ENTRY takes
+    only one trade per day.
+    """
+    n = high.shape[0]
+    direction = np.zeros(n, dtype=np.int8)
+    price = np.full(n, np.nan)
+    for i in range(n):
+        if seconds[i] == skip_seconds:
+            continue
+        if allow_long and high[i] >= mr_high_with_buffer:
+            direction[i] = 1
+            price[i] = mr_high_with_buffer
+            break
+        if allow_short and low[i] <= mr_low_with_buffer:
+            direction[i] = -1
+            price[i] = mr_low_with_buffer
+            break
+    return direction, price
+
 class SignalGenerator:
     """Generator for Morning Range strategy trading signals."""
     
@@ -97,13 +136,22 @@ class SignalGenerator:
         Returns:
             List of signals (empty if conditions not met)
         """
+        return self.process_candle_sync(candle, mr_values)
+    
+    def process_candle_sync(self, candle: Dict[str, Any], mr_values: Dict[str, Any]) -> List[Signal]:
+        """Synchronous body of process_candle, called directly by the backtest loops."""
         # Skip if MR is not valid
-        if self.entry_strategy.config.entry_type == "1ST_ENTRY" and not mr_values.get('is_valid', False):
+        if self.entry_type == "1ST_ENTRY" and not mr_values.get('is_valid', False):
             logger.debug("Skipping signal generation - Invalid MR values")
             return []
             
+        # Parse string timestamps once here instead of in every entry strategy
+        timestamp = candle.get('timestamp')
+        if isinstance(timestamp, str):
+            candle = {**candle, 'timestamp': _parse_timestamp(timestamp)}
+            
         # Check entry conditions using the entry strategy
-        signal = await self.entry_strategy.check_entry_conditions(candle, mr_values)
+        signal = self.entry_strategy.check_entry_conditions_sync(candle, mr_values)
         
         if signal:
             # Update signal state for backward compatibility
@@ -125,12 +173,12 @@ class SignalGenerator:
             
         return []
     
-    def process_candles(self, candles: pd.DataFrame, mr_values: Dict[str, Any]) -> List[Signal]:
+    def process_candles(self, candles: Union[pd.DataFrame, np.ndarray], mr_values: Dict[str, Any]) -> List[Signal]:
         """
         Process multiple candles and generate all signals.
         
         Args:
-            candles: DataFrame with candle data
+            candles: DataFrame with candle data or a CANDLE_DTYPE array
             mr_values: Morning range values
             
         Returns:
@@ -139,14 +187,94 @@ class SignalGenerator:
         logger.info(f"Processing {len(candles)} candles")
         all_signals = []
         
-        for _, candle in candles.iterrows():
-            candle_dict = candle.to_dict()
-            signals = self.process_candle(candle_dict, mr_values)
+        tz = None
+        if isinstance(candles, pd.DataFrame) and 'timestamp' in candles.columns:
+            tz = pd.DatetimeIndex(pd.to_datetime(candles['timestamp'])).tz
+        records = self.data_processor.to_candle_array(candles)
+        
+        for candle_dict in self.data_processor.candles_to_dicts(records, tz):
+            signals = self.process_candle_sync(candle_dict, mr_values)
             all_signals.extend(signals)
         
         logger.info(f"Generated total of {len(all_signals)} signals")
         return all_signals
     
+    def process_candles_bulk(self, candles: pd.DataFrame, mr_values: Dict[str, Any]) -> List[Signal]:
+        """
+        Process a day of candles for 1ST_ENTRY in a single compiled scan.
+
+        Produces the same signal, and leaves the same state, as feeding the
+        candles one by one through process_candle, without the per-candle
+        dict and coroutine overhead.
+        
+        Args:
+            candles: DataFrame with timestamp, high and low columns
+            mr_values: Morning range values
+            
+        Returns:
+            List of generated signals (at most one)
+        """
+        if self.entry_type != "1ST_ENTRY":
+            raise ValueError(f"Bulk candle processing is not supported for entry type {self.entry_type}")
+        if not mr_values.get('is_valid', False):
+            logger.debug("Skipping signal generation - Invalid MR values")
+            return []
+        if 'mr_high' not in mr_values or 'mr_low' not in mr_values:
+            logger.warning("Missing morning range high/low values")
+            return []
+        
+        strategy = self.entry_strategy
+        if candles.empty or strategy.in_long_trade or strategy.in_short_trade:
+            return []
+        
+        mr_high_with_buffer, mr_low_with_buffer = strategy._add_buffer_to_mr_values(mr_values, _FIRST_ENTRY_BUFFER)
+        timestamps = pd.to_datetime(candles['timestamp'])
+        seconds = (timestamps.dt.hour * 3600 + timestamps.dt.minute * 60 + timestamps.dt.second).to_numpy(dtype=np.int64)
+        direction, price = _scan_first_breakout(
+            candles['high'].to_numpy(dtype=np.float64),
+            candles['low'].to_numpy(dtype=np.float64),
+            seconds,
+            mr_high_with_buffer,
+            mr_low_with_buffer,
+            strategy.can_generate_signal(SignalType.IMMEDIATE_BREAKOUT.value, "LONG"),
+            strategy.can_generate_signal(SignalType.IMMEDIATE_BREAKOUT.value, "SHORT"),
+            _FIRST_CANDLE_SECONDS
+        )
+        
+        fired = np.flatnonzero(direction)
+        if fired.size == 0:
+            return []
+        
+        # Wrap only the row that fired, mirroring FirstEntryStrategy's state updates
+        idx = fired[0]
+        timestamp = timestamps.iloc[idx]
+        signal_direction = SignalDirection.LONG if direction[idx] == 1 else SignalDirection.SHORT
+        if signal_direction == SignalDirection.LONG:
+            strategy.in_long_trade = True
+        else:
+            strategy.in_short_trade = True
+        strategy.update_signal_state(SignalType.IMMEDIATE_BREAKOUT.value, signal_direction.value)
+        
+        signal = Signal(
+            type=SignalType.IMMEDIATE_BREAKOUT,
+            direction=signal_direction,
+            timestamp=timestamp,
+            price=float(price[idx]),
+            mr_values=mr_values,
+            range_values={},
+            metadata={'breakout_type': 'immediate', 'entry_type': '1st_entry', 'entry_time': timestamp.strftime('%H:%M')}
+        )
+        
+        self.update_signal_state(signal.type, signal.direction)
+        self.active_signal_groups.append(SignalGroup(
+            signals=[signal],
+            start_time=signal.timestamp,
+            end_time=signal.timestamp,
+            status='active'
+        ))
+        logger.info(f"Generated signal: {signal}")
+        return [signal]
+    
     def update_signal_state(self, signal_type: SignalType, direction: SignalDirection) -> None:
         """
         Update the signal state after generating a signal.
@@ -219,10 +347,9 @@ class SignalGenerator:
         # Reset state before scanning
         self.reset_state()
         
-        # Process each candle
-        for idx, candle in candles.iterrows():
-            candle_dict = candle.to_dict()
-            signals = self.process_candle(candle_dict, mr_values)
+        # Process each candle; to_dict('records') avoids building a Series per row like iterrows
+        for idx, candle_dict in zip(candles.index, candles.to_dict('records')):
+            signals = self.process_candle_sync(candle_dict, mr_values)
             
             if signals:
                 signal = signals[0]  # Take first signal
@@ -5,8 +5,8 @@ This module enhances the basic trade manager with advanced features like
 multiple take profit levels, dynamic stop loss, breakeven, and trailing stops.
 """
 
-from dataclasses import dataclass
-from enum import Enum
+from dataclasses import dataclass, field
+from enum import IntEnum
 import math
 from typing import Dict, Optional, Union, List, Tuple, Any
 import logging
@@ -17,30 +17,63 @@ from datetime import timezone, timedelta
 
 from utils.utils import round_string
 
+from ..utils.dataclass_compat import DATACLASS_SLOTS
 from .models import SignalType, SignalDirection
 
 logger = logging.getLogger(__name__)
 
-class TradeStatus(Enum):
-    """Status of a trade."""
-    PENDING = "pending"
-    ACTIVE = "active"
-    PARTIAL_TAKE_PROFIT = "partial_tp"
-    TRAILING = "trailing"
-    BREAKEVEN = "breakeven"
-    STOPPED_OUT = "stopped_out"
-    TAKE_PROFIT = "take_profit"
-    CLOSED = "closed"
-    EXPIRED = "expired"
-    REJECTED = "rejected"
-
-class TradeType(Enum):
-    """Type of trade entry."""
-    IMMEDIATE_BREAKOUT = "IMMEDIATE_BREAKOUT"
-    RETEST_ENTRY = "RETEST_ENTRY"
-    TWO_THIRTY_ENTRY = "TWO_THIRTY_ENTRY"
-
-@dataclass
+# Naive candle timestamps are interpreted as IST
+_IST = timezone(timedelta(hours=5, minutes=30))
+
+def _epoch_seconds(ts: datetime) -> float:
+    """Seconds since the epoch for a candle timestamp."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=_IST)
+    return ts.timestamp()
+
+class TradeStatus(IntEnum):
+    """Status of a trade, stored on the trade dict as an integer code."""
+    PENDING = 0
+    ACTIVE = 1
+    PARTIAL_TAKE_PROFIT = 2
+    TRAILING = 3
+    BREAKEVEN = 4
+    STOPPED_OUT = 5
+    TAKE_PROFIT = 6
+    CLOSED = 7
+    EXPIRED = 8
+    REJECTED = 9
+
+class TradeType(IntEnum):
+    """Type of trade entry, stored on the trade dict as an integer code."""
+    IMMEDIATE_BREAKOUT = 0
+    RETEST_ENTRY = 1
+    TWO_THIRTY_ENTRY = 2
+
+# Output names indexed by integer code, used only at serialization boundaries
+_STATUS_NAMES = (
+    "pending",
+    "active",
+    "partial_tp",
+    "trailing",
+    "breakeven",
+    "stopped_out",
+    "take_profit",
+    "closed",
+    "expired",
+    "rejected",
+)
+_TRADE_TYPE_NAMES = ("IMMEDIATE_BREAKOUT", "RETEST_ENTRY", "TWO_THIRTY_ENTRY")
+
+# Bits of TradeConfig._tp_flags
+_TP_TRAIL = 1
+_TP_MOVE_SL_TO_BE = 2
+
+def _fmt(value: float) -> float:
+    """Round a price level for reporting; internal levels stay unrounded."""
+    return round(value, 2)
+
+@dataclass(**DATACLASS_SLOTS)
 class TakeProfitLevel:
     """Configuration for a take profit level."""
     r_multiple: float  # Target in R multiples
@@ -48,7 +81,7 @@ class TakeProfitLevel:
     trail_activation: bool = False  # Whether to activate trailing stop
     move_sl_to_be: bool = False  # Whether to move stop loss to breakeven
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class TradeConfig:
     """ configuration for trade management."""
     sl_percentage: float  # Stop loss percentage
@@ -63,8 +96,25 @@ class TradeConfig:
     min_risk_reward: float  # Minimum risk-reward ratio
     dynamic_sl_adjustment: bool  # Whether to enable dynamic SL adjustment
     initial_capital: float  # Initial capital for profit percentage calculation
+    _sl_frac: float = field(init=False, repr=False)  # sl_percentage as a fraction
+    _trail_step: float = field(init=False, repr=False)  # trail_step_percentage as a fraction
+    _tp_r: np.ndarray = field(init=False, repr=False, compare=False)  # TP targets in R
+    _tp_size: np.ndarray = field(init=False, repr=False, compare=False)  # TP exit size as a fraction
+    _tp_flags: np.ndarray = field(init=False, repr=False, compare=False)  # _TP_TRAIL | _TP_MOVE_SL_TO_BE
 
-@dataclass
+    def __post_init__(self):
+        """Normalize percentages once so per-candle code only multiplies."""
+        self._sl_frac = self.sl_percentage / 100
+        self._trail_step = self.trail_step_percentage / 100
+        self._tp_r = np.array([tp.r_multiple for tp in self.take_profit_levels], dtype=np.float64)
+        self._tp_size = np.array([tp.size_percentage / 100 for tp in self.take_profit_levels], dtype=np.float64)
+        self._tp_flags = np.array(
+            [(_TP_TRAIL if tp.trail_activation else 0) | (_TP_MOVE_SL_TO_BE if tp.move_sl_to_be else 0)
+             for tp in self.take_profit_levels],
+            dtype=np.uint8
+        )
+
+@dataclass(**DATACLASS_SLOTS)
 class TradeMetrics:
     """Metrics for trade tracking."""
     entry_price: float
@@ -121,52 +171,35 @@ class TradeManager:
         """Calculate multiple trade levels including all take profit targets."""
         candle_info = self._format_candle_info(candle_data) if candle_data else ""
         
-        sl_pct = sl_percentage if sl_percentage is not None else self.config.sl_percentage
+        sl_frac = self.config._sl_frac if sl_percentage is None else sl_percentage / 100
         
         # Calculate base levels
         if position_type == "LONG":
-            stop_loss = entry_price * (1 - sl_pct/100)
+            stop_loss = entry_price * (1 - sl_frac)
             risk_amount = entry_price - stop_loss
             breakeven_level = entry_price + (risk_amount * self.config.breakeven_r)
             
             # Calculate multiple take profit levels
-            take_profit_levels = [
-                {
-                    "price": entry_price + (risk_amount * tp.r_multiple),
-                    "size_percentage": tp.size_percentage,
-                    "r_multiple": tp.r_multiple,
-                    "trail_activation": tp.trail_activation,
-                    "move_sl_to_be": tp.move_sl_to_be
-                }
-                for tp in self.config.take_profit_levels
-            ]
+            take_profit_prices = entry_price + risk_amount * self.config._tp_r
         else:  # SHORT
-            stop_loss = entry_price * (1 + sl_pct/100)
+            stop_loss = entry_price * (1 + sl_frac)
             risk_amount = stop_loss - entry_price
             breakeven_level = entry_price - (risk_amount * self.config.breakeven_r)
             
             # Calculate multiple take profit levels
-            take_profit_levels = [
-                {
-                    "price": entry_price - (risk_amount * tp.r_multiple),
-                    "size_percentage": tp.size_percentage,
-                    "r_multiple": tp.r_multiple,
-                    "trail_activation": tp.trail_activation,
-                    "move_sl_to_be": tp.move_sl_to_be
-                }
-                for tp in self.config.take_profit_levels
-            ]
+            take_profit_prices = entry_price - risk_amount * self.config._tp_r
         
         levels = {
             "entry_price": entry_price,
-            "stop_loss": round(stop_loss, 2),
-            "breakeven_level": round(breakeven_level, 2),
-            "risk_amount": round(risk_amount, 2),
-            "take_profit_levels": take_profit_levels,
+            "stop_loss": stop_loss,
+            "breakeven_level": breakeven_level,
+            "risk_amount": risk_amount,
+            "take_profit_prices": take_profit_prices,
             "initial_position_size": None  # To be set when creating trade
         }
         
-        logger.info(f"{candle_info}Calculated trade levels: {levels}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%sCalculated trade levels: %s", candle_info, levels)
         return levels
 
     def validate_trade_setup(self, 
@@ -266,6 +299,10 @@ class TradeManager:
         #  take care of commission cost 0.03%
         float_breakeven_level = float_breakeven_level * 0.0003
 
+        # Reciprocal of the total rupee risk, so R-multiples are a single multiply
+        risk_total = levels["risk_amount"] * position_size
+        inv_risk_total = 1.0 / risk_total if risk_total > 0 else 0.0
+
         # add mr_values to trade
         if mr_values:
             levels["mr_values"] = mr_values
@@ -279,17 +316,20 @@ class TradeManager:
             "initial_position_size": position_size, # include in backtest trade sheet
             "current_position_size": position_size,
             "position_type": position_type,
-            "trade_type": trade_type.value,
-            "status": TradeStatus.ACTIVE.value,
+            "_is_long": position_type == "LONG",  # direction resolved once for the per-candle kernels
+            "trade_type": int(trade_type),
+            "status": int(TradeStatus.ACTIVE),
             "entry_time": candle_data["timestamp"], # TODO: no significance of this field
+            "_expiry_ts": _epoch_seconds(candle_data["timestamp"]) + self.config.max_trade_duration * 60,
             "entry_time_string": entry_time_string,
             "entry_type": entry_type,
             "stop_loss": levels["stop_loss"], # include in backtest trade sheet
             "breakeven_level": levels["breakeven_level"], # include in backtest trade sheet
             "breakout_even_to_cost": round_string(float_breakeven_level, 2), # include in backtest trade sheet
             "risk_amount": levels["risk_amount"], # include in backtest trade sheet
-            "take_profit_levels": levels["take_profit_levels"],
-            "executed_take_profits": [],
+            "_inv_risk_total": inv_risk_total,
+            "_tp_price": levels["take_profit_prices"].tolist(),  # indexed like config.take_profit_levels
+            "_tp_hit": 0,  # bit i set once take profit level i has been executed
             "unrealized_pnl": 0.0,
             "realized_pnl": 0.0,
             "max_favorable_excursion": 0.0,
@@ -311,7 +351,8 @@ class TradeManager:
         
         # Add trade to active trades
         self.active_trades[instrument_key] = trade
-        logger.info(f"{candle_info}Created new trade: {trade}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%sCreated new trade: %s", candle_info, trade)
         return trade
 
     def update_trailing_stop(self, trade: Dict, current_price: float, candle_data: Optional[Dict] = None) -> float:
@@ -325,80 +366,110 @@ class TradeManager:
         candle_info = self._format_candle_info(candle_data) if candle_data else ""
         
         # Get executed take profits
-        executed_tps = trade.get("executed_take_profits", [])
-    
-        if not executed_tps:
+        if not trade["_tp_hit"]:
             # No TP hit, use breakeven
             return trade["entry_price"]
         
         # Get the highest TP level hit
-        highest_tp = max(executed_tps, key=lambda x: x["r_multiple"])
+        highest_r = self.config._tp_r[self._tp_hit_indices(trade)].max()
         
-        if highest_tp["r_multiple"] >= 7.0:  # TP3 hit
+        if highest_r >= 7.0:  # TP3 hit
             # Find TP2 level
-            tp2 = next((tp for tp in trade["take_profit_levels"] 
-                       if tp["r_multiple"] == 5.0), None)
-            if tp2:
-                logger.info(f"{candle_info}TP3 hit, moving stop to TP2 level: {tp2['price']}")
-                return tp2["price"]
+            tp2_price = self._tp_price_at_r(trade, 5.0)
+            if tp2_price is not None:
+                logger.info(f"{candle_info}TP3 hit, moving stop to TP2 level: {tp2_price}")
+                return tp2_price
             return trade["entry_price"]
         
-        elif highest_tp["r_multiple"] >= 5.0:  # TP2 hit
+        elif highest_r >= 5.0:  # TP2 hit
             # Find TP1 level
-            tp1 = next((tp for tp in trade["take_profit_levels"] 
-                       if tp["r_multiple"] == 3.0), None)
-            if tp1:
-                logger.info(f"{candle_info}TP2 hit, moving stop to TP1 level: {tp1['price']}")
-                return tp1["price"]
+            tp1_price = self._tp_price_at_r(trade, 3.0)
+            if tp1_price is not None:
+                logger.info(f"{candle_info}TP2 hit, moving stop to TP1 level: {tp1_price}")
+                return tp1_price
             return trade["entry_price"]
         
         else:  # TP1 hit
             logger.info(f"{candle_info}TP1 hit, moving stop to breakeven: {trade['entry_price']}")
             return trade["entry_price"]  # Use breakeven
 
-    def check_take_profit_levels(self, trade: Dict, current_price: float, candle_data: Optional[Dict] = None) -> Optional[Dict]:
-        """Check if any take profit level is hit."""
+    def _tp_hit_indices(self, trade: Dict) -> List[int]:
+        """Indices of the take profit levels already executed for a trade."""
+        hit_mask = trade["_tp_hit"]
+        return [idx for idx in range(len(self.config._tp_r)) if (hit_mask >> idx) & 1]
+
+    def _tp_price_at_r(self, trade: Dict, r_multiple: float) -> Optional[float]:
+        """Price of the trade's take profit level at r_multiple, if one is configured."""
+        matches = np.flatnonzero(self.config._tp_r == r_multiple)
+        if matches.size == 0:
+            return None
+        return float(trade["_tp_price"][matches[0]])
+
+    def _take_profit_levels(self, trade: Dict, indices: Optional[List[int]] = None) -> List[Dict]:
+        """Expand a trade's take profit arrays into per-level dicts for reporting."""
+        if indices is None:
+            indices = range(len(self.config._tp_r))
+        return [
+            {
+                "idx": idx,
+                "price": float(trade["_tp_price"][idx]),
+                "size_percentage": self.config.take_profit_levels[idx].size_percentage,
+                "r_multiple": self.config.take_profit_levels[idx].r_multiple,
+                "trail_activation": self.config.take_profit_levels[idx].trail_activation,
+                "move_sl_to_be": self.config.take_profit_levels[idx].move_sl_to_be
+            }
+            for idx in indices
+        ]
+
+    def serialize_trade(self, trade: Dict) -> Dict:
+        """Return a copy of a trade with internal codes and arrays translated for output."""
+        record = {key: value for key, value in trade.items() if not key.startswith("_")}
+        record["take_profit_levels"] = self._take_profit_levels(trade)
+        record["executed_take_profits"] = self._take_profit_levels(trade, self._tp_hit_indices(trade))
+        record["status"] = _STATUS_NAMES[trade["status"]]
+        record["trade_type"] = _TRADE_TYPE_NAMES[trade["trade_type"]]
+        record["stop_loss"] = _fmt(trade["stop_loss"])
+        record["breakeven_level"] = _fmt(trade["breakeven_level"])
+        record["risk_amount"] = _fmt(trade["risk_amount"])
+        return record
+
+    def check_take_profit_levels(self, trade: Dict, current_price: float, candle_data: Optional[Dict] = None) -> Optional[int]:
+        """Check if any take profit level is hit, returning its index."""
         candle_info = self._format_candle_info(candle_data) if candle_data else ""
         
-        for tp_level in trade["take_profit_levels"]:
-            if tp_level in trade["executed_take_profits"]:
-                continue
-                
-            price_hit = False
-            if trade["position_type"] == "LONG":
-                price_hit = current_price >= tp_level["price"]
-            else:  # SHORT
-                price_hit = current_price <= tp_level["price"]
-                
-            if price_hit:
-                logger.info(f"{candle_info}Take profit level detected: {tp_level['r_multiple']}R at price {tp_level['price']}")
-                self.update_trailing_stop(trade, current_price, candle_data)
-                return tp_level
-        
-        return None
+        # First unexecuted level reached in the trade's direction
+        hit_mask = trade["_tp_hit"]
+        is_long = trade["_is_long"]
+        for tp_idx, tp_price in enumerate(trade["_tp_price"]):
+            if not (hit_mask >> tp_idx) & 1 and (current_price >= tp_price if is_long else current_price <= tp_price):
+                break
+        else:
+            return None
+        
+        logger.info(f"{candle_info}Take profit level detected: {self.config._tp_r[tp_idx]}R at price {trade['_tp_price'][tp_idx]}")
+        self.update_trailing_stop(trade, current_price, candle_data)
+        return tp_idx
 
     def execute_partial_exit(self, 
                            trade: Dict, 
-                           tp_level: Dict,
+                           tp_idx: int,
                            current_price: float,
                            candle_data: Optional[Dict] = None) -> Dict:
-        """Execute a partial position exit at take profit level."""
+        """Execute a partial position exit at take profit level tp_idx."""
         candle_info = self._format_candle_info(candle_data) if candle_data else ""
         
-        exit_size = trade["initial_position_size"] * (tp_level["size_percentage"] / 100)
+        exit_size = trade["initial_position_size"] * float(self.config._tp_size[tp_idx])
         remaining_size = trade["current_position_size"] - exit_size
         
         # Calculate realized P&L for this partial exit
-        if trade["position_type"] == "LONG":
-            realized_pnl = (current_price - trade["entry_price"]) * exit_size
-        else:  # SHORT
-            realized_pnl = (trade["entry_price"] - current_price) * exit_size
+        price_move = current_price - trade["entry_price"]
+        realized_pnl = (price_move if trade["_is_long"] else -price_move) * exit_size
         
         partial_exit = {
             "exit_price": current_price,
             "exit_size": exit_size,
             "realized_pnl": realized_pnl,
-            "r_multiple": tp_level["r_multiple"],
+            "r_multiple": float(self.config._tp_r[tp_idx]),
             "exit_time": datetime.now(),
             "exit_candle": candle_data
         }
@@ -406,16 +477,17 @@ class TradeManager:
         # Update trade
         trade["current_position_size"] = remaining_size
         trade["realized_pnl"] += realized_pnl
-        trade["executed_take_profits"].append(tp_level)
+        trade["_tp_hit"] |= 1 << tp_idx
         trade["partial_exits"].append(partial_exit)
         
         # Check if we should move to breakeven
-        if tp_level["move_sl_to_be"]:
+        if self.config._tp_flags[tp_idx] & _TP_MOVE_SL_TO_BE:
             trade["stop_loss"] = trade["entry_price"]
-            trade["status"] = TradeStatus.BREAKEVEN.value
+            trade["status"] = int(TradeStatus.BREAKEVEN)
             logger.info(f"{candle_info}Moving stop loss to breakeven after partial exit")
         
-        logger.info(f"{candle_info}Executed partial exit: {partial_exit}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%sExecuted partial exit: %s", candle_info, partial_exit)
         return trade
 
     def update_trade(self, 
@@ -457,44 +529,35 @@ class TradeManager:
                 candle_data=candle_data
             )
         
-        one_two_size_price = 0
-        one_two_ratio_done = False
         # Update unrealized P&L
-        if trade["position_type"] == "LONG":
-            trade["unrealized_pnl"] = (current_price - trade["entry_price"]) * trade["current_position_size"]
-            one_two_size_price = trade["entry_price"] + ((trade["entry_price"] - trade["stop_loss"]) * 2)
-            if current_price >= one_two_size_price:
-                one_two_ratio_done = True   
-        else:  # SHORT
-            trade["unrealized_pnl"] = (trade["entry_price"] - current_price) * trade["current_position_size"]
-            one_two_size_price = trade["entry_price"] - ((trade["stop_loss"] - trade["entry_price"]) * 2)
-            if current_price <= one_two_size_price:
-                one_two_ratio_done = True
-        # Update MAE/MFE
-        trade["max_favorable_excursion"] = max(
-            trade["max_favorable_excursion"],
-            trade["unrealized_pnl"]
-        )
-        trade["max_adverse_excursion"] = min(
-            trade["max_adverse_excursion"],
-            trade["unrealized_pnl"]
-        )
+        is_long = trade["_is_long"]
+        price_move = current_price - trade["entry_price"]
+        pnl = (price_move if is_long else -price_move) * trade["current_position_size"]
+        trade["unrealized_pnl"] = pnl
+        one_two_size_price = trade["entry_price"] + ((trade["entry_price"] - trade["stop_loss"]) * 2)
+        one_two_ratio_done = current_price >= one_two_size_price if is_long else current_price <= one_two_size_price
+        # Update MAE/MFE; MFE starts at 0 and MAE at 0, so a new high can't also be a new low
+        if pnl > trade["max_favorable_excursion"]:
+            trade["max_favorable_excursion"] = pnl
+        elif pnl < trade["max_adverse_excursion"]:
+            trade["max_adverse_excursion"] = pnl
         
         # If price reaches 1:1R, move SL to breakeven
         if trade["trailing_stop_active"] == False and one_two_ratio_done == True:
             logger.info(f"{candle_info}Price reached 1:2R, moving SL to breakeven")
             trade["trailing_stop_active"] = True
-            trade["status"] = TradeStatus.TRAILING.value
+            trade["status"] = int(TradeStatus.TRAILING)
             trade["moved_to_one_two_size"] = False
             new_stop = trade["entry_price"]
             trade["stop_loss"] = new_stop
             logger.info(f"{candle_info}Updated trailing stop to Breakeven: {new_stop}")
         
         # Check take profit levels
-        tp_level = self.check_take_profit_levels(trade, current_price, candle_data)
-        if tp_level is not None:
-            logger.info(f"{candle_info}Take profit level hit: {tp_level} at candle price: {current_price}")
-            trade = self.execute_partial_exit(trade, tp_level, current_price, candle_data)
+        tp_idx = self.check_take_profit_levels(trade, current_price, candle_data)
+        if tp_idx is not None:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("%sTake profit level hit: %sR at candle price: %s", candle_info, self.config._tp_r[tp_idx], current_price)
+            trade = self.execute_partial_exit(trade, tp_idx, current_price, candle_data)
             
             # Check if position is fully closed
             if trade["current_position_size"] == 0:
@@ -505,13 +568,9 @@ class TradeManager:
                     candle_data
                 )
         
-        IST = timezone(timedelta(hours=5, minutes=30))
-        if trade["entry_time"].tzinfo is None:
-            trade["entry_time"] = trade["entry_time"].replace(tzinfo=IST)
-
-        # Check trade duration
-        trade_duration = (candle_data.get("timestamp", "unknown") - trade["entry_time"]).total_seconds() / 60
-        if trade_duration > self.config.max_trade_duration:
+        # Check trade duration after TP handling, so a TP that closes the position
+        # on the expiry candle is still reported as TAKE_PROFIT
+        if _epoch_seconds(candle_data["timestamp"]) > trade["_expiry_ts"]:
             logger.info(f"{candle_info}Trade duration exceeded maximum {self.config.max_trade_duration} minutes")
             return self.close_trade(
                 instrument_key,
@@ -538,32 +597,28 @@ class TradeManager:
         
         # Calculate final realized P&L including any remaining position
         if trade["current_position_size"] > 0:
-            if trade["position_type"] == "LONG":
-                final_pnl = (exit_price - trade["entry_price"]) * trade["current_position_size"]
-            else:  # SHORT
-                final_pnl = (trade["entry_price"] - exit_price) * trade["current_position_size"]
-            
+            price_move = exit_price - trade["entry_price"]
+            final_pnl = (price_move if trade["_is_long"] else -price_move) * trade["current_position_size"]
+
             trade["realized_pnl"] += final_pnl
             if final_pnl > 0:
                 self.winning_trades += 1
             else:
                 self.losing_trades += 1
 
-        # Define IST timezone
-        IST = timezone(timedelta(hours=5, minutes=30))
         if trade["entry_time"].tzinfo is None:
-            trade["entry_time"] = trade["entry_time"].replace(tzinfo=IST)
+            trade["entry_time"] = trade["entry_time"].replace(tzinfo=_IST)
         
         # Update trade metrics
         trade["exit_price"] = exit_price # include in backtest trade sheet
         trade["exit_time"] = candle_data.get("timestamp", "unknown") # include in backtest trade sheet
         trade["exit_candle"] = candle_data
-        trade["status"] = status.value
+        trade["status"] = int(status)
         trade["duration"] = round(((trade["exit_time"] - trade["entry_time"]).total_seconds() / 60) / 60, 2) # include in backtest trade sheet
         trade["max_r_multiple"] = round(abs(trade["entry_price"] - exit_price) / trade["initial_r_multiple"], 2) # include in backtest trade sheet
         # Calculate overall R-multiple
         if trade["risk_amount"] > 0:
-            trade["r_multiple"] = round(trade["realized_pnl"] / (trade["risk_amount"] * trade["initial_position_size"]), 2) # include in backtest trade sheet
+            trade["r_multiple"] = round(trade["realized_pnl"] * trade["_inv_risk_total"], 2) # include in backtest trade sheet
         
         # Add exit reason 
         # include in backtest trade sheet VERY IMPORTANT
@@ -589,7 +644,8 @@ class TradeManager:
         if not same_day_trade:
             self.trade_history.append(trade)
         
-        logger.info(f"{candle_info}Closed trade: {trade}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%sClosed trade: %s", candle_info, trade)
         return trade
 
     def get_trade_metrics(self, instrument_key: str, candle_data: Optional[Dict] = None) -> Dict:
@@ -607,18 +663,18 @@ class TradeManager:
             "current_price": trade["current_price"],
             "initial_position_size": trade["initial_position_size"],
             "current_position_size": trade["current_position_size"],
-            "stop_loss": trade["stop_loss"],
+            "stop_loss": _fmt(trade["stop_loss"]),
             "unrealized_pnl": trade["unrealized_pnl"],
             "realized_pnl": trade["realized_pnl"],
             "total_pnl": trade["unrealized_pnl"] + trade["realized_pnl"],
-            "risk_amount": trade["risk_amount"],
+            "risk_amount": _fmt(trade["risk_amount"]),
             "max_favorable_excursion": trade["max_favorable_excursion"],
             "max_adverse_excursion": trade["max_adverse_excursion"],
             "duration": (datetime.now() - trade["entry_time"]).total_seconds() / 60,
-            "status": trade["status"],
+            "status": _STATUS_NAMES[trade["status"]],
             "trailing_active": trade["trailing_stop_active"],
             "partial_exits": len(trade["partial_exits"]),
-            "remaining_tp_levels": len(trade["take_profit_levels"]) - len(trade["executed_take_profits"]),
+            "remaining_tp_levels": len(self.config._tp_r) - bin(trade["_tp_hit"]).count("1"),
             "exit_reason": trade.get("exit_reason", ""),
             "r_multiple": trade.get("r_multiple", 0.0),
             "current_candle": candle_data
@@ -631,26 +687,24 @@ class TradeManager:
         """Check if stop loss is hit."""
         candle_info = self._format_candle_info(candle_data) if candle_data else ""
         
-        stop_hit = False
         # if the current candle is the same as the entry candle, return False
         if candle_data["timestamp"] == entry_candle["timestamp"]:
             return False
 
-        if trade["position_type"] == "LONG":
-            stop_hit = candle_data['low'] <= trade["stop_loss"]
-        else:  # SHORT
-            stop_hit = candle_data['high'] >= trade["stop_loss"]
+        is_stop_hit = (candle_data['low'] <= trade["stop_loss"] if trade["_is_long"]
+                       else candle_data['high'] >= trade["stop_loss"])
             
-        if stop_hit:
-            logger.info(f"{candle_info}Stop loss hit at price {current_price}, stop level: {trade['stop_loss']}")
+        if is_stop_hit:
+            logger.info(f"{candle_info}Stop loss hit at price {current_price}, stop level: {_fmt(trade['stop_loss'])}")
             
-        return stop_hit
+        return is_stop_hit
 
     def get_trade_statistics(self, candle_data: Optional[Dict] = None) -> Dict:
         """Get overall trade statistics."""
         candle_info = self._format_candle_info(candle_data) if candle_data else ""
         
-        if not self.trade_history:
+        trade_history = self.trade_history
+        if not trade_history:
             return {
                 "total_trades": 0,
                 "winning_trades": 0,
@@ -669,11 +723,11 @@ class TradeManager:
             }
         
         # Separate winning and losing trades
-        winning_trades = [t for t in self.trade_history if t["realized_pnl"] > 0]
-        losing_trades = [t for t in self.trade_history if t["realized_pnl"] <= 0]
+        winning_trades = [t for t in trade_history if t["realized_pnl"] > 0]
+        losing_trades = [t for t in trade_history if t["realized_pnl"] <= 0]
         
         # Calculate basic statistics
-        total_trades = len(self.trade_history)
+        total_trades = len(trade_history)
         winning_count = len(winning_trades)
         losing_count = len(losing_trades)
         
@@ -696,7 +750,7 @@ class TradeManager:
         
         # Calculate other metrics
         profit_factor = total_profit / total_loss if total_loss > 0 else float('inf')
-        avg_r = np.mean([t["r_multiple"] for t in self.trade_history]) if self.trade_history else 0
+        avg_r = np.mean([t["r_multiple"] for t in trade_history]) if trade_history else 0
         overall_pnl = total_profit - total_loss
         
         stats = {
@@ -0,0 +1,32 @@
+"""
+Shared pytest setup for the mr_strategy tests.
+"""
+
+from typing import Any, Dict, NamedTuple
+
+import numpy as np
+import pytest
+
+from ..data.data_processor import _rolling_mean_std
+from ..strategy.entry_strategies.bb_width_entry import _bb_status, _round2_array, _squeeze_step
+from ..strategy.signal_generator import _scan_first_breakout
+
+
+class _FakeCfg(NamedTuple):
+    """Config fields BBWidthEntryStrategy reads, without Mock's attribute dispatch."""
+    bb_width_threshold: float
+    bb_period: int
+    bb_std_dev: float
+    squeeze_duration_min: int
+    squeeze_duration_max: int
+    instrument_key: Dict[str, Any]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_numba():
+    """Compile the Numba kernels once before any test runs, so JIT time is not charged to the first test."""
+    _bb_status(2.0, 1.0, 0.5)
+    _squeeze_step(2.0, 0.5, 1.0, 0.1, False, 0, 3)
+    _round2_array(np.ones(4, dtype=np.float64))
+    _rolling_mean_std(np.ones(30, dtype=np.float64), 20)
+    _scan_first_breakout(np.ones(2), np.ones(2), np.zeros(2, dtype=np.int64), 2.0, 0.5, True, True, 1)
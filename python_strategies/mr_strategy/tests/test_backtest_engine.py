@@ -60,7 +60,6 @@ def sample_data():
     
     return {'RELIANCE': candles}
 
-@pytest.mark.asyncio
 async def test_first_entry_backtest(config, sample_data):
     """Test backtest with first entry strategy."""
     # Configure for first entry
@@ -90,7 +89,6 @@ async def test_first_entry_backtest(config, sample_data):
     assert len(signal_groups) > 0
     assert signal_groups[0].status == 'active'
 
-@pytest.mark.asyncio
 async def test_two_thirty_entry_backtest(config, sample_data):
     """Test backtest with 2:30 PM entry strategy."""
     # Configure for 2:30 entry
@@ -134,7 +132,6 @@ async def test_two_thirty_entry_backtest(config, sample_data):
     assert len(signal_groups) > 0
     assert signal_groups[0].status == 'active'
 
-@pytest.mark.asyncio
 async def test_invalid_entry_type(config):
     """Test backtest with invalid entry type."""
     config['entry_type'] = 'INVALID_ENTRY'
@@ -142,7 +139,6 @@ async def test_invalid_entry_type(config):
     with pytest.raises(ValueError):
         BacktestEngine(config)
 
-@pytest.mark.asyncio
 async def test_no_signals_backtest(config, sample_data):
     """Test backtest with no signal conditions."""
     engine = BacktestEngine(config)
@@ -161,7 +157,6 @@ async def test_no_signals_backtest(config, sample_data):
     assert len(results['trades']) == 0
     assert len(engine.signal_generator.active_signal_groups) == 0
 
-@pytest.mark.asyncio
 async def test_multiple_days_backtest(config):
     """Test backtest over multiple trading days."""
     engine = BacktestEngine(config)
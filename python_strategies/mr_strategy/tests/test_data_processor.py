@@ -4,15 +4,13 @@ from datetime import datetime, timedelta
 from ..data.data_processor import CandleProcessor
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 @pytest.fixture
 def candle_processor():
     return CandleProcessor()
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_daily_candles():
     """Create sample daily candles for ATR calculation"""
     dates = pd.date_range(start='2024-01-01', periods=14, freq='D')
@@ -26,21 +24,21 @@ def sample_daily_candles():
     }
     return pd.DataFrame(data)
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_morning_candles():
     """Create sample 5-minute candles for morning range calculation"""
-    times = pd.date_range(start='2024-01-15 09:15:00', periods=6, freq='5T')
+    times = pd.date_range(start='2024-01-15 09:15:00', periods=6, freq='5min')
     data = {
         'timestamp': times,
         'open': [100, 101, 102, 103, 104, 105],
         'high': [105, 106, 107, 108, 109, 110],
         'low': [95, 96, 97, 98, 99, 100],
         'close': [102, 103, 104, 105, 106, 107],
-        'volume': [1000, 1100, 1200, 1300, 1400, 1500]
+        'volume': [1000, 1100, 1200, 1300, 1400, 1500],
+        'DAILY_ATR_14': [50.0] * 6  # Daily ATR carried on each intraday candle
     }
     return pd.DataFrame(data)
 
-@pytest.mark.asyncio
 async def test_calculate_atr(candle_processor, sample_daily_candles):
     """Test ATR calculation"""
     # Mock the load_daily_data method
@@ -55,9 +53,8 @@ async def test_calculate_atr(candle_processor, sample_daily_candles):
     # Verify ATR calculation
     assert isinstance(atr, float)
     assert atr > 0
-    logger.info(f"Calculated ATR: {atr}")
+    logger.info("Calculated ATR: %s", atr)
 
-@pytest.mark.asyncio
 async def test_calculate_morning_range(candle_processor, sample_morning_candles, sample_daily_candles):
     """Test morning range calculation"""
     # Mock the load_daily_data method
@@ -84,9 +81,8 @@ async def test_calculate_morning_range(candle_processor, sample_morning_candles,
     assert isinstance(mr_values['mr_value'], float)
     assert isinstance(mr_values['is_valid'], bool)
     
-    logger.info(f"Morning Range Values: {mr_values}")
+    logger.info("Morning Range Values: %s", mr_values)
 
-@pytest.mark.asyncio
 async def test_morning_range_validation(candle_processor, sample_morning_candles, sample_daily_candles):
     """Test MR value validation"""
     # Mock the load_daily_data method
@@ -104,9 +100,8 @@ async def test_morning_range_validation(candle_processor, sample_morning_candles
     else:
         assert mr_values['is_valid'] is False
     
-    logger.info(f"MR Validation - Value: {mr_values['mr_value']}, Is Valid: {mr_values['is_valid']}")
+    logger.info("MR Validation - Value: %s, Is Valid: %s", mr_values['mr_value'], mr_values['is_valid'])
 
-@pytest.mark.asyncio
 async def test_empty_data_handling(candle_processor):
     """Test handling of empty data"""
     empty_df = pd.DataFrame()
@@ -121,4 +116,33 @@ async def test_empty_data_handling(candle_processor):
     assert mr_values['mr_low'] == 0
     assert mr_values['mr_size'] == 0
     assert mr_values['mr_value'] == 0
-    assert mr_values['is_valid'] is False 
\ No newline at end of file
+    assert mr_values['is_valid'] is False 
+
+def test_candle_array_round_trip(candle_processor, sample_daily_candles):
+    """Test conversion between candle frames, structured arrays and dicts"""
+    records = candle_processor.to_candle_array(sample_daily_candles)
+    
+    assert len(records) == len(sample_daily_candles)
+    assert records['high'].tolist() == sample_daily_candles['high'].tolist()
+    
+    candle = candle_processor.candle_to_dict(records[0])
+    assert candle['timestamp'] == sample_daily_candles['timestamp'].iloc[0]
+    assert candle['close'] == 102.0
+    assert pd.isna(candle['bb_upper_x'])  # Not in the source frame
+    
+    candles = candle_processor.candles_to_dicts(records)
+    assert len(candles) == len(records)
+    assert {k: v for k, v in candles[0].items() if pd.notna(v)} == {k: v for k, v in candle.items() if pd.notna(v)}
+    assert candles[-1]['timestamp'] == sample_daily_candles['timestamp'].iloc[-1]
+
+def test_bollinger_bands_match_pandas_rolling(candle_processor):
+    """Test the single-pass Bollinger Bands against pandas rolling mean/std"""
+    prices = pd.Series([100 + (i % 7) * 0.5 - (i % 3) for i in range(60)], dtype=float)
+    prices.iloc[30] = float('nan')
+    
+    upper, lower = candle_processor._calculate_bollinger_bands(prices, period=20, std_dev=2)
+    
+    sma = prices.rolling(window=20).mean()
+    std = prices.rolling(window=20).std()
+    pd.testing.assert_series_equal(upper, sma + std * 2, check_exact=False, rtol=1e-9)
+    pd.testing.assert_series_equal(lower, sma - std * 2, check_exact=False, rtol=1e-9)
@@ -11,8 +11,14 @@ from ..strategy.entry_strategies.first_entry import FirstEntryStrategy
 from ..strategy.entry_strategies.two_thirty_entry import TwoThirtyEntryStrategy
 from ..strategy.models import SignalType, SignalDirection
 from ..strategy.config import MRStrategyConfig
+from ..strategy.signal_generator import SignalGenerator
 
-@pytest.fixture
+# Shared candle timestamps (Timestamps are immutable)
+TS_0930 = pd.Timestamp('2024-04-15 09:30:00')
+TS_1415 = pd.Timestamp('2024-04-15 14:15:00')
+TS_1430 = pd.Timestamp('2024-04-15 14:30:00')
+
+@pytest.fixture(scope="module")
 def config():
     """Create test configuration."""
     return MRStrategyConfig(
@@ -22,7 +28,7 @@ def config():
         invalidation_percentage=0.005
     )
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mr_values():
     """Create test morning range values."""
     return {
@@ -32,18 +38,17 @@ def mr_values():
         'is_valid': True
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_candle():
     """Create a sample candle."""
     return {
-        'timestamp': pd.Timestamp('2024-04-15 09:30:00'),
+        'timestamp': TS_0930,
         'open': 95.0,
         'high': 105.0,
         'low': 85.0,
         'close': 100.0
     }
 
-@pytest.mark.asyncio
 async def test_first_entry_strategy_long(config, mr_values, sample_candle):
     """Test first entry strategy long signal."""
     strategy = FirstEntryStrategy(config)
@@ -55,7 +60,6 @@ async def test_first_entry_strategy_long(config, mr_values, sample_candle):
     assert signal.direction == SignalDirection.LONG
     assert signal.price == mr_values['high']
 
-@pytest.mark.asyncio
 async def test_first_entry_strategy_short(config, mr_values, sample_candle):
     """Test first entry strategy short signal."""
     strategy = FirstEntryStrategy(config)
@@ -67,14 +71,13 @@ async def test_first_entry_strategy_short(config, mr_values, sample_candle):
     assert signal.direction == SignalDirection.SHORT
     assert signal.price == mr_values['low']
 
-@pytest.mark.asyncio
 async def test_two_thirty_entry_strategy_long(config, mr_values):
     """Test 2:30 PM entry strategy long signal."""
     strategy = TwoThirtyEntryStrategy(config)
     
     # Create 2:30 PM candle above MR high
     candle = {
-        'timestamp': pd.Timestamp('2024-04-15 14:30:00'),
+        'timestamp': TS_1430,
         'open': 101.0,
         'high': 102.0,
         'low': 100.5,
@@ -87,14 +90,13 @@ async def test_two_thirty_entry_strategy_long(config, mr_values):
     assert signal.direction == SignalDirection.LONG
     assert signal.price == candle['close']
 
-@pytest.mark.asyncio
 async def test_two_thirty_entry_strategy_short(config, mr_values):
     """Test 2:30 PM entry strategy short signal."""
     strategy = TwoThirtyEntryStrategy(config)
     
     # Create 2:30 PM candle below MR low
     candle = {
-        'timestamp': pd.Timestamp('2024-04-15 14:30:00'),
+        'timestamp': TS_1430,
         'open': 89.0,
         'high': 89.5,
         'low': 88.0,
@@ -107,14 +109,13 @@ async def test_two_thirty_entry_strategy_short(config, mr_values):
     assert signal.direction == SignalDirection.SHORT
     assert signal.price == candle['close']
 
-@pytest.mark.asyncio
 async def test_two_thirty_entry_strategy_no_signal(config, mr_values):
     """Test 2:30 PM entry strategy with no signal conditions."""
     strategy = TwoThirtyEntryStrategy(config)
     
     # Test with non-2:30 PM candle
     candle = {
-        'timestamp': pd.Timestamp('2024-04-15 14:15:00'),
+        'timestamp': TS_1415,
         'open': 101.0,
         'high': 102.0,
         'low': 100.5,
@@ -126,7 +127,7 @@ async def test_two_thirty_entry_strategy_no_signal(config, mr_values):
     
     # Test with price within MR range
     candle = {
-        'timestamp': pd.Timestamp('2024-04-15 14:30:00'),
+        'timestamp': TS_1430,
         'open': 95.0,
         'high': 96.0,
         'low': 94.0,
@@ -148,4 +149,34 @@ def test_entry_strategy_factory(config):
     
     # Test invalid entry type
     with pytest.raises(ValueError):
-        EntryStrategyFactory.create_strategy("INVALID_ENTRY", config) 
\ No newline at end of file
+        EntryStrategyFactory.create_strategy("INVALID_ENTRY", config) 
+
+
+@pytest.mark.parametrize("highs,lows", [
+    ([101.0, 99.0, 100.2, 99.5], [95.0, 95.0, 96.0, 94.0]),  # long on the third candle
+    ([101.0, 99.0, 99.5, 99.0], [89.0, 95.0, 89.9, 85.0]),  # 9:15 short skipped, short on the third
+    ([99.0, 99.0, 99.5, 99.0], [91.0, 95.0, 96.0, 94.0]),  # no breakout
+])
+async def test_process_candles_bulk_matches_first_entry(config, highs, lows):
+    """Bulk 1ST_ENTRY scan produces the same signal as the per-candle strategy."""
+    mr_values = {'mr_high': 100.0, 'mr_low': 90.0, 'is_valid': True}
+    candles = pd.DataFrame({
+        'timestamp': pd.date_range('2024-04-15 09:15:00', periods=len(highs), freq='5min'),
+        'open': 95.0,
+        'high': highs,
+        'low': lows,
+        'close': 95.0
+    })
+    
+    strategy = FirstEntryStrategy(config)
+    expected = []
+    for candle in candles.to_dict('records'):
+        signal = await strategy.check_entry_conditions(candle, mr_values)
+        if signal:
+            expected.append(signal)
+    
+    signal_generator = SignalGenerator(config=config, entry_type="1ST_ENTRY")
+    assert signal_generator.process_candles_bulk(candles, mr_values) == expected
+    assert SignalGenerator(config=config, entry_type="1ST_ENTRY").process_candles(candles, mr_values) == expected
+    # One trade per day: a second pass over the same candles fires nothing
+    assert signal_generator.process_candles_bulk(candles, mr_values) == []
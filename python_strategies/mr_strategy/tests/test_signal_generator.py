@@ -8,15 +8,19 @@ import numpy as np
 from ..strategy.models import SignalDirection
 from ..strategy.config import MRStrategyConfig
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+def _mod(candle, **changes):
+    """Return a copy of candle with the given fields replaced."""
+    modified = dict(candle)
+    modified.update(changes)
+    return modified
+
 @pytest.fixture
 def signal_generator():
     return SignalGenerator()
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_candle():
     """Create a sample candle for signal generation"""
     return {
@@ -28,7 +32,7 @@ def sample_candle():
         'volume': 1000
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def valid_mr_values():
     """Create valid morning range values"""
     return {
@@ -40,7 +44,7 @@ def valid_mr_values():
         'error': None
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def invalid_mr_values():
     """Create invalid morning range values"""
     return {
@@ -52,7 +56,7 @@ def invalid_mr_values():
         'error': None
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def config():
     """Create test configuration."""
     return MRStrategyConfig(
@@ -62,7 +66,7 @@ def config():
         invalidation_percentage=0.005
     )
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mr_values():
     """Create test morning range values."""
     return {
@@ -74,88 +78,91 @@ def mr_values():
         'mr_low': 90.0
     }
 
-@pytest.mark.asyncio
 async def test_skip_first_candle(signal_generator, sample_candle, valid_mr_values):
     """Test that first candle (9:15 AM) is skipped"""
     # Modify candle to be first candle of the day
-    first_candle = sample_candle.copy()
-    first_candle['timestamp'] = '2024-01-15 09:15:00'
+    first_candle = _mod(sample_candle, timestamp='2024-01-15 09:15:00')
     
     signals = await signal_generator.process_candle(first_candle, valid_mr_values)
     assert len(signals) == 0
     logger.info("First candle (9:15 AM) correctly skipped")
 
-@pytest.mark.asyncio
 async def test_skip_invalid_mr(signal_generator, sample_candle, invalid_mr_values):
     """Test that signals are not generated for invalid MR values"""
     signals = await signal_generator.process_candle(sample_candle, invalid_mr_values)
     assert len(signals) == 0
     logger.info("Invalid MR values correctly skipped")
 
-@pytest.mark.asyncio
 async def test_generate_breakout_signals(signal_generator, sample_candle, valid_mr_values):
     """Test breakout signal generation"""
     # Test upper breakout
-    upper_breakout_candle = sample_candle.copy()
-    upper_breakout_candle['high'] = valid_mr_values['mr_high'] + 1.0
-    upper_breakout_candle['close'] = valid_mr_values['mr_high'] + 0.5
+    upper_breakout_candle = _mod(
+        sample_candle,
+        high=valid_mr_values['mr_high'] + 1.0,
+        close=valid_mr_values['mr_high'] + 0.5
+    )
     
     signals = await signal_generator.process_candle(upper_breakout_candle, valid_mr_values)
     assert len(signals) == 1
     assert signals[0].type == SignalType.BREAKOUT
     assert signals[0].direction == Direction.LONG
-    logger.info(f"Generated upper breakout signal: {signals[0]}")
+    logger.info("Generated upper breakout signal: %s", signals[0])
     
     # Test lower breakout
-    lower_breakout_candle = sample_candle.copy()
-    lower_breakout_candle['low'] = valid_mr_values['mr_low'] - 1.0
-    lower_breakout_candle['close'] = valid_mr_values['mr_low'] - 0.5
+    lower_breakout_candle = _mod(
+        sample_candle,
+        low=valid_mr_values['mr_low'] - 1.0,
+        close=valid_mr_values['mr_low'] - 0.5
+    )
     
     signals = await signal_generator.process_candle(lower_breakout_candle, valid_mr_values)
     assert len(signals) == 1
     assert signals[0].type == SignalType.BREAKOUT
     assert signals[0].direction == Direction.SHORT
-    logger.info(f"Generated lower breakout signal: {signals[0]}")
+    logger.info("Generated lower breakout signal: %s", signals[0])
 
-@pytest.mark.asyncio
 async def test_generate_pullback_signals(signal_generator, sample_candle, valid_mr_values):
     """Test pullback signal generation"""
     # Test upper pullback
-    upper_pullback_candle = sample_candle.copy()
-    upper_pullback_candle['high'] = valid_mr_values['mr_high'] - 1.0
-    upper_pullback_candle['close'] = valid_mr_values['mr_high'] - 0.5
+    upper_pullback_candle = _mod(
+        sample_candle,
+        high=valid_mr_values['mr_high'] - 1.0,
+        close=valid_mr_values['mr_high'] - 0.5
+    )
     
     signals = await signal_generator.process_candle(upper_pullback_candle, valid_mr_values)
     assert len(signals) == 1
     assert signals[0].type == SignalType.PULLBACK
     assert signals[0].direction == Direction.LONG
-    logger.info(f"Generated upper pullback signal: {signals[0]}")
+    logger.info("Generated upper pullback signal: %s", signals[0])
     
     # Test lower pullback
-    lower_pullback_candle = sample_candle.copy()
-    lower_pullback_candle['low'] = valid_mr_values['mr_low'] + 1.0
-    lower_pullback_candle['close'] = valid_mr_values['mr_low'] + 0.5
+    lower_pullback_candle = _mod(
+        sample_candle,
+        low=valid_mr_values['mr_low'] + 1.0,
+        close=valid_mr_values['mr_low'] + 0.5
+    )
     
     signals = await signal_generator.process_candle(lower_pullback_candle, valid_mr_values)
     assert len(signals) == 1
     assert signals[0].type == SignalType.PULLBACK
     assert signals[0].direction == Direction.SHORT
-    logger.info(f"Generated lower pullback signal: {signals[0]}")
+    logger.info("Generated lower pullback signal: %s", signals[0])
 
-@pytest.mark.asyncio
 async def test_no_signals_in_range(signal_generator, sample_candle, valid_mr_values):
     """Test that no signals are generated when price is within MR range"""
     # Price within MR range
-    in_range_candle = sample_candle.copy()
-    in_range_candle['high'] = valid_mr_values['mr_high'] - 2.0
-    in_range_candle['low'] = valid_mr_values['mr_low'] + 2.0
-    in_range_candle['close'] = (valid_mr_values['mr_high'] + valid_mr_values['mr_low']) / 2
+    in_range_candle = _mod(
+        sample_candle,
+        high=valid_mr_values['mr_high'] - 2.0,
+        low=valid_mr_values['mr_low'] + 2.0,
+        close=(valid_mr_values['mr_high'] + valid_mr_values['mr_low']) / 2
+    )
     
     signals = await signal_generator.process_candle(in_range_candle, valid_mr_values)
     assert len(signals) == 0
     logger.info("No signals generated for price within MR range")
 
-@pytest.mark.asyncio
 async def test_first_entry_signal_generation(config, mr_values, sample_candle):
     """Test signal generation with first entry strategy."""
     signal_generator = SignalGenerator(config=config, entry_type="1ST_ENTRY")
@@ -168,10 +175,7 @@ async def test_first_entry_signal_generation(config, mr_values, sample_candle):
     assert signals[0].price == mr_values['high']
     
     # Test short breakout
-    short_candle = sample_candle.copy()
-    short_candle['high'] = 95.0
-    short_candle['low'] = 85.0
-    short_candle['close'] = 88.0
+    short_candle = _mod(sample_candle, high=95.0, low=85.0, close=88.0)
     
     signals = await signal_generator.process_candle(short_candle, mr_values)
     assert len(signals) == 1
@@ -179,7 +183,6 @@ async def test_first_entry_signal_generation(config, mr_values, sample_candle):
     assert signals[0].direction == SignalDirection.SHORT
     assert signals[0].price == mr_values['low']
 
-@pytest.mark.asyncio
 async def test_two_thirty_entry_signal_generation(config, mr_values):
     """Test signal generation with 2:30 PM entry strategy."""
     signal_generator = SignalGenerator(config=config, entry_type="2_30_ENTRY")
@@ -214,7 +217,6 @@ async def test_two_thirty_entry_signal_generation(config, mr_values):
     assert signals[0].direction == SignalDirection.SHORT
     assert signals[0].price == short_candle['close']
 
-@pytest.mark.asyncio
 async def test_no_signal_generation(config, mr_values):
     """Test cases where no signals should be generated."""
     signal_generator = SignalGenerator(config=config, entry_type="1ST_ENTRY")
@@ -238,7 +240,6 @@ async def test_no_signal_generation(config, mr_values):
     signals = await signal_generator.process_candle(normal_candle, mr_values)
     assert len(signals) == 0
 
-@pytest.mark.asyncio
 async def test_multiple_candles_processing(config, mr_values):
     """Test processing multiple candles."""
     signal_generator = SignalGenerator(config=config, entry_type="1ST_ENTRY")
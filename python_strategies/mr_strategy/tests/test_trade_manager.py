@@ -0,0 +1,69 @@
+"""
+Unit tests for the trade manager's per-candle exit handling.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from ..strategy.trade_manager import TakeProfitLevel, TradeConfig, TradeManager, TradeStatus, TradeType
+
+# Candle timestamps arrive zone-aware (IST) from the data processor
+ENTRY_TIME = datetime(2024, 1, 1, 9, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+
+
+def _candle(timestamp, price):
+    """Candle with the daily context fields create_trade records."""
+    return {
+        'timestamp': timestamp,
+        'open': price, 'high': price + 0.1, 'low': price - 0.1, 'close': price,
+        'OAH': False, 'OAL': False, 'DAILY_EMA_50': 90.0,
+        'prev_day_open': 97.0, 'prev_day_high': 101.0, 'prev_day_low': 95.0, 'prev_day_close': 100.0
+    }
+
+
+@pytest.fixture
+def trade_manager():
+    """Trade manager with a single full-size take profit at 3R and a 10 minute expiry."""
+    config = TradeConfig(
+        sl_percentage=1.0,
+        take_profit_levels=[TakeProfitLevel(r_multiple=3.0, size_percentage=100)],
+        breakeven_r=1.0,
+        trail_activation_r=1.0,
+        trail_step_percentage=0.5,
+        partial_exit_adjustment=True,
+        max_trade_duration=10,
+        entry_timeout=30,
+        reentry_times=1,
+        min_risk_reward=1.5,
+        dynamic_sl_adjustment=False,
+        initial_capital=100000
+    )
+    manager = TradeManager(config)
+    entry_candle = _candle(ENTRY_TIME, 100.0)
+    manager.create_trade("K", 100.0, 10, "LONG", "1ST_ENTRY", "09:30", TradeType.IMMEDIATE_BREAKOUT,
+                         1.0, entry_candle, mr_values=3.5)
+    return manager, entry_candle
+
+
+def test_take_profit_on_expiry_candle(trade_manager):
+    """A take profit that closes the position on the expiry candle is reported as TAKE_PROFIT."""
+    manager, entry_candle = trade_manager
+    timestamp = ENTRY_TIME + timedelta(minutes=15)  # Past the 10 minute expiry
+
+    trade = manager.update_trade("K", 103.5, timestamp, _candle(timestamp, 103.5), entry_candle)
+
+    assert trade["status"] == TradeStatus.TAKE_PROFIT
+    assert trade["current_position_size"] == 0
+    assert trade["realized_pnl"] == pytest.approx(35.0)
+    assert "K" not in manager.active_trades
+
+
+def test_expiry_without_take_profit(trade_manager):
+    """A trade still open after its maximum duration is closed as EXPIRED at the candle price."""
+    manager, entry_candle = trade_manager
+    timestamp = ENTRY_TIME + timedelta(minutes=15)
+
+    trade = manager.update_trade("K", 100.5, timestamp, _candle(timestamp, 100.5), entry_candle)
+
+    assert trade["status"] == TradeStatus.EXPIRED
+    assert trade["realized_pnl"] == pytest.approx(5.0)
@@ -0,0 +1,10 @@
+"""
+Dataclass options that depend on the Python version.
+
+dataclass(slots=True) needs Python 3.10; on older interpreters the
+dataclasses keep a per-instance __dict__. Use as @dataclass(**DATACLASS_SLOTS).
+"""
+
+import sys
+
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
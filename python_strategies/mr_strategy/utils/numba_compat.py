@@ -0,0 +1,22 @@
+"""
+Optional Numba support.
+
+Kernels decorated with njit from this module are JIT compiled when Numba is
+installed and run as plain Python otherwise, so Numba stays an optional
+dependency of the strategy code.
+"""
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
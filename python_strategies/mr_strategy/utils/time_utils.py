@@ -6,24 +6,93 @@ and time-related operations for trading strategies.
 """
 
 import datetime
-from datetime import time, date, datetime, timedelta
-from typing import List, Optional, Tuple, Union
+from datetime import time, date, datetime, timedelta, tzinfo
+from typing import AbstractSet, FrozenSet, List, Optional, Tuple, Union
 import logging
-import pytz
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8
+    from backports.zoneinfo import ZoneInfo
 
 logger = logging.getLogger(__name__)
 
 # Default market hours for NSE (Indian National Stock Exchange)
 DEFAULT_MARKET_OPEN = time(9, 15)  # 9:15 AM
 DEFAULT_MARKET_CLOSE = time(15, 30)  # 3:30 PM
-DEFAULT_TIMEZONE = pytz.timezone('Asia/Kolkata')  # IST
+DEFAULT_TIMEZONE = ZoneInfo('Asia/Kolkata')  # IST
+NEW_YORK_TIMEZONE = ZoneInfo('America/New_York')
+
+
+def _seconds_of_day(t: Union[time, datetime]) -> int:
+    """Seconds since midnight, ignoring microseconds."""
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+DEFAULT_MARKET_OPEN_SECONDS = _seconds_of_day(DEFAULT_MARKET_OPEN)
+DEFAULT_MARKET_CLOSE_SECONDS = _seconds_of_day(DEFAULT_MARKET_CLOSE)
+
+# Weekend days as a weekday bitmask (bit 0=Monday): Saturday and Sunday
+DEFAULT_WEEKEND_MASK = (1 << 5) | (1 << 6)
+
+
+def _weekend_mask(weekend_days: Optional[List[int]]) -> int:
+    """Pack weekend day numbers into a weekday bitmask."""
+    if weekend_days is None:
+        return DEFAULT_WEEKEND_MASK
+    mask = 0
+    for day in weekend_days:
+        mask |= 1 << day
+    return mask
+
+
+@lru_cache(maxsize=32)
+def _holiday_set(holidays: Tuple[date, ...]) -> FrozenSet[date]:
+    """Build (once per holiday list) the frozenset used for membership tests."""
+    return frozenset(holidays)
+
+
+def _as_holiday_set(market_holidays: Optional[List[date]]) -> AbstractSet[date]:
+    """
+    Market holidays as a set for O(1) membership tests.
+    
+    Sets and frozensets are used as given; lists are converted once and
+    cached on their contents, so repeated calls with the same list reuse it.
+    """
+    if not market_holidays:
+        return frozenset()
+    if isinstance(market_holidays, (set, frozenset)):
+        return market_holidays
+    return _holiday_set(tuple(market_holidays))
+
+
+@lru_cache(maxsize=32)
+def _busday_calendar(holidays: FrozenSet[date], weekend_days: Tuple[int, ...]) -> np.busdaycalendar:
+    """Build (once per holiday set and weekend) the numpy calendar used for vectorized day checks."""
+    weekmask = ''.join('0' if day in weekend_days else '1' for day in range(7))
+    return np.busdaycalendar(weekmask=weekmask, holidays=np.array(sorted(holidays), dtype='datetime64[D]'))
+
+
+def _trading_calendar(market_holidays: Optional[List[date]],
+                      weekend_days: Optional[List[int]]) -> np.busdaycalendar:
+    """Look up the cached busday calendar for these holidays and weekend days."""
+    if weekend_days is None:
+        weekend_days = (5, 6)  # Saturday and Sunday
+    # frozenset() of a frozenset returns the same object, so this only copies mutable sets
+    return _busday_calendar(frozenset(_as_holiday_set(market_holidays)), tuple(weekend_days))
 
 def is_market_open(timestamp: datetime, 
                   market_open: time = DEFAULT_MARKET_OPEN,
                   market_close: time = DEFAULT_MARKET_CLOSE,
-                  timezone: pytz.timezone = DEFAULT_TIMEZONE) -> bool:
+                  timezone: tzinfo = DEFAULT_TIMEZONE) -> bool:
     """
     Check if the market is open at the given timestamp.
+
+    Times are compared as integer seconds since midnight, so sub-second
+    parts of the timestamp are ignored.
     
     Args:
         timestamp: The timestamp to check
@@ -38,23 +107,30 @@ def is_market_open(timestamp: datetime,
     if timestamp.tzinfo is not None:
         timestamp = timestamp.astimezone(timezone)
     
-    # Extract time component
-    current_time = timestamp.time()
+    # Default hours are precomputed; custom hours are converted per call
+    open_seconds = (DEFAULT_MARKET_OPEN_SECONDS if market_open is DEFAULT_MARKET_OPEN
+                    else _seconds_of_day(market_open))
+    close_seconds = (DEFAULT_MARKET_CLOSE_SECONDS if market_close is DEFAULT_MARKET_CLOSE
+                     else _seconds_of_day(market_close))
     
     # Check if it's within market hours
-    return market_open <= current_time <= market_close
+    return open_seconds <= _seconds_of_day(timestamp) <= close_seconds
 
 def is_trading_day(check_date: Union[date, datetime], 
                   market_holidays: Optional[List[date]] = None,
-                  weekend_days: Optional[List[int]] = None) -> bool:
+                  weekend_days: Optional[List[int]] = None,
+                  weekend_mask: Optional[int] = None) -> bool:
     """
     Check if a given date is a trading day.
     
     Args:
         check_date: Date to check
-        market_holidays: List of market holidays
+        market_holidays: List of market holidays; pass a set or frozenset when
+                     checking many dates to skip the per-call list lookup
         weekend_days: List of weekend day numbers (0=Monday, 6=Sunday)
                      Default is [5, 6] for Saturday and Sunday
+        weekend_mask: Precomputed weekday bitmask (bit 0=Monday); takes
+                     precedence over weekend_days for callers checking many dates
         
     Returns:
         True if it's a trading day, False otherwise
@@ -62,18 +138,15 @@ def is_trading_day(check_date: Union[date, datetime],
     if isinstance(check_date, datetime):
         check_date = check_date.date()
         
-    if weekend_days is None:
-        weekend_days = [5, 6]  # Saturday and Sunday
-        
-    if market_holidays is None:
-        market_holidays = []
+    if weekend_mask is None:
+        weekend_mask = _weekend_mask(weekend_days)
         
     # Check if it's a weekend
-    if check_date.weekday() in weekend_days:
+    if (1 << check_date.weekday()) & weekend_mask:
         return False
         
     # Check if it's a holiday
-    if check_date in market_holidays:
+    if check_date in _as_holiday_set(market_holidays):
         return False
         
     return True
@@ -95,13 +168,11 @@ def get_next_trading_day(from_date: Union[date, datetime],
     if isinstance(from_date, datetime):
         from_date = from_date.date()
     
-    next_day = from_date + timedelta(days=1)
-    
-    # Keep checking days until we find a trading day
-    while not is_trading_day(next_day, market_holidays, weekend_days):
-        next_day += timedelta(days=1)
+    # Roll forward from the day after to the first trading day in one call
+    next_day = np.busday_offset(np.datetime64(from_date + timedelta(days=1), 'D'), 0, roll='forward',
+                                busdaycal=_trading_calendar(market_holidays, weekend_days))
         
-    return next_day
+    return next_day.astype(object)
 
 def get_previous_trading_day(from_date: Union[date, datetime],
                            market_holidays: Optional[List[date]] = None,
@@ -120,13 +191,11 @@ def get_previous_trading_day(from_date: Union[date, datetime],
     if isinstance(from_date, datetime):
         from_date = from_date.date()
     
-    prev_day = from_date - timedelta(days=1)
-    
-    # Keep checking days until we find a trading day
-    while not is_trading_day(prev_day, market_holidays, weekend_days):
-        prev_day -= timedelta(days=1)
+    # Roll back from the day before to the last trading day in one call
+    prev_day = np.busday_offset(np.datetime64(from_date - timedelta(days=1), 'D'), 0, roll='backward',
+                                busdaycal=_trading_calendar(market_holidays, weekend_days))
         
-    return prev_day
+    return prev_day.astype(object)
 
 def get_trading_days_between(start_date: Union[date, datetime],
                            end_date: Union[date, datetime],
@@ -153,17 +222,13 @@ def get_trading_days_between(start_date: Union[date, datetime],
     if start_date > end_date:
         start_date, end_date = end_date, start_date
     
-    trading_days = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        if is_trading_day(current_date, market_holidays, weekend_days):
-            trading_days.append(current_date)
-        current_date += timedelta(days=1)
+    # Test the whole range in one vectorized pass instead of day by day
+    dates = np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1, dtype='datetime64[D]')
+    mask = np.is_busday(dates, busdaycal=_trading_calendar(market_holidays, weekend_days))
         
-    return trading_days
+    return dates[mask].astype(object).tolist()
 
-def get_market_hours(exchange: str = 'NSE') -> Tuple[time, time, pytz.timezone]:
+def get_market_hours(exchange: str = 'NSE') -> Tuple[time, time, tzinfo]:
     """
     Get the market hours for a given exchange.
     
@@ -178,15 +243,15 @@ def get_market_hours(exchange: str = 'NSE') -> Tuple[time, time, pytz.timezone]:
     if exchange == 'NSE' or exchange == 'BSE':
         return (DEFAULT_MARKET_OPEN, DEFAULT_MARKET_CLOSE, DEFAULT_TIMEZONE)
     elif exchange == 'NYSE':
-        return (time(9, 30), time(16, 0), pytz.timezone('America/New_York'))
+        return (time(9, 30), time(16, 0), NEW_YORK_TIMEZONE)
     elif exchange == 'NASDAQ':
-        return (time(9, 30), time(16, 0), pytz.timezone('America/New_York'))
+        return (time(9, 30), time(16, 0), NEW_YORK_TIMEZONE)
     else:
         logger.warning(f"Unknown exchange: {exchange}, using NSE hours by default")
         return (DEFAULT_MARKET_OPEN, DEFAULT_MARKET_CLOSE, DEFAULT_TIMEZONE)
 
 def combine_date_and_time(date_value: date, time_value: time, 
-                         timezone: Optional[pytz.timezone] = None) -> datetime:
+                         timezone: Optional[tzinfo] = None) -> datetime:
     """
     Combine a date and time into a datetime object.
     
@@ -198,12 +263,11 @@ def combine_date_and_time(date_value: date, time_value: time,
     Returns:
         DateTime object with the combined date and time
     """
-    dt = datetime.combine(date_value, time_value)
+    if timezone is None:
+        return datetime.combine(date_value, time_value)
     
-    if timezone:
-        dt = timezone.localize(dt)
-        
-    return dt
+    # Attach the zone while constructing, rather than building a naive datetime and replacing it
+    return datetime.combine(date_value, time_value, tzinfo=timezone)
 
 def format_time_for_display(dt: Union[datetime, time]) -> str:
     """
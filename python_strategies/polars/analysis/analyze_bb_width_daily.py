@@ -1,29 +1,54 @@
 import polars as pl
+import numpy as np
 import argparse
 import mysql.connector
-import pandas as pd
+from typing import Optional
 
-def analyze_bb_squeeze(db_connection, instrument_key: str, bb_period: int, bb_std_dev: float, lookback_period: int, confirmation_period: int):
+from bbw_cache import DAILY_CACHE_DIR, append_new, clear_cached, load_cached
+from bbw_kernels import bbw_squeeze
+
+def analyze_bb_squeeze(db_connection, instrument_key: str, bb_period: int, bb_std_dev: float, lookback_period: int, confirmation_period: int,
+                       cache_dir: Optional[str] = None):
     """
     Analyzes daily data for a given instrument to find Bollinger Band Squeeze patterns.
 
     A "squeeze" is identified when:
     1. The current Bollinger Band Width (BBW) is the lowest it has been over a long lookback period.
     2. The BBW has been contracting or moving sideways over a shorter confirmation period.
+
+    With a cache_dir, candles are kept in a per-instrument Parquet cache and only
+    days after the last cached one are fetched from the database.
     """
 
     # --- LOAD DATA FROM DATABASE ---
     try:
-        # Fetch daily data.
-        query = """
+        cached = load_cached(cache_dir, instrument_key) if cache_dir else None
+        last_cached_date = cached.select(pl.col("date").max()).collect().item() if cached is not None else None
+
+        # Fetch daily data (only the days the cache is missing).
+        query = f"""
         SELECT timestamp AS date, open, high, low, close
         FROM stock_candle_data
         WHERE instrument_key = %s
           AND time_interval = 'day'
+          {"AND timestamp > %s" if last_cached_date is not None else ""}
         ORDER BY timestamp ASC
         """
-        df_pandas = pd.read_sql(query, db_connection, params=(instrument_key,))
-        daily_df = pl.from_pandas(df_pandas)
+        params = (instrument_key,) if last_cached_date is None else (instrument_key, last_cached_date)
+        # Rows go straight from the cursor into Polars columns, no pandas frame in between.
+        daily_df = pl.read_database(
+            query,
+            connection=db_connection,
+            execute_options={"params": params},
+            schema_overrides={col: pl.Float64 for col in ("open", "high", "low", "close")},
+        )
+
+        if cache_dir:
+            if not daily_df.is_empty():
+                append_new(cache_dir, instrument_key, daily_df)
+            cached = load_cached(cache_dir, instrument_key)
+            if cached is not None:
+                daily_df = cached.collect()
 
     except Exception as e:
         print(f"Error fetching data from database: {e}")
@@ -39,22 +64,16 @@ def analyze_bb_squeeze(db_connection, instrument_key: str, bb_period: int, bb_st
         print(f"Not enough daily data ({len(daily_df)}) to calculate Bollinger Bands with period {bb_period}.")
         return
 
-    daily_df = daily_df.with_columns(
-        bb_mid=pl.col("close").rolling_mean(bb_period),
-        bb_std=pl.col("close").rolling_std(bb_period),
-    ).with_columns(
-        bb_upper=pl.col("bb_mid") + bb_std_dev * pl.col("bb_std"),
-        bb_lower=pl.col("bb_mid") - bb_std_dev * pl.col("bb_std"),
-    ).with_columns(
-        bb_width=((pl.col("bb_upper") - pl.col("bb_lower")))
-    ).drop_nulls("bb_width")
-
-    if daily_df.is_empty():
-        print(f"Not enough data to calculate BBW for '{instrument_key}' after dropping nulls.")
-        return
-
-    # --- FILTER OUT ZERO BB_WIDTH VALUES ---
-    daily_df = daily_df.filter(pl.col("bb_width") > 0)
+    # BBW, zero-width filter, squeeze and contraction flags in one pass over close
+    keep, bb_width, is_squeeze, is_contracting, bbw_avg = bbw_squeeze(
+        daily_df["close"].to_numpy(), bb_period, bb_std_dev, lookback_period, confirmation_period
+    )
+    daily_df = daily_df.filter(pl.Series(keep)).with_columns(
+        bb_width=pl.Series(bb_width),
+        is_squeeze=pl.Series(is_squeeze),
+        bb_width_lookback_avg=pl.Series(bbw_avg).fill_nan(None),
+        is_contracting=pl.Series(is_contracting),
+    )
 
     if daily_df.is_empty():
         print(f"No data with non-zero BBW available for '{instrument_key}'.")
@@ -64,22 +83,6 @@ def analyze_bb_squeeze(db_connection, instrument_key: str, bb_period: int, bb_st
         print(f"Not enough data ({len(daily_df)} days) for lookback period of {lookback_period} days.")
         return
 
-    # --- SQUEEZE CONDITION: BBW is at its lowest point over the lookback period ---
-    daily_df = daily_df.with_columns(
-        is_squeeze=(pl.col("bb_width") == pl.col("bb_width").rolling_min(lookback_period)),
-        bb_width_lookback_avg=pl.col("bb_width").rolling_mean(lookback_period)
-    )
-
-    # --- CONFIRMATION: BBW has been contracting or sideways ---
-    daily_df = daily_df.with_columns(
-        is_contracting=(pl.col("bb_width").diff(1).fill_null(0) <= 0).rolling_min(confirmation_period)
-    )
-
-    # --- FILTER FOR SQUEEZE SIGNALS (used for latest day check)---
-    squeeze_signals = daily_df.filter(
-        pl.col("is_squeeze") & pl.col("is_contracting")
-    )
-
     # --- DISPLAY RESULTS ---
     print(f"\n{'='*20} Analysis for: {instrument_key} {'='*20}")
     print(f"Configuration: BB({bb_period}, {bb_std_dev}), Lookback: {lookback_period}, Contraction: {confirmation_period} days")
@@ -88,7 +91,11 @@ def analyze_bb_squeeze(db_connection, instrument_key: str, bb_period: int, bb_st
     # --- 10th Percentile BBW Days (Last 30 Days) ---
     if len(daily_df) >= 30:
         last_30_days_df = daily_df.tail(30)
-        percentile_10_threshold = last_30_days_df.select(pl.col("bb_width").quantile(0.10)).item()
+        # Nearest-rank 10th percentile (Polars' default quantile rule, half rounded up),
+        # found by partial selection rather than a sort
+        bb_width_values = last_30_days_df["bb_width"].to_numpy()
+        rank = int((len(bb_width_values) - 1) * 0.10 + 0.5)
+        percentile_10_threshold = float(np.partition(bb_width_values, rank)[rank])
         
         low_bbw_days = last_30_days_df.filter(pl.col("bb_width") <= percentile_10_threshold)
         
@@ -105,15 +112,14 @@ def analyze_bb_squeeze(db_connection, instrument_key: str, bb_period: int, bb_st
     print(daily_df.tail(10).select(["date", "close", "bb_width"]))
 
     # --- LATEST DAY STATUS ---
-    latest_day = daily_df.tail(1)
-    if not latest_day.is_empty():
-        print("\n--- Latest Day Status ---")
-        print(latest_day.select(["date", "close", "bb_width", "bb_width_lookback_avg", "is_squeeze", "is_contracting"]))
-        
-        if latest_day.select("is_squeeze").item() and latest_day.select("is_contracting").item():
-            print("\n>> ALERT: Volatility Squeeze DETECTED for the most recent day! <<")
-        else:
-            print("\n>> No active squeeze for the most recent day.")
+    latest_day = daily_df.row(-1, named=True)
+    print("\n--- Latest Day Status ---")
+    print(daily_df.tail(1).select(["date", "close", "bb_width", "bb_width_lookback_avg", "is_squeeze", "is_contracting"]))
+    
+    if latest_day["is_squeeze"] and latest_day["is_contracting"]:
+        print("\n>> ALERT: Volatility Squeeze DETECTED for the most recent day! <<")
+    else:
+        print("\n>> No active squeeze for the most recent day.")
 
 def main():
     """Main function to parse arguments and run the analysis."""
@@ -128,6 +134,8 @@ def main():
     parser.add_argument("--bb-std", type=float, default=2.0, help="Bollinger Bands standard deviations (used if not pre-calculated).")
     parser.add_argument("--lookback", type=int, default=126, help="Lookback period for squeeze detection (approx. 6 months).")
     parser.add_argument("--contraction", type=int, default=5, help="Confirmation period for band contraction.")
+    parser.add_argument("--cache-dir", type=str, default=DAILY_CACHE_DIR, help="Directory of the per-instrument daily candle Parquet cache.")
+    parser.add_argument("--refresh-cache", action="store_true", help="Drop the instrument's cached candles and reload them all from the database.")
     
     args = parser.parse_args()
     
@@ -143,6 +151,9 @@ def main():
     try:
         db_connection = mysql.connector.connect(**db_config)
         print("Successfully connected to database.")
+
+        if args.refresh_cache:
+            clear_cached(args.cache_dir, args.instrument_key)
         
         analyze_bb_squeeze(
             db_connection=db_connection,
@@ -150,7 +161,8 @@ def main():
             bb_period=args.bb_period,
             bb_std_dev=args.bb_std,
             lookback_period=args.lookback,
-            confirmation_period=args.contraction
+            confirmation_period=args.contraction,
+            cache_dir=args.cache_dir
         )
     except mysql.connector.Error as err:
         print(f"Database connection failed: {err}")
@@ -12,18 +12,26 @@ Date: 2025-01-30
 """
 
 import polars as pl
+import numpy as np
 import argparse
 import mysql.connector
-import pandas as pd
 import logging
+import math
 import time
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from urllib.parse import quote
+from typing import List, Dict, Optional, Tuple, Union
 from tqdm import tqdm
 import warnings
 warnings.filterwarnings('ignore')
 
+from bbw_cache import INTRADAY_CACHE_DIR, clear_cached, load_cached, replace_since
+from bbw_kernels import NUMBA_AVAILABLE, rolling_bb_width
+
 # =============================================================================
 # SECTION 1: CONFIGURATION & SETUP
 # =============================================================================
@@ -67,20 +75,39 @@ class ConfigurationManager:
         # Performance Parameters
         self.performance_params = {
             'batch_size': 1000,                 # Batch processing size
+            'bulk_fetch_size': 50,              # Instruments fetched per 1minute query
+            'max_workers': os.cpu_count() or 1, # Analysis threads (1 = analyze on the main thread)
             'chunk_size': 5000,                 # Memory chunk size
             'max_connections': 10,              # Maximum database connections
-            'connection_timeout': 30            # Connection timeout (seconds)
+            'connection_timeout': 30,           # Connection timeout (seconds)
+            'bar_cache_dir': None,              # Parquet cache of fetched bars (None = always query the database)
+            'refresh_bar_cache': False          # Drop cached bars and refetch them in full
         }
         
         # Output Configuration
         self.output_config = {
             'output_dir': os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'output'),
             'logs_dir': 'logs',
-            'csv_filename': 'bb_width_analysis.csv'
+            'csv_filename': 'bb_width_analysis.csv',
+            'output_format': 'csv'              # 'csv', 'arrow' (zstd-compressed Arrow IPC) or 'parquet' (partitioned directory)
         }
 
+def _sql_literal(value: str) -> str:
+    """Quote a string as a MySQL literal, since connectorx reads cannot bind parameters.
+    
+    Quotes are doubled and backslashes escaped, as MySQL expects inside '...'. That
+    escaping is wrong under NO_BACKSLASH_ESCAPES, so only use it for values the
+    analyzer generates itself (instrument keys read back from the database, dates);
+    anything the user typed goes through execute_query's bound params.
+    """
+    return "'" + value.replace('\\', '\\\\').replace("'", "''") + "'"
+
 class DatabaseManager:
-    """Manages database connections and operations."""
+    """Manages database connections and operations.
+    
+    Reads go through connectorx straight into Arrow; the mysql.connector connection is kept for
+    updates and for the small parameterized lookups on user input.
+    """
     
     def __init__(self, config: ConfigurationManager):
         self.config = config
@@ -113,18 +140,37 @@ class DatabaseManager:
             self.connection.close()
             self.logger.info("Database connection closed")
     
-    def execute_query(self, query: str, params: tuple = None) -> Optional[pd.DataFrame]:
-        """Execute a database query and return results as DataFrame."""
+    def execute_query(self, query: str, params: tuple = None) -> Optional[pl.DataFrame]:
+        """Execute a read query and return results as a Polars DataFrame.
+        
+        With params, the query binds them (%s placeholders) over the mysql.connector connection.
+        Without, it runs through connectorx, which cannot bind parameters, so any values must
+        be inlined with _sql_literal.
+        """
         try:
             if params:
-                df = pd.read_sql(query, self.connection, params=params)
-            else:
-                df = pd.read_sql(query, self.connection)
-            return df
+                return pl.read_database(query, connection=self.connection, execute_options={"params": params})
+            return pl.read_database_uri(query, self.get_connection_uri(), engine="connectorx")
         except Exception as e:
             self.logger.error(f"Query execution failed: {e}")
             return None
     
+    def get_connection_uri(self) -> str:
+        """MySQL URI for connectorx reads, built from db_config."""
+        db = self.config.db_config
+        return f"mysql://{db['user']}:{quote(db['password'], safe='')}@{db['host']}:{db['port']}/{db['database']}"
+    
+    def read_parallel(self, queries: List[str]) -> Optional[pl.DataFrame]:
+        """Execute read queries with the same columns concurrently through connectorx, concatenating the results.
+        
+        As with execute_query, values must be inlined with _sql_literal.
+        """
+        try:
+            return pl.read_database_uri(queries, self.get_connection_uri(), engine="connectorx")
+        except Exception as e:
+            self.logger.error(f"Parallel query execution failed: {e}")
+            return None
+    
     def update_lowest_bb_width(self, instrument_key: str, lowest_bb_width: float) -> bool:
         """Update the lowest_bb_width column for all candles of a specific instrument."""
         try:
@@ -171,7 +217,7 @@ class DatabaseManager:
             self.logger.error(f"Batch update failed: {e}")
             return results
     
-    def get_lowest_bb_width_summary(self) -> Optional[pd.DataFrame]:
+    def get_lowest_bb_width_summary(self) -> Optional[pl.DataFrame]:
         """Get a summary of current lowest_bb_width values in the database."""
         try:
             query = """
@@ -189,7 +235,7 @@ class DatabaseManager:
             """
             
             df = self.execute_query(query)
-            if df is not None and not df.empty:
+            if df is not None and not df.is_empty():
                 self.logger.info(f"Found {len(df)} instruments with lowest_bb_width data")
             return df
         except Exception as e:
@@ -303,13 +349,11 @@ class DatabaseManager:
             """
             
             df = self.execute_query(query, tuple(symbols))
-            if df is None or df.empty:
+            if df is None or df.is_empty():
                 return {}
             
             # Create mapping
-            symbol_to_instrument = {}
-            for _, row in df.iterrows():
-                symbol_to_instrument[row['symbol']] = row['instrument_key']
+            symbol_to_instrument = dict(zip(df['symbol'].to_list(), df['instrument_key'].to_list()))
             
             self.logger.info(f"Found instrument keys for {len(symbol_to_instrument)} symbols")
             return symbol_to_instrument
@@ -351,35 +395,45 @@ class LoggingManager:
         self.logger.info("Logging system initialized")
 
 class PerformanceMonitor:
-    """Monitors and tracks performance metrics."""
+    """Monitors and tracks performance metrics.
+    
+    Each operation has its own start, so timers can nest (total_analysis wraps the others).
+    Times come from the monotonic perf_counter_ns and are converted to seconds only when reported.
+    """
     
     def __init__(self):
-        self.start_time = None
-        self.metrics = {}
+        self._starts_ns = {}
+        self._elapsed_ns = {}
         self.logger = logging.getLogger(__name__)
     
     def start_timer(self, operation: str):
         """Start timing an operation."""
-        self.start_time = time.time()
+        self._starts_ns[operation] = time.perf_counter_ns()
         self.logger.info(f"Starting operation: {operation}")
     
     def end_timer(self, operation: str) -> float:
-        """End timing an operation and return duration."""
-        if self.start_time:
-            duration = time.time() - self.start_time
-            self.metrics[operation] = duration
-            self.logger.info(f"Completed {operation} in {duration:.2f} seconds")
-            return duration
-        return 0.0
+        """End timing an operation and return duration (time is added up if it ran before)."""
+        start_ns = self._starts_ns.pop(operation, None)
+        if start_ns is None:
+            return 0.0
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        self._elapsed_ns[operation] = self._elapsed_ns.get(operation, 0) + elapsed_ns
+        duration = elapsed_ns / 1e9
+        self.logger.info(f"Completed {operation} in {duration:.2f} seconds")
+        return duration
     
     def get_metrics(self) -> Dict[str, float]:
-        """Get all performance metrics."""
-        return self.metrics
+        """Get all performance metrics, in seconds."""
+        return {operation: elapsed_ns / 1e9 for operation, elapsed_ns in self._elapsed_ns.items()}
 
 # =============================================================================
 # SECTION 2: DATA LAYER
 # =============================================================================
 
+def _minute_points(df: pl.DataFrame) -> int:
+    """Number of 1minute candles in df; bars aggregated in SQL carry their own count in `points`."""
+    return int(df["points"].sum()) if "points" in df.columns else df.height
+
 class DataValidator:
     """Validates data quality and completeness."""
     
@@ -390,6 +444,13 @@ class DataValidator:
     def validate_price_data(self, df: pl.DataFrame) -> bool:
         """Validate OHLC price data for logical consistency."""
         try:
+            # Bars aggregated in SQL count the invalid 1minute candles they cover
+            if "invalid_points" in df.columns:
+                if df["invalid_points"].sum() > 0:
+                    self.logger.warning("Found non-positive price values or invalid OHLC relationships")
+                    return False
+                return True
+            
             # Check for positive prices
             if df.filter(
                 (pl.col("open") <= 0) | 
@@ -421,8 +482,9 @@ class DataValidator:
     def check_data_completeness(self, df: pl.DataFrame, min_points: int) -> bool:
         """Check if data has minimum required points."""
         try:
-            if df.height < min_points:
-                self.logger.warning(f"Insufficient data: {df.height} points < {min_points} required")
+            points = _minute_points(df)
+            if points < min_points:
+                self.logger.warning(f"Insufficient data: {points} points < {min_points} required")
                 return False
             return True
         except Exception as e:
@@ -441,56 +503,142 @@ class DataFetcher:
     def get_all_instruments(self) -> List[Dict]:
         """Fetch all unique instruments with 1minute intraday data."""
         try:
+            # Instruments without a stock_universe symbol are dropped by the inner join
             query = """
             SELECT DISTINCT scd.instrument_key, su.symbol, su.name
             FROM stock_candle_data scd
-            LEFT JOIN stock_universe su ON scd.instrument_key = su.instrument_key
+            JOIN stock_universe su ON scd.instrument_key = su.instrument_key
             WHERE scd.time_interval = '1minute'
+              AND su.symbol IS NOT NULL
             """
             
             df = self.db_manager.execute_query(query)
-            if df is None or df.empty:
+            if df is None or df.is_empty():
                 self.logger.warning("No instruments found with 1minute intraday data")
                 return []
             
-            # Filter out null symbols
-            df = df.dropna(subset=['symbol'])
-            
-            return df.to_dict('records')
+            return df.to_dicts()
         except Exception as e:
             self.logger.error(f"Error fetching instruments: {e}")
             return []
     
+    def _market_hours_bounds(self) -> Tuple[str, str]:
+        """Market start and end as 'HH:MM:SS' strings for SQL TIME comparisons."""
+        return tuple(
+            datetime.strptime(self.config.analysis_params[key], "%H:%M").strftime("%H:%M:%S")
+            for key in ('market_start', 'market_end')
+        )
+    
+    def _bar_minutes(self) -> int:
+        """Width of the bars aggregated in SQL, in minutes.
+        
+        The largest divisor of 60 that also divides time_interval, so every SQL bar falls
+        inside one resampled candle (1 when time_interval is not given in minutes).
+        """
+        match = re.fullmatch(r"(\d+)m", self.config.analysis_params['time_interval'])
+        return math.gcd(int(match.group(1)), 60) if match else 1
+    
+    def _bar_columns(self) -> str:
+        """SELECT columns aggregating 1minute candles into bars; group by bar_timestamp."""
+        bar_minutes = self._bar_minutes()
+        # Bars start on minute-of-hour multiples of bar_minutes, which is how group_by_dynamic
+        # aligns its windows too; open/close are the first/last candle by timestamp
+        return f"""
+            DATE_SUB(timestamp, INTERVAL (MINUTE(timestamp) MOD {bar_minutes}) * 60 + SECOND(timestamp) SECOND) AS bar_timestamp,
+            SUBSTRING_INDEX(GROUP_CONCAT(open ORDER BY timestamp), ',', 1) + 0 AS open,
+            MAX(high) AS high,
+            MIN(low) AS low,
+            SUBSTRING_INDEX(GROUP_CONCAT(close ORDER BY timestamp DESC), ',', 1) + 0 AS close,
+            CAST(SUM(volume) AS SIGNED) AS volume,
+            COUNT(*) AS points,
+            CAST(SUM(open <= 0 OR high <= 0 OR low <= 0 OR close <= 0
+                     OR high < low OR high < open OR high < close
+                     OR low > open OR low > close) AS SIGNED) AS invalid_points"""
+    
+    def _bar_cache_dir(self) -> Optional[str]:
+        """Cache directory for the current bar settings, or None when caching is off.
+        
+        Bars depend on their width and the market hours, so each setting has its own directory.
+        """
+        cache_dir = self.config.performance_params['bar_cache_dir']
+        if not cache_dir:
+            return None
+        market_start, market_end = (bound[:5].replace(':', '') for bound in self._market_hours_bounds())
+        return os.path.join(cache_dir, f"{self._bar_minutes()}m_{market_start}_{market_end}")
+    
+    def _get_cached_bars(self, instrument_keys: List[str], lookback_days: Optional[int] = None) -> Optional[pl.DataFrame]:
+        """Bars of the instruments from the Parquet cache, after fetching what the cache is missing.
+        
+        The cache holds each instrument's full history whatever the lookback, which is applied
+        afterwards. Cached instruments are refetched from the start of their last cached day,
+        since that day may still have been in progress.
+        """
+        cache_dir = self._bar_cache_dir()
+        since = {}
+        for instrument_key in instrument_keys:
+            if self.config.performance_params['refresh_bar_cache']:
+                clear_cached(cache_dir, instrument_key)
+                continue
+            cached = load_cached(cache_dir, instrument_key)
+            if cached is not None:
+                since[instrument_key] = cached.select(pl.col("timestamp").max().dt.truncate("1d")).collect().item()
+        
+        new_df = self._fetch_bars(instrument_keys, since=since)
+        if new_df is not None:
+            for (instrument_key,), instrument_df in new_df.partition_by("instrument_key", as_dict=True).items():
+                replace_since(cache_dir, instrument_key, instrument_df.sort("timestamp"), "timestamp", since.get(instrument_key))
+        
+        cached_bars = [lf for lf in (load_cached(cache_dir, instrument_key) for instrument_key in instrument_keys) if lf is not None]
+        if not cached_bars:
+            return None
+        lf = pl.concat(cached_bars, how="vertical_relaxed")
+        if lookback_days:
+            # Same window as the fetch queries' DATE_SUB(NOW(), ...)
+            lf = lf.filter(pl.col("timestamp") >= datetime.now() - timedelta(days=int(lookback_days) + 20))
+        return lf.collect()
+    
     def get_instrument_data(self, instrument_key: str, lookback_days: Optional[int] = None) -> Optional[pl.DataFrame]:
-        """Fetch 1minute intraday data for a specific instrument."""
+        """Fetch intraday data for a specific instrument as market-hours bars of its 1minute candles.
+        
+        The bars are aggregated in SQL (see _bar_columns), which cuts the rows transferred by the
+        bar width; `points` and `invalid_points` keep the 1minute counts for validation.
+        """
         try:
-            # Build query with optional lookback
-            if lookback_days:
-                query = """
-                SELECT timestamp, open, high, low, close, volume, time_interval
+            market_start, market_end = self._market_hours_bounds()
+            
+            # Bars from the cache when it is on, else a query with optional lookback
+            if self._bar_cache_dir():
+                df = self._get_cached_bars([instrument_key], lookback_days)
+                if df is not None:
+                    df = df.drop("instrument_key").sort("timestamp")
+            elif lookback_days:
+                query = f"""
+                SELECT {self._bar_columns()}
                 FROM stock_candle_data
-                WHERE instrument_key = %s
+                WHERE instrument_key = {_sql_literal(instrument_key)}
                   AND time_interval = '1minute'
-                  AND timestamp >= DATE_SUB(NOW(), INTERVAL %s DAY)
-                ORDER BY timestamp ASC
+                  AND timestamp >= DATE_SUB(NOW(), INTERVAL {int(lookback_days) + 20} DAY)
+                  AND TIME(timestamp) BETWEEN '{market_start}' AND '{market_end}'
+                GROUP BY bar_timestamp
+                ORDER BY bar_timestamp ASC
                 """
-                params = (instrument_key, lookback_days + 20)
+                df = self.db_manager.execute_query(query)
             else:
-                query = """
-                SELECT timestamp, open, high, low, close, volume, time_interval
+                query = f"""
+                SELECT {self._bar_columns()}
                 FROM stock_candle_data
-                WHERE instrument_key = %s
+                WHERE instrument_key = {_sql_literal(instrument_key)}
                   AND time_interval = '1minute'
-                ORDER BY timestamp ASC
+                  AND TIME(timestamp) BETWEEN '{market_start}' AND '{market_end}'
+                GROUP BY bar_timestamp
+                ORDER BY bar_timestamp ASC
                 """
-                params = (instrument_key,)
+                df = self.db_manager.execute_query(query)
             
-            df_pandas = self.db_manager.execute_query(query, params)
-            if df_pandas is None or df_pandas.empty:
+            if df is None or df.is_empty():
                 return None
-            
-            # Convert to Polars DataFrame
-            df = pl.from_pandas(df_pandas)
+            # Query results still carry the SQL column name
+            df = df.rename({"bar_timestamp": "timestamp"}, strict=False)
             
             # Enhanced data validation with lookback period check
             if not self._validate_data_for_analysis(df, lookback_days):
@@ -501,6 +649,75 @@ class DataFetcher:
             self.logger.error(f"Error fetching data for {instrument_key}: {e}")
             return None
     
+    def get_bulk_data(self, instrument_keys: List[str], lookback_days: Optional[int] = None) -> Optional[pl.DataFrame]:
+        """Fetch market-hours bars (as in get_instrument_data) for several instruments, sorted by (instrument_key, timestamp)."""
+        try:
+            if not instrument_keys:
+                return None
+            
+            if self._bar_cache_dir():
+                df = self._get_cached_bars(instrument_keys, lookback_days)
+            else:
+                df = self._fetch_bars(instrument_keys, lookback_days)
+            if df is None or df.is_empty():
+                return None
+            
+            # Results come back concatenated in no particular order, so it is restored here.
+            # Float32 halves the block held in memory; the BB math casts close back to Float64
+            return df.with_columns(
+                pl.col(["open", "high", "low", "close"]).cast(pl.Float32)
+            ).sort(["instrument_key", "timestamp"])
+        except Exception as e:
+            self.logger.error(f"Error bulk fetching data for {len(instrument_keys)} instruments: {e}")
+            return None
+    
+    def _fetch_bars(self, instrument_keys: List[str], lookback_days: Optional[int] = None,
+                    since: Optional[Dict[str, datetime]] = None) -> Optional[pl.DataFrame]:
+        """Query the bars of several instruments, each from `since[instrument_key]` on when given."""
+        since = since or {}
+        lookback_filter = ""
+        if lookback_days:
+            lookback_filter = f"AND timestamp >= DATE_SUB(NOW(), INTERVAL {int(lookback_days) + 20} DAY)"
+        # Normalized by strptime, so safe to inline
+        market_start, market_end = self._market_hours_bounds()
+        
+        # One query per group of instruments, run concurrently over max_connections connections
+        num_queries = min(self.config.performance_params['max_connections'], len(instrument_keys))
+        queries = []
+        for query_number in range(num_queries):
+            # Instruments sharing a start (or with none) are matched by one IN list
+            keys_by_start = {}
+            for key in instrument_keys[query_number::num_queries]:
+                keys_by_start.setdefault(since.get(key), []).append(_sql_literal(key))
+            key_conditions = ' OR '.join(
+                f"instrument_key IN ({','.join(keys)})" if start is None
+                else f"(instrument_key IN ({','.join(keys)}) AND timestamp >= '{start:%Y-%m-%d %H:%M:%S}')"
+                for start, keys in keys_by_start.items()
+            )
+            queries.append(f"""
+            SELECT instrument_key, {self._bar_columns()}
+            FROM stock_candle_data
+            WHERE ({key_conditions})
+              AND time_interval = '1minute'
+              AND TIME(timestamp) BETWEEN '{market_start}' AND '{market_end}'
+              {lookback_filter}
+            GROUP BY instrument_key, bar_timestamp
+            """)
+        
+        df = self.db_manager.read_parallel(queries)
+        if df is None or df.is_empty():
+            return None
+        return df.rename({"bar_timestamp": "timestamp"})
+    
+    def filter_valid_instruments(self, df: pl.DataFrame, lookback_days: Optional[int] = None) -> pl.DataFrame:
+        """Keep the instruments of a get_bulk_data frame whose data passes validation."""
+        valid_keys = [
+            instrument_key
+            for (instrument_key,), instrument_df in df.partition_by("instrument_key", as_dict=True, include_key=False).items()
+            if self._validate_data_for_analysis(instrument_df, lookback_days)
+        ]
+        return df.filter(pl.col("instrument_key").is_in(valid_keys))
+    
     def _validate_data_for_analysis(self, df: pl.DataFrame, lookback_days: Optional[int] = None) -> bool:
         """Enhanced validation that checks data sufficiency for the requested lookback period."""
         try:
@@ -527,17 +744,17 @@ class DataFetcher:
                 trading_minutes_per_day = 6.5 * 60  # 390 minutes
                 expected_min_data_points = lookback_days * trading_minutes_per_day * validation_config['trading_data_threshold']
                 
-                if df.height < expected_min_data_points:
+                if _minute_points(df) < expected_min_data_points:
                     self.logger.warning(f"Insufficient data for {lookback_days} days lookback: "
-                                       f"got {df.height} points, expected at least {expected_min_data_points:.0f} points")
+                                       f"got {_minute_points(df)} points, expected at least {expected_min_data_points:.0f} points")
                     return False
             
             # Check if we have enough data for Bollinger Band calculation
             bb_period = self.config.analysis_params['bb_period']
             min_bb_points = bb_period * validation_config['min_bb_period_multiplier']
-            if df.height < min_bb_points:
+            if _minute_points(df) < min_bb_points:
                 self.logger.warning(f"Insufficient data for BB calculation: "
-                                   f"got {df.height} points, need at least {min_bb_points} points")
+                                   f"got {_minute_points(df)} points, need at least {min_bb_points} points")
                 return False
             
             # Check date range coverage
@@ -559,19 +776,6 @@ class DataFetcher:
     def get_instruments_by_symbols(self, symbols: List[str], lookback_days: Optional[int] = None) -> List[Dict]:
         """Fetch instruments by symbol list (only with 1minute data)."""
         try:
-            # First, let's check if the symbols exist in stock_universe table
-            placeholders = ','.join(['%s'] * len(symbols))
-            check_query = f"""
-            SELECT symbol, instrument_key, name
-            FROM stock_universe
-            WHERE symbol IN ({placeholders})
-            """
-            
-            check_df = self.db_manager.execute_query(check_query, symbols)
-            if check_df is None or check_df.empty:
-                self.logger.warning(f"No symbols found in stock_universe table: {symbols}")
-                return []
-            
             # Create placeholders for the IN clause
             placeholders = ','.join(['%s'] * len(symbols))
             
@@ -597,11 +801,16 @@ class DataFetcher:
                 params = symbols
             
             df = self.db_manager.execute_query(query, params)
-            if df is None or df.empty:
+            if df is None or df.is_empty():
                 self.logger.warning(f"No instruments found for symbols (with 1minute data): {symbols}")
                 return []
             
-            return df.to_dict('records')
+            # Symbols missing from the result are either unknown to stock_universe or have no 1minute data
+            missing = sorted(set(symbols) - set(df['symbol'].to_list()))
+            if missing:
+                self.logger.warning(f"Symbols not in stock_universe or without 1minute data: {missing}")
+            
+            return df.to_dicts()
         except Exception as e:
             self.logger.error(f"Error fetching instruments by symbols: {e}")
             return []
@@ -610,6 +819,15 @@ class DataFetcher:
 # SECTION 3: ANALYSIS ENGINE
 # =============================================================================
 
+def _sorted_quantile(sorted_list: str, quantile: float) -> pl.Expr:
+    """Quantile of a sorted list column by Expr.quantile's default "nearest" rank, round((n - 1) * q)."""
+    rank = (pl.col(sorted_list).list.len() - 1) * quantile + 0.5
+    return pl.col(sorted_list).list.get(rank.floor().cast(pl.Int64))
+
+def _per_instrument(expr: pl.Expr, keyed: bool) -> pl.Expr:
+    """Evaluate expr per instrument when the frame holds several (keyed by instrument_key)."""
+    return expr.over("instrument_key") if keyed else expr
+
 class BollingerBandCalculator:
     """Calculates Bollinger Bands and BB width for the given data."""
     
@@ -618,64 +836,85 @@ class BollingerBandCalculator:
         self.logger = logging.getLogger(__name__)
     
     def calculate_bollinger_bands(self, df: pl.DataFrame) -> pl.DataFrame:
-        """Calculate Bollinger Bands and BB width for the given data."""
+        """Calculate Bollinger Bands and BB width for the given data.
+        
+        df may hold several instruments keyed by instrument_key; windows, zero counts
+        and the minimum-size checks then apply per instrument.
+        """
         try:
             bb_period = self.config.analysis_params['bb_period']
             bb_std_dev = self.config.analysis_params['bb_std_dev']
             validation_config = self.config.analysis_params['data_validation']
             
-            # Pre-validation: Check if we have enough data for meaningful BB calculation
-            if df.height < bb_period:
-                self.logger.warning(f"Insufficient data for BB calculation: {df.height} points < {bb_period} required")
-                return df.filter(pl.lit(False))  # Return empty DataFrame
-            
-            # Calculate Bollinger Bands
-            df = df.with_columns([
-                pl.col("close").rolling_mean(bb_period).alias("bb_mid"),
-                pl.col("close").rolling_std(bb_period).alias("bb_std")
-            ]).with_columns([
-                (pl.col("bb_mid") + bb_std_dev * pl.col("bb_std")).alias("bb_upper"),
-                (pl.col("bb_mid") - bb_std_dev * pl.col("bb_std")).alias("bb_lower")
-            ]).with_columns([
-                (pl.col("bb_upper") - pl.col("bb_lower")).alias("bb_width")
-            ]).with_columns([
-                (pl.col("bb_width") / pl.col("bb_mid") * 100).alias("normalized_bb_width_percentage")
-            ])
+            keyed = "instrument_key" in df.columns
+            
+            # Calculate Bollinger Bands (in Float64 even when prices are stored as Float32).
+            # Instruments with fewer than bb_period points get no full window, so all
+            # their rows are dropped with the nulls below.
+            if NUMBA_AVAILABLE:
+                # One fused pass for mean and width; the bands themselves are not needed
+                if keyed:
+                    group_ids = df["instrument_key"].rle_id().to_numpy()
+                else:
+                    group_ids = np.zeros(df.height, dtype=np.uint32)
+                bb_mid, bb_width = rolling_bb_width(
+                    df["close"].cast(pl.Float64).to_numpy(), group_ids, bb_period, bb_std_dev
+                )
+                bb_lf = df.lazy().with_columns([
+                    pl.Series("bb_mid", bb_mid, nan_to_null=True),
+                    pl.Series("bb_width", bb_width, nan_to_null=True)
+                ])
+            else:
+                close = pl.col("close").cast(pl.Float64)
+                bb_lf = df.lazy().with_columns([
+                    _per_instrument(close.rolling_mean(bb_period), keyed).alias("bb_mid"),
+                    _per_instrument(close.rolling_std(bb_period), keyed).alias("bb_std")
+                ]).with_columns([
+                    (pl.col("bb_mid") + bb_std_dev * pl.col("bb_std")).alias("bb_upper"),
+                    (pl.col("bb_mid") - bb_std_dev * pl.col("bb_std")).alias("bb_lower")
+                ]).with_columns([
+                    (pl.col("bb_upper") - pl.col("bb_lower")).alias("bb_width")
+                ])
             
             # Drop null values
-            df = df.drop_nulls(["bb_width", "bb_upper", "bb_lower", "normalized_bb_width_percentage"])
+            bb_lf = bb_lf.with_columns([
+                (pl.col("bb_width") / pl.col("bb_mid") * 100).alias("normalized_bb_width_percentage")
+            ]).drop_nulls(["bb_width", "normalized_bb_width_percentage"])
             
             # PHASE 1: Zero value detection before filtering
-            zero_bb_width_count = df.filter(pl.col("bb_width") == 0).height
-            zero_bb_width_percentage = (zero_bb_width_count / df.height) * 100 if df.height > 0 else 0
-            has_zero_bb_width = zero_bb_width_count > 0
+            is_zero = pl.col("bb_width") == 0
+            zero_lf = bb_lf.select(is_zero.sum().alias("zero_count"), pl.len().alias("points"))
             
-            # Log zero value detection
-            if has_zero_bb_width:
-                self.logger.warning(f"Detected {zero_bb_width_count} zero BB width values ({zero_bb_width_percentage:.2f}%)")
+            # Add zero value metrics to result
+            result_lf = bb_lf.with_columns([
+                _per_instrument(is_zero.sum(), keyed).alias("zero_bb_width_count"),
+                (_per_instrument(is_zero.mean(), keyed) * 100).alias("zero_bb_width_percentage"),
+                _per_instrument(is_zero.any(), keyed).alias("has_zero_bb_width")
+            ])
             
             # Enhanced filtering with minimum threshold instead of > 0
             min_bb_width_threshold = 0.001  # Minimum BB width threshold
-            df = df.filter(pl.col("bb_width") > min_bb_width_threshold)
+            result_lf = result_lf.filter(pl.col("bb_width") > min_bb_width_threshold)
             
-            # Add zero value metrics to result
-            df = df.with_columns([
-                pl.lit(zero_bb_width_count).alias("zero_bb_width_count"),
-                pl.lit(zero_bb_width_percentage).alias("zero_bb_width_percentage"),
-                pl.lit(has_zero_bb_width).alias("has_zero_bb_width")
-            ])
+            # Check if we have enough valid BB width values for analysis
+            min_valid_points = bb_period // validation_config['min_bb_period_multiplier']
+            result_lf = result_lf.filter(_per_instrument(pl.len(), keyed) >= min_valid_points)
+            
+            # Both plans share the BB subplan, which collect_all runs only once
+            df, zero_stats = pl.collect_all([result_lf, zero_lf])
+            
+            # Log zero value detection
+            zero_bb_width_count = zero_stats["zero_count"][0]
+            if zero_bb_width_count > 0:
+                zero_bb_width_percentage = zero_bb_width_count / zero_stats["points"][0] * 100
+                self.logger.warning(f"Detected {zero_bb_width_count} zero BB width values ({zero_bb_width_percentage:.2f}%)")
             
             # Post-validation: Check if we have meaningful results
             if df.is_empty():
-                self.logger.warning("No valid BB width values calculated after enhanced filtering")
+                self.logger.warning(f"No valid BB width values calculated: need {bb_period}+ points and "
+                                   f"{min_valid_points}+ widths above {min_bb_width_threshold}")
                 return df
             
-            # Check if we have enough valid BB width values for analysis
-            min_valid_points = bb_period // validation_config['min_bb_period_multiplier']
-            if df.height < min_valid_points:
-                self.logger.warning(f"Insufficient valid BB width values: {df.height} < {min_valid_points} required")
-                return df.filter(pl.lit(False))  # Return empty DataFrame
-            
             self.logger.debug(f"Successfully calculated BB width for {df.height} data points (filtered {zero_bb_width_count} zero values)")
             return df
             
@@ -694,6 +933,13 @@ class IntradayAnalyzer:
         self.logger = logging.getLogger(__name__)
         # Track skipped stocks for reporting
         self.skipped_stocks = {}
+        # Whether results hold every day's stats; only the detailed report reads them
+        self.keep_daily_stats = True
+        # Market hours as microseconds since midnight, parsed once rather than on every _filter_market_hours call
+        self._market_start_us, self._market_end_us = (
+            (datetime.strptime(config.analysis_params[key], "%H:%M") - datetime(1900, 1, 1)) // timedelta(microseconds=1)
+            for key in ('market_start', 'market_end')
+        )
     
     def get_skip_summary(self) -> Dict[str, int]:
         """Get summary of skipped stocks by reason."""
@@ -717,26 +963,76 @@ class IntradayAnalyzer:
                 self.logger.warning(f"No 1minute data for {symbol} ({instrument_key}), skipping.")
                 return None
             
-            # Filter for market hours
-            market_hours_df = self._filter_market_hours(df)
-            if market_hours_df.is_empty():
+            # Filter for market hours and aggregate to 5-minute candles
+            aggregated_df = self._to_5min_bars(df)
+            if aggregated_df.is_empty():
                 self._record_skip(symbol, "No market hours data")
                 self.logger.warning(f"No market hours data for {symbol} ({instrument_key}), skipping.")
                 return None
             
-            # Aggregate to 5-minute candles
-            aggregated_df = self._aggregate_to_5min(market_hours_df)
-            if aggregated_df.is_empty():
-                self._record_skip(symbol, "No 5-minute aggregated data")
-                self.logger.warning(f"No 5-minute aggregated data for {symbol} ({instrument_key}), skipping.")
-                return None
-            
             return self._analyze_intraday_data(aggregated_df, instrument_key, symbol, lookback_days)
         except Exception as e:
             self._record_skip(symbol, f"Analysis error: {str(e)}")
             self.logger.error(f"Analysis failed for {symbol}: {e}")
             return None
     
+    def analyze_block(self, block: List[Dict], lookback_days: Optional[int], df: Optional[pl.DataFrame]) -> List[Optional[Dict]]:
+        """Analyze a block of instruments together; returns one result (None if skipped) per instrument.
+        
+        df is the block's validated 1minute data keyed by instrument_key (see _fetch_block).
+        Market hours filtering, 5-minute aggregation, Bollinger Bands and daily stats each run
+        once over the whole block, per instrument via group_by/over, rather than once per
+        instrument.
+        """
+        try:
+            loaded = set() if df is None else set(df["instrument_key"].unique().to_list())
+            aggregated = set()
+            instrument_stats = {}
+            lowest_days = {}
+            if loaded:
+                aggregated_df = self._to_5min_bars(df)
+                aggregated = set(aggregated_df["instrument_key"].unique().to_list())
+                
+                bb_df = self.bb_calculator.calculate_bollinger_bands(aggregated_df)
+                daily_stats = self._calculate_daily_stats(bb_df)
+                if not daily_stats.is_empty():
+                    instrument_stats = {
+                        instrument_key: stats
+                        for (instrument_key,), stats in daily_stats.partition_by("instrument_key", as_dict=True, include_key=False).items()
+                    }
+                    # Every instrument's lowest day from one filter over the block
+                    lowest_days = {
+                        row["instrument_key"]: self._lowest_day_summary(row)
+                        for row in self._lowest_bb_days(daily_stats).iter_rows(named=True)
+                    }
+            
+            results = []
+            for instrument in block:
+                instrument_key, symbol = instrument['instrument_key'], instrument['symbol']
+                if instrument_key not in loaded:
+                    self._record_skip(symbol, "No 1minute data available")
+                    self.logger.warning(f"No 1minute data for {symbol} ({instrument_key}), skipping.")
+                    results.append(None)
+                elif instrument_key not in aggregated:
+                    self._record_skip(symbol, "No market hours data")
+                    self.logger.warning(f"No market hours data for {symbol} ({instrument_key}), skipping.")
+                    results.append(None)
+                elif instrument_key not in instrument_stats:
+                    results.append(None)
+                else:
+                    if instrument_key not in lowest_days:
+                        self.logger.warning("No days found after zero value filtering")
+                    results.append(self._build_result(
+                        instrument_stats[instrument_key], instrument_key, symbol, lookback_days,
+                        lowest_days.get(instrument_key, {})
+                    ))
+            return results
+        except Exception as e:
+            for instrument in block:
+                self._record_skip(instrument['symbol'], f"Analysis error: {str(e)}")
+            self.logger.error(f"Analysis failed for block of {len(block)} instruments: {e}")
+            return [None] * len(block)
+    
     def analyze_multiple_instruments(self, instruments: List[Dict], lookback_days: Optional[int] = None, update_database: bool = False) -> List[Dict]:
         """Analyze multiple instruments."""
         try:
@@ -748,25 +1044,64 @@ class IntradayAnalyzer:
             results = []
             database_updates = []  # Store updates for batch processing
             
-            for instrument in tqdm(instruments, desc="Analyzing instruments"):
-                result = self.analyze_instrument(
-                    instrument['instrument_key'], 
-                    instrument['symbol'],
-                    lookback_days
-                )
-                if result:
-                    results.append(result)
-                    
-                    # Extract lowest BB width for database update (if enabled)
-                    if update_database:
-                        lowest_day = result.get("lowest_bb_day", {})
-                        lowest_min_bb_width = lowest_day.get("min_bb_width", 0)
+            bulk_fetch_size = self.config.performance_params['bulk_fetch_size']
+            max_workers = self.config.performance_params['max_workers']
+            
+            # Instruments are independent, so each block is split across worker threads.
+            # Polars and the BB width kernel release the GIL, and threads share the block
+            # frame instead of pickling it to worker processes.
+            pool = None
+            if max_workers > 1 and len(instruments) > 1:
+                pool = ThreadPoolExecutor(max_workers=max_workers)
+            
+            blocks = [instruments[start:start + bulk_fetch_size] for start in range(0, len(instruments), bulk_fetch_size)]
+            
+            try:
+                with tqdm(total=len(instruments), desc="Analyzing instruments") as progress, \
+                        ThreadPoolExecutor(max_workers=1) as prefetcher:
+                    # Each block's 1minute data is fetched in the background while the
+                    # previous block is analyzed (connectorx and Polars release the GIL)
+                    next_block_df = prefetcher.submit(self._fetch_block, blocks[0], lookback_days) if blocks else None
+                    for block_number, block in enumerate(blocks):
+                        block_df = next_block_df.result()
+                        if block_number + 1 < len(blocks):
+                            next_block_df = prefetcher.submit(self._fetch_block, blocks[block_number + 1], lookback_days)
+                        
+                        if pool is None:
+                            block_results = self.analyze_block(block, lookback_days, block_df)
+                        else:
+                            # One sub-block per worker, each still analyzed group-wise
+                            sub_size = -(-len(block) // max_workers)
+                            sub_blocks = [block[start:start + sub_size] for start in range(0, len(block), sub_size)]
+                            sub_dfs = [
+                                None if block_df is None else block_df.filter(
+                                    pl.col("instrument_key").is_in([instrument['instrument_key'] for instrument in sub_block])
+                                )
+                                for sub_block in sub_blocks
+                            ]
+                            block_results = []
+                            for sub_results in pool.map(self.analyze_block, sub_blocks, repeat(lookback_days), sub_dfs):
+                                block_results.extend(sub_results)
                         
-                        if lowest_min_bb_width > 0:
-                            database_updates.append((
-                                instrument['instrument_key'], 
-                                lowest_min_bb_width
-                            ))
+                        for instrument, result in zip(block, block_results):
+                            progress.update(1)
+                            if not result:
+                                continue
+                            results.append(result)
+                            
+                            # Extract lowest BB width for database update (if enabled)
+                            if update_database:
+                                lowest_day = result.get("lowest_bb_day", {})
+                                lowest_min_bb_width = lowest_day.get("min_bb_width", 0)
+                                
+                                if lowest_min_bb_width > 0:
+                                    database_updates.append((
+                                        instrument['instrument_key'], 
+                                        lowest_min_bb_width
+                                    ))
+            finally:
+                if pool is not None:
+                    pool.shutdown()
             
             # Batch update database with lowest BB width values (if enabled)
             if update_database and database_updates:
@@ -806,30 +1141,55 @@ class IntradayAnalyzer:
             self.logger.error(f"Multiple instrument analysis failed: {e}")
             return []
     
-    def _filter_market_hours(self, df: pl.DataFrame) -> pl.DataFrame:
-        """Filter data for market hours only."""
+    def _fetch_block(self, block: List[Dict], lookback_days: Optional[int]) -> Optional[pl.DataFrame]:
+        """One 1minute query for a block of instruments, keeping the instruments that pass validation."""
+        bulk_df = self.data_fetcher.get_bulk_data([instrument['instrument_key'] for instrument in block], lookback_days)
+        return None if bulk_df is None else self.data_fetcher.filter_valid_instruments(bulk_df, lookback_days)
+    
+    def _to_5min_bars(self, df: pl.DataFrame) -> pl.DataFrame:
+        """5-minute candles of the market-hours part of 1minute data or SQL bars, built in one lazy plan.
+        
+        Empty exactly when no candle falls inside market hours.
+        """
+        lf = df.lazy()
+        # SQL bars were filtered per 1minute candle already, and a bar may start
+        # before market_start when that is not on a bar boundary
+        if "points" not in df.columns:
+            lf = self._filter_market_hours(lf)
+        return self._aggregate_to_5min(lf).collect()
+    
+    def _filter_market_hours(self, df: pl.LazyFrame) -> pl.LazyFrame:
+        """Filter data for market hours only (the fetch queries already do; this covers frames from elsewhere)."""
         try:
-            market_start = datetime.strptime(self.config.analysis_params['market_start'], "%H:%M").time()
-            market_end = datetime.strptime(self.config.analysis_params['market_end'], "%H:%M").time()
-            
+            # Time of day as an integer remainder, instead of materializing a Time column
             return df.filter(
-                pl.col("timestamp").dt.time().is_between(market_start, market_end)
+                (pl.col("timestamp").dt.epoch("us") % 86_400_000_000).is_between(self._market_start_us, self._market_end_us)
             )
         except Exception as e:
             self.logger.error(f"Market hours filtering failed: {e}")
             return df
     
-    def _aggregate_to_5min(self, df: pl.DataFrame) -> pl.DataFrame:
+    def resample_ohlc(self, df: Union[pl.DataFrame, pl.LazyFrame], every: str) -> Union[pl.DataFrame, pl.LazyFrame]:
+        """Resample candles to `every`-wide OHLCV bars labelled by window start, per instrument if keyed."""
+        return df.sort("timestamp").group_by_dynamic(
+            "timestamp",
+            every=every,
+            closed="left",
+            label="left",
+            group_by="instrument_key" if "instrument_key" in df.collect_schema().names() else None
+        ).agg(
+            pl.col("open").first().alias("open"),
+            pl.col("high").max().alias("high"),
+            pl.col("low").min().alias("low"),
+            pl.col("close").last().alias("close"),
+            pl.col("volume").sum().alias("volume")
+        )
+    
+    def _aggregate_to_5min(self, df: pl.LazyFrame) -> pl.LazyFrame:
         """Aggregate 1-minute data to 5-minute candles."""
         try:
-            grouped = df.group_by(
-                pl.col("timestamp").dt.truncate("5m"), maintain_order=True
-            ).agg(
-                pl.col("open").first().alias("open"),
-                pl.col("high").max().alias("high"),
-                pl.col("low").min().alias("low"),
-                pl.col("close").last().alias("close"),
-                pl.col("volume").sum().alias("volume")
+            grouped = self.resample_ohlc(
+                df, self.config.analysis_params['time_interval']
             ).rename({"timestamp": "dt_5min"})
             
             # Add date column for day splitting
@@ -843,7 +1203,7 @@ class IntradayAnalyzer:
             return df
     
     def _calculate_daily_stats(self, df: pl.DataFrame) -> pl.DataFrame:
-        """Calculate daily BB width statistics."""
+        """Calculate daily BB width statistics (per instrument and day when df is keyed by instrument_key)."""
         try:
             validation_config = self.config.analysis_params['data_validation']
             
@@ -861,54 +1221,62 @@ class IntradayAnalyzer:
                 df = df.with_columns(pl.col("timestamp").dt.date().alias("date"))
                 group_col = 'date'
             
-            # Count unique days
-            unique_days = df[group_col].n_unique()
             min_days_required = validation_config['min_days_required']
-            
-            if unique_days < min_days_required:
-                self.logger.warning(f"Insufficient days for daily analysis: {unique_days} days < {min_days_required} required")
-                return df.filter(pl.lit(False))  # Return empty DataFrame
-            
-            daily_stats = df.group_by(group_col, maintain_order=True).agg(
-                p10_bb_width=pl.col("bb_width").quantile(0.10).round(2),
-                p15_bb_width=pl.col("bb_width").quantile(0.15).round(2),
-                p20_bb_width=pl.col("bb_width").quantile(0.20).round(2),
-                p25_bb_width=pl.col("bb_width").quantile(0.25).round(2),
-                p50_bb_width=pl.col("bb_width").quantile(0.50).round(2),
-                p75_bb_width=pl.col("bb_width").quantile(0.75).round(2),
-                p90_bb_width=pl.col("bb_width").quantile(0.90).round(2),
-                p95_bb_width=pl.col("bb_width").quantile(0.95).round(2),
+            min_data_points_per_day = validation_config['min_data_points_per_day']
+            keyed = "instrument_key" in df.columns
+            group_cols = ["instrument_key", group_col] if keyed else [group_col]
+            
+            # Each width column is sorted once per day; its percentiles, min and max are then
+            # read off the sorted list instead of every quantile() selecting on its own
+            daily_stats = df.lazy().group_by(group_cols, maintain_order=True).agg(
+                sorted_bb_width=pl.col("bb_width").sort(),
+                sorted_normalized=pl.col("normalized_bb_width_percentage").sort(),
                 mean_bb_width=pl.col("bb_width").mean().round(2),
                 std_bb_width=pl.col("bb_width").std().round(2),
-                min_bb_width=pl.col("bb_width").min().round(2),
-                max_bb_width=pl.col("bb_width").max().round(2),
-                p10_normalized_bb_width_percentage=pl.col("normalized_bb_width_percentage").quantile(0.10).round(2),
-                p15_normalized_bb_width_percentage=pl.col("normalized_bb_width_percentage").quantile(0.15).round(2),
-                p20_normalized_bb_width_percentage=pl.col("normalized_bb_width_percentage").quantile(0.20).round(2),
-                p25_normalized_bb_width_percentage=pl.col("normalized_bb_width_percentage").quantile(0.25).round(2),
-                p50_normalized_bb_width_percentage=pl.col("normalized_bb_width_percentage").quantile(0.50).round(2),
                 mean_normalized_bb_width_percentage=pl.col("normalized_bb_width_percentage").mean().round(2),
-                min_normalized_bb_width_percentage=pl.col("normalized_bb_width_percentage").min().round(2),
-                max_normalized_bb_width_percentage=pl.col("normalized_bb_width_percentage").max().round(2),
-                data_points=pl.count(),
+                data_points=pl.len(),
                 # PHASE 1: Add zero value metrics
                 zero_bb_width_count=pl.col("bb_width").filter(pl.col("bb_width") == 0).count(),
-                zero_bb_width_percentage=(pl.col("bb_width").filter(pl.col("bb_width") == 0).count() / pl.count()) * 100,
+                zero_bb_width_percentage=(pl.col("bb_width").filter(pl.col("bb_width") == 0).count() / pl.len()) * 100,
                 has_zero_bb_width=pl.col("bb_width").filter(pl.col("bb_width") == 0).count() > 0
-            )
+            ).select(
+                *group_cols,
+                p10_bb_width=_sorted_quantile("sorted_bb_width", 0.10).round(2),
+                p15_bb_width=_sorted_quantile("sorted_bb_width", 0.15).round(2),
+                p20_bb_width=_sorted_quantile("sorted_bb_width", 0.20).round(2),
+                p25_bb_width=_sorted_quantile("sorted_bb_width", 0.25).round(2),
+                p50_bb_width=_sorted_quantile("sorted_bb_width", 0.50).round(2),
+                p75_bb_width=_sorted_quantile("sorted_bb_width", 0.75).round(2),
+                p90_bb_width=_sorted_quantile("sorted_bb_width", 0.90).round(2),
+                p95_bb_width=_sorted_quantile("sorted_bb_width", 0.95).round(2),
+                mean_bb_width=pl.col("mean_bb_width"),
+                std_bb_width=pl.col("std_bb_width"),
+                min_bb_width=pl.col("sorted_bb_width").list.first().round(2),
+                max_bb_width=pl.col("sorted_bb_width").list.last().round(2),
+                p10_normalized_bb_width_percentage=_sorted_quantile("sorted_normalized", 0.10).round(2),
+                p15_normalized_bb_width_percentage=_sorted_quantile("sorted_normalized", 0.15).round(2),
+                p20_normalized_bb_width_percentage=_sorted_quantile("sorted_normalized", 0.20).round(2),
+                p25_normalized_bb_width_percentage=_sorted_quantile("sorted_normalized", 0.25).round(2),
+                p50_normalized_bb_width_percentage=_sorted_quantile("sorted_normalized", 0.50).round(2),
+                mean_normalized_bb_width_percentage=pl.col("mean_normalized_bb_width_percentage"),
+                min_normalized_bb_width_percentage=pl.col("sorted_normalized").list.first().round(2),
+                max_normalized_bb_width_percentage=pl.col("sorted_normalized").list.last().round(2),
+                data_points=pl.col("data_points"),
+                zero_bb_width_count=pl.col("zero_bb_width_count"),
+                zero_bb_width_percentage=pl.col("zero_bb_width_percentage"),
+                has_zero_bb_width=pl.col("has_zero_bb_width")
+            ).filter(
+                # Enough days with sufficient data points (this also covers the number
+                # of days, which can only be larger)
+                _per_instrument((pl.col("data_points") >= min_data_points_per_day).sum(), keyed) >= min_days_required
+            ).collect()
             
             # Validate that we have meaningful daily stats
             if daily_stats.is_empty():
-                self.logger.warning("No daily statistics calculated")
+                self.logger.warning(f"Insufficient days with adequate data: fewer than {min_days_required} days "
+                                   f"with {min_data_points_per_day}+ points")
                 return daily_stats
             
-            # Check if we have enough days with sufficient data points
-            min_data_points_per_day = validation_config['min_data_points_per_day']
-            days_with_data = daily_stats.filter(pl.col("data_points") >= min_data_points_per_day).height
-            if days_with_data < min_days_required:
-                self.logger.warning(f"Insufficient days with adequate data: {days_with_data} days < {min_days_required} required")
-                return df.filter(pl.lit(False))  # Return empty DataFrame
-            
             self.logger.debug(f"Calculated daily stats for {daily_stats.height} days")
             return daily_stats
             
@@ -916,59 +1284,62 @@ class IntradayAnalyzer:
             self.logger.error(f"Daily stats calculation failed: {e}")
             return df.filter(pl.lit(False))  # Return empty DataFrame on error
     
+    def _lowest_bb_days(self, daily_stats: pl.DataFrame) -> pl.DataFrame:
+        """Row of the day with the lowest 10th percentile BB width (per instrument when keyed)."""
+        keyed = "instrument_key" in daily_stats.columns
+        return daily_stats.filter(
+            # PHASE 1: Filter out days with zero BB width
+            (pl.col("p10_bb_width") > 0) & 
+            (pl.col("p15_bb_width") > 0) &
+            (pl.col("p10_bb_width") >= 0.01)  # Minimum threshold
+        ).filter(
+            # arg_min finds the first lowest day in one pass, where a sort would order every day
+            _per_instrument(pl.int_range(pl.len()) == pl.col("p10_bb_width").arg_min(), keyed)
+        )
+    
     def _find_lowest_bb_day(self, daily_stats: pl.DataFrame) -> Dict:
         """Find the day with the lowest BB width."""
         try:
             if daily_stats.is_empty():
                 return {}
             
-            # PHASE 1: Filter out days with zero BB width
-            filtered_stats = daily_stats.filter(
-                (pl.col("p10_bb_width") > 0) & 
-                (pl.col("p15_bb_width") > 0) &
-                (pl.col("p10_bb_width") >= 0.01)  # Minimum threshold
-            )
-            
-            if filtered_stats.is_empty():
+            lowest_days = self._lowest_bb_days(daily_stats)
+            if lowest_days.is_empty():
                 self.logger.warning("No days found after zero value filtering")
                 return {}
             
-            # Find day with lowest 10th percentile BB width from filtered data
-            lowest_p10 = filtered_stats.sort("p10_bb_width").head(1)
-            
-            if lowest_p10.is_empty():
-                return {}
-            
-            lowest_day = lowest_p10.to_dicts()[0]
-            
-            return {
-                "date": lowest_day["date"],
-                "p10_bb_width": lowest_day["p10_bb_width"],
-                "p15_bb_width": lowest_day["p15_bb_width"],
-                "p20_bb_width": lowest_day["p20_bb_width"],
-                "p25_bb_width": lowest_day["p25_bb_width"],
-                "p50_bb_width": lowest_day["p50_bb_width"],
-                "mean_bb_width": lowest_day["mean_bb_width"],
-                "min_bb_width": lowest_day["min_bb_width"],
-                "max_bb_width": lowest_day["max_bb_width"],
-                "p10_normalized_bb_width_percentage": lowest_day["p10_normalized_bb_width_percentage"],
-                "p15_normalized_bb_width_percentage": lowest_day["p15_normalized_bb_width_percentage"],
-                "p20_normalized_bb_width_percentage": lowest_day["p20_normalized_bb_width_percentage"],
-                "p25_normalized_bb_width_percentage": lowest_day["p25_normalized_bb_width_percentage"],
-                "p50_normalized_bb_width_percentage": lowest_day["p50_normalized_bb_width_percentage"],
-                "mean_normalized_bb_width_percentage": lowest_day["mean_normalized_bb_width_percentage"],
-                "min_normalized_bb_width_percentage": lowest_day["min_normalized_bb_width_percentage"],
-                "max_normalized_bb_width_percentage": lowest_day["max_normalized_bb_width_percentage"],
-                "data_points": lowest_day["data_points"],
-                # PHASE 1: Add zero value metrics
-                "zero_bb_width_count": lowest_day.get("zero_bb_width_count", 0),
-                "zero_bb_width_percentage": lowest_day.get("zero_bb_width_percentage", 0),
-                "has_zero_bb_width": lowest_day.get("has_zero_bb_width", False)
-            }
+            return self._lowest_day_summary(lowest_days.row(0, named=True))
         except Exception as e:
             self.logger.error(f"Lowest BB day calculation failed: {e}")
             return {}
     
+    def _lowest_day_summary(self, lowest_day: Dict) -> Dict:
+        """The lowest BB width day's statistics as reported in a result."""
+        return {
+            "date": lowest_day["date"],
+            "p10_bb_width": lowest_day["p10_bb_width"],
+            "p15_bb_width": lowest_day["p15_bb_width"],
+            "p20_bb_width": lowest_day["p20_bb_width"],
+            "p25_bb_width": lowest_day["p25_bb_width"],
+            "p50_bb_width": lowest_day["p50_bb_width"],
+            "mean_bb_width": lowest_day["mean_bb_width"],
+            "min_bb_width": lowest_day["min_bb_width"],
+            "max_bb_width": lowest_day["max_bb_width"],
+            "p10_normalized_bb_width_percentage": lowest_day["p10_normalized_bb_width_percentage"],
+            "p15_normalized_bb_width_percentage": lowest_day["p15_normalized_bb_width_percentage"],
+            "p20_normalized_bb_width_percentage": lowest_day["p20_normalized_bb_width_percentage"],
+            "p25_normalized_bb_width_percentage": lowest_day["p25_normalized_bb_width_percentage"],
+            "p50_normalized_bb_width_percentage": lowest_day["p50_normalized_bb_width_percentage"],
+            "mean_normalized_bb_width_percentage": lowest_day["mean_normalized_bb_width_percentage"],
+            "min_normalized_bb_width_percentage": lowest_day["min_normalized_bb_width_percentage"],
+            "max_normalized_bb_width_percentage": lowest_day["max_normalized_bb_width_percentage"],
+            "data_points": lowest_day["data_points"],
+            # PHASE 1: Add zero value metrics
+            "zero_bb_width_count": lowest_day.get("zero_bb_width_count", 0),
+            "zero_bb_width_percentage": lowest_day.get("zero_bb_width_percentage", 0),
+            "has_zero_bb_width": lowest_day.get("has_zero_bb_width", False)
+        }
+    
     def _analyze_intraday_data(self, df: pl.DataFrame, instrument_key: str, symbol: str, lookback_days: Optional[int] = None) -> Optional[Dict]:
         """Analyze intraday data (5-minute aggregated)."""
         try:
@@ -982,27 +1353,32 @@ class IntradayAnalyzer:
             if daily_stats.is_empty():
                 return None
             
-            # Find lowest BB width day
-            lowest_bb_day = self._find_lowest_bb_day(daily_stats)
-            
-            # Compile results
-            result = {
-                "instrument_key": instrument_key,
-                "symbol": symbol,
-                "analysis_date": datetime.now().isoformat(),
-                "lookback_days": lookback_days or "ALL",
-                "total_days_analyzed": len(daily_stats),
-                "data_type": "intraday_5min",
-                "lowest_bb_day": lowest_bb_day,
-                "daily_stats": daily_stats.to_dicts()
-            }
-            
-            return result
+            return self._build_result(daily_stats, instrument_key, symbol, lookback_days)
             
         except Exception as e:
             self.logger.error(f"Intraday analysis failed for {symbol}: {e}")
             return None
     
+    def _build_result(self, daily_stats: pl.DataFrame, instrument_key: str, symbol: str, lookback_days: Optional[int] = None,
+                      lowest_bb_day: Optional[Dict] = None) -> Dict:
+        """Compile an instrument's result from its daily statistics (and lowest day, if already found)."""
+        # Find lowest BB width day
+        if lowest_bb_day is None:
+            lowest_bb_day = self._find_lowest_bb_day(daily_stats)
+        
+        # Compile results
+        return {
+            "instrument_key": instrument_key,
+            "symbol": symbol,
+            "analysis_date": datetime.now().isoformat(),
+            "lookback_days": lookback_days or "ALL",
+            "total_days_analyzed": len(daily_stats),
+            "data_type": "intraday_5min",
+            "lowest_bb_day": lowest_bb_day,
+            # Emptied when not kept, so a long run only holds one row of stats per instrument
+            "daily_stats": daily_stats if self.keep_daily_stats else daily_stats.clear()
+        }
+    
     def update_instrument_lowest_bb_width(self, instrument_key: str, symbol: str, lookback_days: Optional[int] = None) -> bool:
         """Analyze a single instrument and update its lowest BB width in the database."""
         try:
@@ -1038,8 +1414,89 @@ class OutputGenerator:
         self.config = config
         self.logger = logging.getLogger(__name__)
     
+    def _format_output_frame(self, df: pl.DataFrame) -> pl.DataFrame:
+        """Convert output rows to the configured format.
+        
+        CSV keeps every column as text with numbers to two decimals, as the master CSVs
+        have always been written. The CSV writer's fixed precision rounds exactly like
+        f"{x:.2f}", so the whole frame is formatted in one write rather than value by
+        value in Python. Arrow and Parquet keep the native types at full precision.
+        """
+        if self.config.output_config['output_format'] != 'csv':
+            return df
+        # Booleans keep the Python spelling used by the rows already in the master CSVs
+        df = df.with_columns(pl.col(pl.Boolean).replace_strict({True: "True", False: "False"}, return_dtype=pl.String))
+        return pl.read_csv(df.write_csv(float_precision=2).encode(), infer_schema=False)
+    
+    def _merge_into_partitions(self, new_df: pl.DataFrame, output_path: str, key_columns: List[str], label: str):
+        """Merge new_df into a Parquet directory partitioned by symbol=/lookback_days=.
+        
+        Only the partitions of the symbols and lookbacks in new_df are read (the filter prunes
+        the rest by path) and written back; every other symbol's file is left untouched.
+        """
+        partition_columns = ["symbol", "lookback_days"]
+        merged = new_df
+        if os.path.exists(output_path):
+            affected = pl.scan_parquet(
+                output_path,
+                hive_partitioning=True,
+                hive_schema={"symbol": pl.String, "lookback_days": pl.String}
+            ).filter(
+                pl.col("symbol").is_in(new_df["symbol"].unique().implode())
+                & pl.col("lookback_days").is_in(new_df["lookback_days"].unique().implode())
+            )
+            merged = pl.concat([
+                affected.join(new_df.lazy().select(key_columns), on=key_columns, how="anti"),
+                new_df.lazy()
+            ], how="vertical_relaxed").select(new_df.columns).collect()
+            self.logger.info(f"Merged {new_df.height} new/updated records into existing {label}")
+        else:
+            self.logger.info(f"Creating new {label} directory with {new_df.height} records")
+        
+        # Each partition is written to the same file name, so rewritten partitions replace the old files
+        merged.write_parquet(output_path, partition_by=partition_columns)
+    
+    def _merge_into_master(self, new_df: pl.DataFrame, output_path: str, key_columns: List[str], label: str):
+        """Write new_df to a master file, replacing existing rows that share its key_columns values.
+        
+        The existing file is scanned lazily and the merge streamed out to a temporary file
+        that is then swapped in, so the master file is never loaded whole. Arrow output is
+        written as zstd-compressed IPC. Parquet output is a partitioned directory, see
+        _merge_into_partitions.
+        """
+        if self.config.output_config['output_format'] == 'parquet':
+            self._merge_into_partitions(new_df, output_path, key_columns, label)
+            return
+        
+        is_csv = self.config.output_config['output_format'] == 'csv'
+        if os.path.exists(output_path):
+            try:
+                # CSV: all columns as strings, like the formatted rows being added
+                existing = pl.scan_csv(output_path, infer_schema=False) if is_csv else pl.scan_ipc(output_path)
+                merged = pl.concat([
+                    existing.join(new_df.lazy().select(key_columns), on=key_columns, how="anti"),
+                    new_df.lazy()
+                ], how="vertical_relaxed")
+                tmp_path = output_path + ".tmp"
+                if is_csv:
+                    merged.sink_csv(tmp_path)
+                else:
+                    merged.sink_ipc(tmp_path, compression="zstd", compat_level=pl.CompatLevel.newest())
+                os.replace(tmp_path, output_path)
+                self.logger.info(f"Merged {new_df.height} new/updated records into existing {label}")
+                return
+            except Exception as e:
+                self.logger.warning(f"Error merging into existing {label}, creating new file: {e}")
+        else:
+            self.logger.info(f"Creating new {label} file with {new_df.height} records")
+        
+        if is_csv:
+            new_df.write_csv(output_path)
+        else:
+            new_df.write_ipc(output_path, compression="zstd", compat_level=pl.CompatLevel.newest())
+    
     def generate_csv_output(self, results: List[Dict], output_filename: str) -> str:
-        """Generate CSV output with analysis results (Master CSV approach)."""
+        """Generate the main output with analysis results (master file approach, CSV, Arrow IPC or Parquet)."""
         try:
             # Create output directory
             output_dir = self.config.output_config['output_dir']
@@ -1055,119 +1512,40 @@ class OutputGenerator:
                     "instrument_key": str(result["instrument_key"]),
                     "symbol": str(result["symbol"]),
                     "analysis_date": str(result["analysis_date"]),
-                    "lookback_days": str(result["lookback_days"]),
-                    "total_days_analyzed": str(result["total_days_analyzed"]),
+                    "lookback_days": result["lookback_days"],
+                    "total_days_analyzed": result["total_days_analyzed"],
                     "data_type": str(result.get("data_type", "unknown")),
                     "lowest_bb_date": str(lowest_day.get("date", "")),
-                    "lowest_p10_bb_width": f"{lowest_day.get('p10_bb_width', 0):.2f}",
-                    "lowest_p15_bb_width": f"{lowest_day.get('p15_bb_width', 0):.2f}",
-                    "lowest_p20_bb_width": f"{lowest_day.get('p20_bb_width', 0):.2f}",
-                    "lowest_p25_bb_width": f"{lowest_day.get('p25_bb_width', 0):.2f}",
-                    "lowest_p50_bb_width": f"{lowest_day.get('p50_bb_width', 0):.2f}",
-                    "lowest_mean_bb_width": f"{lowest_day.get('mean_bb_width', 0):.2f}",
-                    "lowest_min_bb_width": f"{lowest_day.get('min_bb_width', 0):.2f}",
-                    "lowest_max_bb_width": f"{lowest_day.get('max_bb_width', 0):.2f}",
-                    "lowest_p10_normalized_bb_width_percentage": f"{lowest_day.get('p10_normalized_bb_width_percentage', 0):.2f}",
-                    "lowest_p15_normalized_bb_width_percentage": f"{lowest_day.get('p15_normalized_bb_width_percentage', 0):.2f}",
-                    "lowest_p20_normalized_bb_width_percentage": f"{lowest_day.get('p20_normalized_bb_width_percentage', 0):.2f}",
-                    "lowest_p25_normalized_bb_width_percentage": f"{lowest_day.get('p25_normalized_bb_width_percentage', 0):.2f}",
-                    "lowest_p50_normalized_bb_width_percentage": f"{lowest_day.get('p50_normalized_bb_width_percentage', 0):.2f}",
-                    "lowest_mean_normalized_bb_width_percentage": f"{lowest_day.get('mean_normalized_bb_width_percentage', 0):.2f}",
-                    "lowest_min_normalized_bb_width_percentage": f"{lowest_day.get('min_normalized_bb_width_percentage', 0):.2f}",
-                    "lowest_max_normalized_bb_width_percentage": f"{lowest_day.get('max_normalized_bb_width_percentage', 0):.2f}",
-                    "lowest_day_data_points": str(lowest_day.get("data_points", 0)),
+                    "lowest_p10_bb_width": float(lowest_day.get('p10_bb_width', 0)),
+                    "lowest_p15_bb_width": float(lowest_day.get('p15_bb_width', 0)),
+                    "lowest_p20_bb_width": float(lowest_day.get('p20_bb_width', 0)),
+                    "lowest_p25_bb_width": float(lowest_day.get('p25_bb_width', 0)),
+                    "lowest_p50_bb_width": float(lowest_day.get('p50_bb_width', 0)),
+                    "lowest_mean_bb_width": float(lowest_day.get('mean_bb_width', 0)),
+                    "lowest_min_bb_width": float(lowest_day.get('min_bb_width', 0)),
+                    "lowest_max_bb_width": float(lowest_day.get('max_bb_width', 0)),
+                    "lowest_p10_normalized_bb_width_percentage": float(lowest_day.get('p10_normalized_bb_width_percentage', 0)),
+                    "lowest_p15_normalized_bb_width_percentage": float(lowest_day.get('p15_normalized_bb_width_percentage', 0)),
+                    "lowest_p20_normalized_bb_width_percentage": float(lowest_day.get('p20_normalized_bb_width_percentage', 0)),
+                    "lowest_p25_normalized_bb_width_percentage": float(lowest_day.get('p25_normalized_bb_width_percentage', 0)),
+                    "lowest_p50_normalized_bb_width_percentage": float(lowest_day.get('p50_normalized_bb_width_percentage', 0)),
+                    "lowest_mean_normalized_bb_width_percentage": float(lowest_day.get('mean_normalized_bb_width_percentage', 0)),
+                    "lowest_min_normalized_bb_width_percentage": float(lowest_day.get('min_normalized_bb_width_percentage', 0)),
+                    "lowest_max_normalized_bb_width_percentage": float(lowest_day.get('max_normalized_bb_width_percentage', 0)),
+                    "lowest_day_data_points": lowest_day.get("data_points", 0),
                     # PHASE 1: Add zero value metrics
-                    "zero_bb_width_flag": str(lowest_day.get("has_zero_bb_width", False)),
-                    "zero_bb_width_percentage": f"{lowest_day.get('zero_bb_width_percentage', 0):.2f}",
-                    "zero_bb_width_count": str(lowest_day.get("zero_bb_width_count", 0))
+                    "zero_bb_width_flag": lowest_day.get("has_zero_bb_width", False),
+                    "zero_bb_width_percentage": float(lowest_day.get('zero_bb_width_percentage', 0)),
+                    "zero_bb_width_count": lowest_day.get("zero_bb_width_count", 0)
                 })
             
-            # Create DataFrame for new data
-            new_df = pl.DataFrame(new_data)
-            
-            # Check if existing CSV file exists
-            if os.path.exists(output_path):
-                try:
-                    # Read existing CSV, force all columns to string
-                    existing_df = pl.read_csv(output_path, dtypes={
-                        "instrument_key": pl.Utf8,
-                        "symbol": pl.Utf8,
-                        "analysis_date": pl.Utf8,
-                        "lookback_days": pl.Utf8,
-                        "total_days_analyzed": pl.Utf8,
-                        "data_type": pl.Utf8,
-                        "lowest_bb_date": pl.Utf8,
-                        "lowest_p10_bb_width": pl.Utf8,
-                        "lowest_p15_bb_width": pl.Utf8,
-                        "lowest_p20_bb_width": pl.Utf8,
-                        "lowest_p25_bb_width": pl.Utf8,
-                        "lowest_p50_bb_width": pl.Utf8,
-                        "lowest_mean_bb_width": pl.Utf8,
-                        "lowest_min_bb_width": pl.Utf8,
-                        "lowest_max_bb_width": pl.Utf8,
-                        "lowest_p10_normalized_bb_width_percentage": pl.Utf8,
-                        "lowest_p15_normalized_bb_width_percentage": pl.Utf8,
-                        "lowest_p20_normalized_bb_width_percentage": pl.Utf8,
-                        "lowest_p25_normalized_bb_width_percentage": pl.Utf8,
-                        "lowest_p50_normalized_bb_width_percentage": pl.Utf8,
-                        "lowest_mean_normalized_bb_width_percentage": pl.Utf8,
-                        "lowest_min_normalized_bb_width_percentage": pl.Utf8,
-                        "lowest_max_normalized_bb_width_percentage": pl.Utf8,
-                        "lowest_day_data_points": pl.Utf8,
-                        # PHASE 1: Add zero value metrics dtypes
-                        "zero_bb_width_flag": pl.Utf8,
-                        "zero_bb_width_percentage": pl.Utf8,
-                        "zero_bb_width_count": pl.Utf8
-                    })
-                    self.logger.info(f"Found existing CSV with {existing_df.height} records")
-                    
-                    # Create composite keys for matching (symbol + lookback_days)
-                    existing_df = existing_df.with_columns(
-                        pl.concat_str([
-                            pl.col("symbol"), 
-                            pl.col("lookback_days")
-                        ], separator="|").alias("composite_key")
-                    )
-                    
-                    new_df = new_df.with_columns(
-                        pl.concat_str([
-                            pl.col("symbol"), 
-                            pl.col("lookback_days")
-                        ], separator="|").alias("composite_key")
-                    )
-                    
-                    # Get composite keys from new data
-                    new_keys = set(new_df["composite_key"].to_list())
-                    self.logger.info(f"Current run composite keys: {new_keys}")
-                    
-                    # Filter existing data to exclude records that will be updated
-                    existing_filtered = existing_df.filter(
-                        ~pl.col("composite_key").is_in(new_keys)
-                    )
-                    
-                    # Remove composite_key column from both DataFrames
-                    existing_filtered = existing_filtered.drop("composite_key")
-                    new_df = new_df.drop("composite_key")
-                    
-                    self.logger.info(f"Preserved {existing_filtered.height} existing records for other symbol/lookback combinations")
-                    
-                    # Combine existing (filtered) and new data
-                    combined_df = pl.concat([existing_filtered, new_df], how="vertical")
-                    
-                    self.logger.info(f"Updated CSV: {existing_df.height} original records, {existing_filtered.height} preserved, {len(new_data)} new/updated records, {combined_df.height} total records")
-                    
-                except Exception as e:
-                    self.logger.warning(f"Error reading existing CSV, creating new file: {e}")
-                    combined_df = new_df
-            else:
-                # Create new CSV file
-                combined_df = new_df
-                self.logger.info(f"Creating new CSV file with {len(new_data)} records")
+            # Create DataFrame for new data; lookback_days is text since it may be "ALL"
+            new_df = self._format_output_frame(pl.DataFrame(new_data, schema_overrides={"lookback_days": pl.String}))
             
-            # Save combined DataFrame to CSV
-            combined_df.write_csv(output_path)
+            # Replace this run's symbol/lookback rows in the master output
+            self._merge_into_master(new_df, output_path, ["symbol", "lookback_days"], "output")
             
-            self.logger.info(f"CSV output saved to: {output_path}")
+            self.logger.info(f"Output saved to: {output_path}")
             return output_path
             
         except Exception as e:
@@ -1175,7 +1553,7 @@ class OutputGenerator:
             return ""
     
     def generate_detailed_report(self, results: List[Dict], output_filename: str) -> str:
-        """Generate detailed report with all statistics (Master CSV approach)."""
+        """Generate detailed report with all statistics (master file approach, CSV, Arrow IPC or Parquet)."""
         try:
             # Create output directory
             output_dir = self.config.output_config['output_dir']
@@ -1183,121 +1561,38 @@ class OutputGenerator:
             
             output_path = os.path.join(output_dir, output_filename)
             
-            # Prepare detailed data
-            new_detailed_data = []
-            for result in results:
-                for daily_stat in result.get("daily_stats", []):
-                    new_detailed_data.append({
-                        "instrument_key": str(result["instrument_key"]),
-                        "symbol": str(result["symbol"]),
-                        "lookback_days": str(result["lookback_days"]),
-                        "date": str(daily_stat["date"]),
-                        "p10_bb_width": f"{daily_stat['p10_bb_width']:.2f}",
-                        "p15_bb_width": f"{daily_stat['p15_bb_width']:.2f}",
-                        "p20_bb_width": f"{daily_stat['p20_bb_width']:.2f}",
-                        "p25_bb_width": f"{daily_stat['p25_bb_width']:.2f}",
-                        "p50_bb_width": f"{daily_stat['p50_bb_width']:.2f}",
-                        "p75_bb_width": f"{daily_stat['p75_bb_width']:.2f}",
-                        "p90_bb_width": f"{daily_stat['p90_bb_width']:.2f}",
-                        "p95_bb_width": f"{daily_stat['p95_bb_width']:.2f}",
-                        "mean_bb_width": f"{daily_stat['mean_bb_width']:.2f}",
-                        "std_bb_width": f"{daily_stat['std_bb_width']:.2f}",
-                        "min_bb_width": f"{daily_stat['min_bb_width']:.2f}",
-                        "max_bb_width": f"{daily_stat['max_bb_width']:.2f}",
-                        "p10_normalized_bb_width_percentage": f"{daily_stat['p10_normalized_bb_width_percentage']:.2f}",
-                        "p15_normalized_bb_width_percentage": f"{daily_stat['p15_normalized_bb_width_percentage']:.2f}",
-                        "p20_normalized_bb_width_percentage": f"{daily_stat['p20_normalized_bb_width_percentage']:.2f}",
-                        "p25_normalized_bb_width_percentage": f"{daily_stat['p25_normalized_bb_width_percentage']:.2f}",
-                        "p50_normalized_bb_width_percentage": f"{daily_stat['p50_normalized_bb_width_percentage']:.2f}",
-                        "mean_normalized_bb_width_percentage": f"{daily_stat['mean_normalized_bb_width_percentage']:.2f}",
-                        "min_normalized_bb_width_percentage": f"{daily_stat['min_normalized_bb_width_percentage']:.2f}",
-                        "max_normalized_bb_width_percentage": f"{daily_stat['max_normalized_bb_width_percentage']:.2f}",
-                        "data_points": str(daily_stat["data_points"])
-                    })
+            # Each result already holds its daily statistics as a frame; the report takes
+            # these columns from all of them, tagged with the instrument and lookback
+            stat_columns = [
+                "p10_bb_width", "p15_bb_width", "p20_bb_width", "p25_bb_width", "p50_bb_width",
+                "p75_bb_width", "p90_bb_width", "p95_bb_width", "mean_bb_width", "std_bb_width",
+                "min_bb_width", "max_bb_width",
+                "p10_normalized_bb_width_percentage", "p15_normalized_bb_width_percentage",
+                "p20_normalized_bb_width_percentage", "p25_normalized_bb_width_percentage",
+                "p50_normalized_bb_width_percentage", "mean_normalized_bb_width_percentage",
+                "min_normalized_bb_width_percentage", "max_normalized_bb_width_percentage"
+            ]
+            new_detailed_frames = [
+                result["daily_stats"].select(
+                    pl.lit(str(result["instrument_key"])).alias("instrument_key"),
+                    pl.lit(str(result["symbol"])).alias("symbol"),
+                    pl.lit(str(result["lookback_days"])).alias("lookback_days"),
+                    pl.col("date").cast(pl.String),
+                    pl.col(stat_columns).cast(pl.Float64),
+                    pl.col("data_points").cast(pl.Int64)
+                )
+                for result in results
+                if not result["daily_stats"].is_empty()
+            ]
+            if not new_detailed_frames:
+                self.logger.warning("No daily statistics to write to the detailed report")
+                return ""
             
             # Create DataFrame for new detailed data
-            new_df = pl.DataFrame(new_detailed_data)
-            
-            # Check if existing detailed CSV file exists
-            if os.path.exists(output_path):
-                try:
-                    # Read existing CSV, force all columns to string
-                    existing_df = pl.read_csv(output_path, dtypes={
-                        "instrument_key": pl.Utf8,
-                        "symbol": pl.Utf8,
-                        "lookback_days": pl.Utf8,
-                        "date": pl.Utf8,
-                        "p10_bb_width": pl.Utf8,
-                        "p15_bb_width": pl.Utf8,
-                        "p20_bb_width": pl.Utf8,
-                        "p25_bb_width": pl.Utf8,
-                        "p50_bb_width": pl.Utf8,
-                        "p75_bb_width": pl.Utf8,
-                        "p90_bb_width": pl.Utf8,
-                        "p95_bb_width": pl.Utf8,
-                        "mean_bb_width": pl.Utf8,
-                        "std_bb_width": pl.Utf8,
-                        "min_bb_width": pl.Utf8,
-                        "max_bb_width": pl.Utf8,
-                        "p10_normalized_bb_width_percentage": pl.Utf8,
-                        "p15_normalized_bb_width_percentage": pl.Utf8,
-                        "p20_normalized_bb_width_percentage": pl.Utf8,
-                        "p25_normalized_bb_width_percentage": pl.Utf8,
-                        "p50_normalized_bb_width_percentage": pl.Utf8,
-                        "mean_normalized_bb_width_percentage": pl.Utf8,
-                        "min_normalized_bb_width_percentage": pl.Utf8,
-                        "max_normalized_bb_width_percentage": pl.Utf8,
-                        "data_points": pl.Utf8
-                    })
-                    self.logger.info(f"Found existing detailed CSV with {existing_df.height} records")
-                    
-                    # Create composite keys for matching (symbol + lookback_days + date)
-                    existing_df = existing_df.with_columns(
-                        pl.concat_str([
-                            pl.col("symbol"), 
-                            pl.col("lookback_days"),
-                            pl.col("date")
-                        ], separator="|").alias("composite_key")
-                    )
-                    
-                    new_df = new_df.with_columns(
-                        pl.concat_str([
-                            pl.col("symbol"), 
-                            pl.col("lookback_days"),
-                            pl.col("date")
-                        ], separator="|").alias("composite_key")
-                    )
-                    
-                    # Get composite keys from new data
-                    new_keys = set(new_df["composite_key"].to_list())
-                    self.logger.info(f"Current run composite keys for detailed report: {len(new_keys)} keys")
-                    
-                    # Filter existing data to exclude records that will be updated
-                    existing_filtered = existing_df.filter(
-                        ~pl.col("composite_key").is_in(new_keys)
-                    )
-                    
-                    # Remove composite_key column from both DataFrames
-                    existing_filtered = existing_filtered.drop("composite_key")
-                    new_df = new_df.drop("composite_key")
-                    
-                    self.logger.info(f"Preserved {existing_filtered.height} existing detailed records for other symbol/lookback/date combinations")
-                    
-                    # Combine existing (filtered) and new data
-                    combined_df = pl.concat([existing_filtered, new_df], how="vertical")
-                    
-                    self.logger.info(f"Updated detailed CSV: {existing_df.height} original records, {existing_filtered.height} preserved, {len(new_detailed_data)} new/updated records, {combined_df.height} total records")
-                    
-                except Exception as e:
-                    self.logger.warning(f"Error reading existing detailed CSV, creating new file: {e}")
-                    combined_df = new_df
-            else:
-                # Create new detailed CSV file
-                combined_df = new_df
-                self.logger.info(f"Creating new detailed CSV file with {len(new_detailed_data)} records")
+            new_df = self._format_output_frame(pl.concat(new_detailed_frames))
             
-            # Save combined DataFrame to CSV
-            combined_df.write_csv(output_path)
+            # Replace this run's symbol/lookback/date rows in the master detailed report
+            self._merge_into_master(new_df, output_path, ["symbol", "lookback_days", "date"], "detailed report")
             
             self.logger.info(f"Detailed report saved to: {output_path}")
             return output_path
@@ -1346,12 +1641,22 @@ def main():
     
     # Output parameters
     parser.add_argument("--output-file", type=str, 
-                       default="bb_width_analysis.csv",
-                       help="Output CSV filename")
+                       help="Output filename (default: bb_width_analysis.csv, or bb_width_analysis.<format> with --format)")
+    parser.add_argument("--format", choices=["csv", "arrow", "parquet"], default="csv",
+                       help="Output format: csv, zstd-compressed Arrow IPC (smaller and faster, keeps column types), "
+                            "or a Parquet directory partitioned by symbol and lookback (a run rewrites only its own symbols)")
     parser.add_argument("--detailed-report", action='store_true',
                        help="Generate detailed report with all daily statistics")
     parser.add_argument("--verbose", action='store_true',
                        help="Enable verbose logging")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                       help="Number of threads analyzing instruments in parallel (1 = main thread only)")
+    parser.add_argument("--cache-dir", type=str, default=INTRADAY_CACHE_DIR,
+                       help="Directory of the per-instrument Parquet cache of fetched bars")
+    parser.add_argument("--no-cache", action='store_true',
+                       help="Query all bars from the database without reading or writing the cache")
+    parser.add_argument("--refresh-cache", action='store_true',
+                       help="Drop the analyzed instruments' cached bars and reload them all from the database")
     
     # Database update parameters
     parser.add_argument("--update-database", action='store_true',
@@ -1374,6 +1679,13 @@ def main():
     
     # Update config with command line arguments
     config.analysis_params['bb_period'] = args.bb_period
+    config.performance_params['max_workers'] = args.workers
+    config.performance_params['bar_cache_dir'] = None if args.no_cache else args.cache_dir
+    config.performance_params['refresh_bar_cache'] = args.refresh_cache
+    config.output_config['output_format'] = args.format
+    if args.output_file is None:
+        base_filename = os.path.splitext(config.output_config['csv_filename'])[0]
+        args.output_file = f"{base_filename}.{args.format}"
     config.analysis_params['bb_std_dev'] = args.bb_std
     config.analysis_params['market_start'] = args.market_start
     config.analysis_params['market_end'] = args.market_end
@@ -1408,15 +1720,16 @@ def main():
         
         # Initialize analyzers and output generator
         analyzer = IntradayAnalyzer(config, db_manager)
+        analyzer.keep_daily_stats = args.detailed_report and not args.skip_csv_output
         output_generator = OutputGenerator(config)
         
         # Show database summary if requested
         if args.show_db_summary:
             logger.info("Fetching database summary...")
             summary_df = db_manager.get_lowest_bb_width_summary()
-            if summary_df is not None and not summary_df.empty:
+            if summary_df is not None and not summary_df.is_empty():
                 logger.info(f"\nDatabase Summary (Top 10 instruments with lowest BB width):")
-                logger.info(summary_df.head(10).to_string(index=False))
+                logger.info(summary_df.head(10))
             else:
                 logger.info("No lowest_bb_width data found in database")
             return
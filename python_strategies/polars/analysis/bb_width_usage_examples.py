@@ -86,9 +86,14 @@ Available Command Line Options:
 --bb-std STD_DEV                 : Bollinger Bands standard deviations (default: 2.0)
 --market-start HH:MM             : Market start time (default: 09:15)
 --market-end HH:MM               : Market end time (default: 15:30)
---output-file FILENAME           : Output CSV filename (default: bb_width_analysis.csv)
+--output-file FILENAME           : Output filename (default: bb_width_analysis.csv, .arrow/.parquet with --format)
+--format {csv,arrow,parquet}     : Output format (default: csv; arrow writes zstd-compressed Arrow IPC,
+                                   parquet a directory partitioned by symbol and lookback)
 --detailed-report                : Generate detailed report with all daily statistics
 --verbose                        : Enable verbose logging
+--cache-dir DIR                  : Parquet cache of fetched bars (default: data/bbw_intraday)
+--refresh-cache                  : Reload the analyzed instruments' cached bars from the database
+--no-cache                       : Query every bar from the database, bypassing the cache
 
 Examples:
 ---------
@@ -0,0 +1,73 @@
+"""
+Per-instrument Parquet cache of candles for the BBW analyzers.
+
+Each instrument's candles (daily, or intraday bars) live in one Parquet
+file, so a run only needs to pull the data after the last cached date
+from the database.
+"""
+
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+import polars as pl
+
+DAILY_CACHE_DIR = "data/bbw_daily"
+INTRADAY_CACHE_DIR = "data/bbw_intraday"
+
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def cache_path(cache_dir: str, instrument_key: str) -> str:
+    """Parquet file for an instrument; keys like 'NSE_EQ|INE848E01016' are made filename-safe."""
+    return os.path.join(cache_dir, _UNSAFE_FILENAME_RE.sub("_", instrument_key) + ".parquet")
+
+
+def load_cached(cache_dir: str, instrument_key: str) -> Optional[pl.LazyFrame]:
+    """Lazy scan of the instrument's cached candles, or None if nothing is cached yet."""
+    path = cache_path(cache_dir, instrument_key)
+    if not os.path.exists(path):
+        return None
+    return pl.scan_parquet(path)
+
+
+def append_new(cache_dir: str, instrument_key: str, new_df: pl.DataFrame) -> None:
+    """
+    Appends candles newer than the cache to the instrument's file.
+    The combined data is streamed to a temporary file and swapped in, so a
+    failed write never leaves a truncated cache behind.
+    """
+    cached = load_cached(cache_dir, instrument_key)
+    combined = new_df.lazy() if cached is None else pl.concat([cached, new_df.lazy()], how="vertical_relaxed")
+    _write(cache_dir, instrument_key, combined)
+
+
+def replace_since(cache_dir: str, instrument_key: str, new_df: pl.DataFrame, column: str,
+                  since: Optional[datetime]) -> None:
+    """
+    Replaces the instrument's cached rows whose `column` is at or after `since`
+    with new_df, e.g. to refetch a trading day that was still in progress when
+    it was cached. With since None the whole file is replaced.
+    """
+    cached = load_cached(cache_dir, instrument_key) if since is not None else None
+    combined = new_df.lazy() if cached is None else pl.concat(
+        [cached.filter(pl.col(column) < since), new_df.lazy()], how="vertical_relaxed"
+    )
+    _write(cache_dir, instrument_key, combined)
+
+
+def _write(cache_dir: str, instrument_key: str, combined: pl.LazyFrame) -> None:
+    """Streams the instrument's candles to a temporary file and swaps it in."""
+    path = cache_path(cache_dir, instrument_key)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    combined.sink_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def clear_cached(cache_dir: str, instrument_key: str) -> None:
+    """Drops the instrument's cached candles so the next run reloads them all."""
+    path = cache_path(cache_dir, instrument_key)
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,144 @@
+"""
+Numba kernels for the Bollinger Band Width analyzers.
+
+The kernels are JIT compiled when Numba is installed and run as plain
+Python otherwise, so Numba stays optional for the analysis scripts.
+"""
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True)
+def bbw_squeeze(close: np.ndarray, bb_period: int, bb_std_dev: float, lookback: int,
+                contraction: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Daily BB width, squeeze flag, contraction flag and lookback mean in one pass over close.
+
+    Returns (keep, bb_width, is_squeeze, is_contracting, bbw_avg). keep marks
+    the input rows that have a full BB window and a non-zero width; the other
+    four arrays hold only those rows, and the squeeze, contraction and mean
+    windows run over them. A kept row is a squeeze when its width is the
+    minimum of the last `lookback` kept widths, and contracting when the last
+    `contraction` width changes are all <= 0.
+
+    The band variance comes from Float64 running sums of close and close^2
+    (close may be Float32), shifted by the first close to limit cancellation.
+    Variance below 1e-12 * mean^2 is rounding noise from a flat window and
+    counts as zero width.
+    """
+    size = close.shape[0]
+    keep = np.zeros(size, dtype=np.bool_)
+    bb_width = np.empty(size)
+    is_squeeze = np.zeros(size, dtype=np.bool_)
+    is_contracting = np.zeros(size, dtype=np.bool_)
+    bbw_avg = np.full(size, np.nan)
+    window = np.empty(size, dtype=np.int64)
+    shift = np.float64(close[0]) if size > 0 else 0.0
+    close_sum = 0.0
+    close_sq_sum = 0.0
+    head = 0
+    tail = 0
+    width_sum = 0.0
+    run = 0
+    n = 0
+    for i in range(size):
+        x = np.float64(close[i]) - shift
+        close_sum += x
+        close_sq_sum += x * x
+        if i >= bb_period:
+            x = np.float64(close[i - bb_period]) - shift
+            close_sum -= x
+            close_sq_sum -= x * x
+        if i < bb_period - 1:
+            continue
+        var = (close_sq_sum - close_sum * close_sum / bb_period) / (bb_period - 1)
+        mean = close_sum / bb_period + shift
+        if not var > 1e-12 * mean * mean:
+            continue
+        width = 2.0 * bb_std_dev * math.sqrt(var)
+        keep[i] = True
+        bb_width[n] = width
+
+        # Contraction: the last `contraction` width diffs are all <= 0
+        run = run + 1 if n == 0 or width <= bb_width[n - 1] else 0
+        is_contracting[n] = run >= contraction
+
+        # Squeeze: monotonic deque of width indices, minimum at the front
+        while tail > head and bb_width[window[tail - 1]] >= width:
+            tail -= 1
+        window[tail] = n
+        tail += 1
+        if window[head] <= n - lookback:
+            head += 1
+        width_sum += width
+        if n >= lookback:
+            width_sum -= bb_width[n - lookback]
+        if n >= lookback - 1:
+            is_squeeze[n] = window[head] == n
+            bbw_avg[n] = width_sum / lookback
+        n += 1
+    return keep, bb_width[:n], is_squeeze[:n], is_contracting[:n], bbw_avg[:n]
+
+
+@njit(cache=True, nogil=True)
+def rolling_bb_width(close: np.ndarray, group_ids: np.ndarray, bb_period: int,
+                     bb_std_dev: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling mean and BB width (2 * bb_std_dev * sample std) over bb_period rows.
+
+    Returns (bb_mid, bb_width). The window restarts wherever group_ids changes,
+    so several instruments stored back to back are computed in one call.
+    Mean and M2 (sum of squared deviations) are updated together by Welford's
+    recurrence. Once a window is full, each row swaps the leaving value for
+    the new one in O(1), instead of rescanning the window for mean and std.
+    Variance below 1e-12 * mean^2 counts as zero width, as in bbw_squeeze.
+    Rows before a group's first full window are NaN.
+
+    Runs without the GIL, so the intraday analyzer's prefetch thread keeps
+    fetching the next block meanwhile.
+    """
+    size = close.shape[0]
+    bb_mid = np.full(size, np.nan)
+    bb_width = np.full(size, np.nan)
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(size):
+        if i > 0 and group_ids[i] != group_ids[i - 1]:
+            count = 0
+            mean = 0.0
+            m2 = 0.0
+        x = np.float64(close[i])
+        if count < bb_period:
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+        else:
+            old = np.float64(close[i - bb_period])
+            new_mean = mean + (x - old) / bb_period
+            m2 += (x - old) * (x - new_mean + old - mean)
+            mean = new_mean
+        if count == bb_period:
+            var = m2 / (bb_period - 1)
+            bb_mid[i] = mean
+            bb_width[i] = 2.0 * bb_std_dev * math.sqrt(var) if var > 1e-12 * mean * mean else 0.0
+    return bb_mid, bb_width
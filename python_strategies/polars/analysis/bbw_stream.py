@@ -0,0 +1,70 @@
+"""
+Streaming Bollinger Band Width squeeze detection.
+
+A bar is a squeeze when its BB width is the lowest over the last `lookback`
+trading days. Rather than a sliding window over every intraday bar, each
+instrument keeps one minimum per completed day in a monotonic deque, plus
+the running minimum of the current day. Each bar is then checked against at
+most `lookback` day summaries, and the state stays small however long the
+bar history gets.
+"""
+
+from collections import deque
+from datetime import date
+from typing import Dict, Hashable
+
+
+class _InstrumentState:
+    """Day-level BBW summary for one instrument."""
+
+    __slots__ = ("day", "day_number", "day_min", "day_mins")
+
+    def __init__(self):
+        self.day = None
+        self.day_number = -1       # Days seen so far, minus one
+        self.day_min = float("inf")
+        # (day_number, min_bb_width) of completed days, minimums increasing front to back
+        self.day_mins = deque()
+
+
+class StreamingSqueezeDetector:
+    """Online squeeze check over the last `lookback` days of BB width, per instrument."""
+
+    def __init__(self, lookback: int):
+        self.lookback = lookback
+        self._states: Dict[Hashable, _InstrumentState] = {}
+
+    def update(self, instrument_key: Hashable, day: date, bb_width: float) -> bool:
+        """
+        Feed one bar (in time order) and return whether it is a squeeze.
+
+        False until `lookback` days have been seen. With one bar per day this
+        reproduces the daily analyzer's is_squeeze.
+        """
+        state = self._states.get(instrument_key)
+        if state is None:
+            state = self._states[instrument_key] = _InstrumentState()
+
+        if day != state.day:
+            if state.day is not None:
+                # Roll the finished day into the summaries; days it undercuts can never be the minimum again
+                while state.day_mins and state.day_mins[-1][1] >= state.day_min:
+                    state.day_mins.pop()
+                state.day_mins.append((state.day_number, state.day_min))
+            state.day = day
+            state.day_number += 1
+            state.day_min = float("inf")
+            # Keep the previous lookback - 1 days; today completes the window
+            while state.day_mins and state.day_mins[0][0] <= state.day_number - self.lookback:
+                state.day_mins.popleft()
+
+        if bb_width < state.day_min:
+            state.day_min = bb_width
+
+        if state.day_number < self.lookback - 1:
+            return False
+        return bb_width <= state.day_min and (not state.day_mins or bb_width <= state.day_mins[0][1])
+
+    def reset(self, instrument_key: Hashable) -> None:
+        """Forget an instrument's history, e.g. before replaying it."""
+        self._states.pop(instrument_key, None)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Warm the Numba on-disk cache for the BBW kernels.
+
+The kernels in bbw_kernels.py are compiled with cache=True, so the LLVM
+compile happens once and later processes load the cached machine code.
+Run this once after installing or changing the kernels so that the first
+analyzer run does not pay the JIT cost:
+
+    python compile_kernels.py
+
+Cached kernels load in a fraction of the compile time, which is what
+matters for the analyzers run repeatedly from cron. This is used instead
+of ahead-of-time builds with numba.pycc, which is deprecated and would
+mean shipping a platform-specific extension module.
+"""
+
+import time
+
+import numpy as np
+
+from bbw_kernels import NUMBA_AVAILABLE, bbw_squeeze, rolling_bb_width
+
+
+def warm_kernels():
+    """Call every kernel once with the argument types the analyzers use."""
+    close = np.linspace(100.0, 110.0, 64)
+    bbw_squeeze(close, 20, 2.0, 10, 5)
+    rolling_bb_width(close, np.zeros(64, dtype=np.uint32), 20, 2.0)
+
+
+def main():
+    if not NUMBA_AVAILABLE:
+        print("Numba is not installed; the kernels run as plain Python and need no compiling.")
+        return
+    start = time.perf_counter()
+    warm_kernels()
+    print(f"BBW kernels compiled and cached in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
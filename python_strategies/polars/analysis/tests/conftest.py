@@ -0,0 +1,11 @@
+"""
+Shared pytest setup for the BB width analysis tests.
+
+The analysis scripts import each other as top-level modules (from bbw_kernels import ...),
+so their directory goes on sys.path here.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,73 @@
+"""
+Tests for the streaming BB width squeeze detector.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from bbw_kernels import bbw_squeeze
+from bbw_stream import StreamingSqueezeDetector
+
+LOOKBACK = 10
+START = date(2024, 1, 1)
+
+
+def _brute_force_squeeze(days, widths, lookback):
+    """A bar is a squeeze when no bar so far in its last `lookback` days is narrower."""
+    first_day = {}
+    for day in days:
+        first_day.setdefault(day, len(first_day))
+    flags = []
+    for j, (day, width) in enumerate(zip(days, widths)):
+        day_number = first_day[day]
+        if day_number < lookback - 1:
+            flags.append(False)
+            continue
+        window = [widths[i] for i in range(j + 1) if first_day[days[i]] > day_number - lookback]
+        flags.append(width <= min(window))
+    return flags
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_one_bar_per_day_matches_bbw_squeeze(seed):
+    """With one bar per day the detector reproduces the daily analyzer's is_squeeze."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, 300))
+    _, bb_width, is_squeeze, _, _ = bbw_squeeze(close, 20, 2.0, LOOKBACK, 5)
+
+    detector = StreamingSqueezeDetector(LOOKBACK)
+    flags = [detector.update("K", START + timedelta(days=i), width) for i, width in enumerate(bb_width)]
+
+    assert is_squeeze.any()
+    assert flags == is_squeeze.tolist()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_multi_bar_days_match_brute_force(seed):
+    """Intraday bars are checked against every bar of the last lookback days seen so far."""
+    rng = np.random.default_rng(seed)
+    bars_per_day = rng.integers(1, 8, 60)
+    days = [START + timedelta(days=d) for d, count in enumerate(bars_per_day) for _ in range(count)]
+    # Coarse widths so ties with the window minimum occur
+    widths = np.round(rng.uniform(0.5, 3.0, len(days)), 1).tolist()
+
+    detector = StreamingSqueezeDetector(LOOKBACK)
+    flags = [detector.update("K", day, width) for day, width in zip(days, widths)]
+
+    expected = _brute_force_squeeze(days, widths, LOOKBACK)
+    assert any(expected)
+    assert flags == expected
+
+
+def test_instruments_are_independent():
+    """Each instrument keeps its own day history, and reset forgets it."""
+    detector = StreamingSqueezeDetector(2)
+    assert detector.update("A", START, 1.0) is False
+    assert detector.update("B", START, 5.0) is False
+    assert detector.update("A", START + timedelta(days=1), 0.5) is True
+    assert detector.update("B", START + timedelta(days=1), 6.0) is False
+
+    detector.reset("A")
+    assert detector.update("A", START + timedelta(days=2), 0.1) is False
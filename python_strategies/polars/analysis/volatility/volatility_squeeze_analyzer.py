@@ -102,6 +102,7 @@ class DatabaseManager:
     def __init__(self, config: ConfigurationManager):
         self.config = config
         self.connection = None
+        self.prepared_cursor = None
         self.logger = logging.getLogger(__name__)
     
     def connect(self) -> bool:
@@ -126,6 +127,9 @@ class DatabaseManager:
     
     def disconnect(self):
         """Close database connection."""
+        if self.prepared_cursor is not None:
+            self.prepared_cursor.close()
+            self.prepared_cursor = None
         if self.connection and self.connection.is_connected():
             self.connection.close()
             self.logger.info("Database connection closed")
@@ -141,6 +145,18 @@ class DatabaseManager:
         except Exception as e:
             self.logger.error(f"Query execution failed: {e}")
             return None
+    
+    def execute_prepared(self, query: str, params: tuple) -> Optional[List[tuple]]:
+        """Execute a parameterized query on a reused server-side prepared statement and return the rows."""
+        try:
+            # The cursor keeps its statement prepared while the same query is executed again
+            if self.prepared_cursor is None:
+                self.prepared_cursor = self.connection.cursor(prepared=True)
+            self.prepared_cursor.execute(query, params)
+            return self.prepared_cursor.fetchall()
+        except Exception as e:
+            self.logger.error(f"Prepared query execution failed: {e}")
+            return None
 
 class LoggingManager:
     """Manages logging configuration and setup."""
@@ -379,12 +395,17 @@ class DataFetcher:
             ORDER BY timestamp ASC
             """
             
-            df_pandas = self.db_manager.execute_query(query, (instrument_key,))
-            if df_pandas is None or df_pandas.empty:
+            # Same statement for every instrument, so it is planned once per connection
+            rows = self.db_manager.execute_prepared(query, (instrument_key,))
+            if not rows:
                 return None
             
-            # Convert to Polars DataFrame
-            df = pl.from_pandas(df_pandas)
+            # Build the Polars DataFrame straight from the rows, without a pandas intermediate
+            df = pl.DataFrame(
+                rows,
+                schema=["timestamp", "open", "high", "low", "close", "volume"],
+                orient="row"
+            ).with_columns(pl.col("open", "high", "low", "close").cast(pl.Float64))
             
             # Apply data quality filters
             if not self._apply_data_filters(df):
@@ -678,15 +699,11 @@ class SqueezeDetector:
             # Use the last lookback_period of data to establish baseline
             lookback_df = df.tail(lookback_period)
             
-            # Calculate 10th percentile threshold
-            percentile_10_threshold = lookback_df.select(
-                pl.col("bb_width").quantile(0.10)
-            ).item()
-            
-            # Calculate average BBW over lookback period
-            avg_bb_width_lookback = lookback_df.select(
-                pl.col("bb_width").mean()
-            ).item()
+            # Calculate 10th percentile threshold and average BBW over lookback period in one select
+            percentile_10_threshold, avg_bb_width_lookback = lookback_df.select(
+                pl.col("bb_width").quantile(0.10),
+                pl.col("bb_width").mean().alias("avg_bb_width")
+            ).row(0)
             
             if percentile_10_threshold is None:
                 return None
@@ -1984,10 +2001,12 @@ def main():
             # Sort by BBW (lowest first - tightest squeezes)
             results_df = results_df.sort("latest_bb_width")
             
-            # Categorize results for separate outputs
-            category_a = results_df.filter(pl.col("category") == "A")
-            category_b = results_df.filter(pl.col("category") == "B")
-            category_c = results_df.filter(pl.col("category") == "C")
+            # Categorize results for separate outputs, splitting the frame in one pass
+            # rather than filtering it once per category
+            categories = {part["category"][0]: part for part in results_df.partition_by("category")}
+            category_a = categories.get("A", results_df.clear())
+            category_b = categories.get("B", results_df.clear())
+            category_c = categories.get("C", results_df.clear())
             
             # Log category breakdown
             logger.info(f"\nCategory Breakdown:")